@@ -0,0 +1,307 @@
+'''
+Benchmark suite for the rheology package.
+
+Synthetic "Overall_Test_Jenny" exports are generated in the same layout as
+exampledata/ (the example export is used as a template and its moduli are
+rescaled and perturbed per sample), then every stage of the pipeline is timed
+and its peak memory recorded at 1, 100 and 10,000 samples. The cold import
+stages time a fresh interpreter importing the package, alone and with the
+analysis or plotting names used (what a worker process pays at start up).
+Nothing is downloaded, so it runs offline.
+
+Usage
+-----
+python benchmarks/bench_rheology.py --out report.json
+python benchmarks/bench_rheology.py --sizes 1 100 --repeat 5 --out report.json
+python benchmarks/bench_rheology.py --compare baseline.json report.json
+
+The report is json: environment (versions, git commit) and one record per
+(stage, samples) with the best and median wall time over the repeats and the
+peak memory traced by tracemalloc in a separate run. --compare prints the
+time ratio of each stage against a baseline report and exits with status 1
+if any stage is slower than --tolerance allows.
+'''
+import argparse
+import csv
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+import matplotlib
+matplotlib.use('Agg') # no display needed
+import matplotlib.pyplot as plt
+import pandas as pd
+import scipy
+
+import rheology as rh
+from rheology.io import _INVALID, _MISSING
+
+TEMPLATE = os.path.join(ROOT, 'exampledata', 'PXP_N1.csv')
+ENCODING = 'ISO-8859-1'
+
+
+def read_template(path=TEMPLATE):
+    '''
+    Returns the rows of the template export, the positions of its data rows
+    and the positions of the storage and loss modulus columns.
+    '''
+    with open(path, newline='', encoding=ENCODING) as f:
+        rows = list(csv.reader(f))
+
+    header = rows[0]
+    moduli = [header.index('Storage Modulus'), header.index('Loss Modulus')]
+    data = []
+    in_block = False
+    for i, row in enumerate(rows):
+        if row[0] == 'Meas. Pts.':
+            in_block = False # the unit row follows
+        elif row[0] == '' and row[1].startswith('['):
+            in_block = True
+        elif row[0] in ('', 'Interval:'):
+            in_block = False
+        elif in_block and _INVALID not in row:
+            data.append(i)
+    return rows, data, moduli
+
+
+def write_export(path, template, rng):
+    '''
+    Writes one synthetic export: the template with its moduli scaled by a
+    random per-sample factor and 2% per-point noise.
+    '''
+    rows, data, moduli = template
+    rows = [list(r) for r in rows]
+    scale = rng.lognormal(0, 0.25)
+    noise = rng.normal(1, 0.02, size=(len(data), len(moduli)))
+
+    for r, eps in zip(data, noise):
+        row = rows[r]
+        for c, e in zip(moduli, eps):
+            if row[c] not in ('', _MISSING):
+                row[c] = '%.2f' % (float(row[c]) * scale * e)
+
+    with open(path, 'w', newline='', encoding=ENCODING) as f:
+        csv.writer(f, lineterminator='\n').writerows(rows)
+
+
+def make_exports(directory, count, seed=0):
+    '''
+    Writes count synthetic exports into directory and returns their paths.
+    '''
+    template = read_template()
+    rng = np.random.default_rng(seed)
+    paths = []
+    for n in range(count):
+        path = os.path.join(directory, 'SYN_N%d.csv' % (n+1))
+        write_export(path, template, rng)
+        paths.append(path)
+    return paths
+
+
+def measure(fn, repeat, memory=True):
+    '''
+    Returns (best seconds, median seconds, peak traced bytes) of fn().
+    '''
+    times = []
+    for i in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return min(times), statistics.median(times), peak
+
+
+def plot_all(avg):
+    '''
+    Draws the standard comparison figures from one group average and closes
+    them.
+    '''
+    label = ['', '']
+    rh.graph_modulus_comparison(avg[0], 'Time', 'Storage Modulus', 'Loss Modulus', *label,
+                                'Modulus [Pa]', 'Time [s]', 'linear', 'Time Sweep')
+    rh.graph_modulus_comparison(avg[1], 'Angular Frequency', 'Storage Modulus', 'Loss Modulus', *label,
+                                'Modulus [Pa]', 'Angular Frequency [rad/s]', 'log', 'Frequency Sweep')
+    rh.graph_modulus_comparison(avg[3], 'Strain', 'Storage Modulus', 'Loss Modulus', *label,
+                                'Modulus [Pa]', 'Strain [%]', 'log', 'Strain Sweep', ss=True)
+    rh.graph_recovery_comparison(avg[5], 'Time', 'Storage Modulus', 'Loss Modulus', *label,
+                                 'Modulus [Pa]', 'Time [min]', 'linear', 'Cyclic Strain Sweep', s=10)
+    rh.graph_recovery_comparison(avg[7], 'Time', 'Storage Modulus', 'Loss Modulus', *label,
+                                 'Modulus [Pa]', 'Time [min]', 'linear', 'Cyclic Strain Sweep', s=20, zoom=True)
+    rh.graph_viscosity_comparison(avg[6], 'Shear Rate', 'Viscosity', '', 'Viscosity [Pa*s]',
+                                  'Shear Rate [1/s]', 'linear', 'Shear Thinning')
+    fig = plt.gcf()
+    fig.canvas.draw()
+    plt.close('all')
+
+
+# code timed in a fresh interpreter by the cold import stages
+COLD_IMPORTS = {'import_python': 'pass',
+                'import': 'import rheology',
+                'import_analysis': 'import rheology; rheology.crossover_n',
+                'import_plotting': 'import rheology; rheology.graph_series'}
+
+
+def cold_import(code):
+    '''
+    Runs code in a new python process started in the repository, so nothing
+    is imported yet, and fails if it does.
+    '''
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+
+
+def run(sizes, files, repeat, legacy_max, memory, workdir):
+    '''
+    Runs every stage at every size and returns the list of result records.
+    '''
+    paths = make_exports(workdir, min(files, max(sizes)))
+    results = []
+
+    def record(stage, samples, fn, times=repeat, memory=memory):
+        best, median, peak = measure(fn, times, memory)
+        results.append({'stage': stage, 'samples': samples, 'best_s': best,
+                        'median_s': median, 'peak_bytes': peak})
+        print('%-22s %6d  best %9.4f s  median %9.4f s  peak %s' % (
+            stage, samples, best, median, '-' if peak is None else '%.1f MB' % (peak / 1e6)))
+
+    # start up cost of a worker process, python alone for reference
+    for stage, code in COLD_IMPORTS.items():
+        record(stage, 0, lambda: cold_import(code), max(repeat, 3), memory=False)
+
+    for size in sizes:
+        batch = [paths[n % len(paths)] for n in range(size)]
+        big = size > legacy_max
+        times = 1 if big else repeat
+
+        if not big:
+            record('parse_legacy', size, lambda: [rh.all_tests_n(pd.read_csv(p, encoding=ENCODING)) for p in batch], times)
+        record('parse', size, lambda: [rh.all_tests_n(p) for p in batch], times)
+
+        cache_dir = os.path.join(workdir, 'cache')
+        record('cache_fill', size, lambda: (shutil.rmtree(cache_dir, ignore_errors=True),
+                                            [rh.all_tests_n(p, cache_dir) for p in batch]), times)
+        record('cache_hit', size, lambda: [rh.all_tests_n(p, cache_dir) for p in batch], times)
+
+        samples = [rh.all_tests_n(p) for p in paths[:min(size, len(paths))]]
+        group = [samples[n % len(samples)] for n in range(size)]
+        name = ['n%d' % (n+1) for n in range(size)]
+
+        record('average', size, lambda: rh.all_tests_avg(group), times)
+        record('crossover_strain', size, lambda: rh.crossover(group, name, cotype=1), times)
+        record('crossover_frequency', size, lambda: rh.crossover(group, name, cotype=2), times)
+        record('recovery_t_half', size, lambda: rh.recovery(None, group, name, rtype=1), times)
+        record('recovery_crossover', size, lambda: rh.recovery(None, group, name, rtype=2), times)
+
+        avg = rh.all_tests_avg(group)
+        record('plot', size, lambda: plot_all(avg), times)
+
+        del samples, group, avg
+
+    return results
+
+
+def environment():
+    '''
+    Returns the versions and commit the benchmark ran on.
+    '''
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {'commit': commit,
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'scipy': scipy.__version__,
+            'matplotlib': matplotlib.__version__}
+
+
+def compare(baseline, report, tolerance):
+    '''
+    Prints the time ratio of each stage in report against baseline and
+    returns the number of stages slower than tolerance allows.
+    '''
+    with open(baseline) as f:
+        old = {(r['stage'], r['samples']): r for r in json.load(f)['results']}
+    with open(report) as f:
+        new = json.load(f)['results']
+
+    slow = 0
+    for r in new:
+        base = old.get((r['stage'], r['samples']))
+        if base is None:
+            continue
+        ratio = r['best_s'] / base['best_s']
+        flag = ''
+        if ratio > tolerance:
+            flag = '  SLOWER'
+            slow = slow + 1
+        print('%-22s %6d  %9.4f s -> %9.4f s  x%.2f%s' % (
+            r['stage'], r['samples'], base['best_s'], r['best_s'], ratio, flag))
+    return slow
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10000],
+                        help='number of samples for each benchmark size')
+    parser.add_argument('--files', type=int, default=100,
+                        help='distinct synthetic exports to generate, larger sizes reuse them')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timed runs per stage (sizes above --legacy-max run once)')
+    parser.add_argument('--legacy-max', type=int, default=100,
+                        help='largest size the pd.read_csv based parse is timed at')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='skip the tracemalloc run of each stage')
+    parser.add_argument('--out', default='bench_report.json', help='json report to write')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'REPORT'),
+                        help='compare two reports instead of running')
+    parser.add_argument('--tolerance', type=float, default=1.2,
+                        help='largest allowed time ratio against the baseline')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(args.compare[0], args.compare[1], args.tolerance) else 0
+
+    workdir = tempfile.mkdtemp(prefix='rheology_bench_')
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            results = run(sorted(args.sizes), args.files, args.repeat, args.legacy_max,
+                          not args.no_memory, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.out, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=1)
+    print('report written to %s' % args.out)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+'''
+Analysis of Anton Paar exports of Jenny Bennett's overall rheology protocol.
+
+The package is split into rheology.protocols (the protocol definition),
+rheology.profiling (stage timings and counters),
+rheology.io (parsing, the segment cache and the results store),
+rheology.analysis (averages and metrics), rheology.fitting (model fits),
+rheology.live (following exports as they are written), rheology.plotting
+(graphs) and rheology.report (study reports). Every public name is
+available from rheology itself, as it was when the package was a single
+module. The parsing, analysis and fitting names are imported with the
+package; live, plotting and report (and so asyncio, matplotlib and
+pyplot's backend) are only imported the first time one of their names is
+used, so worker processes that only parse and analyze start quickly.
+scipy is imported by the few functions that use it.
+'''
+import importlib
+
+from .profiling import Profile, add_hook, remove_hook
+from .protocols import OVERALL_TEST_JENNY, PROTOCOL, compile_protocol, protocol_test
+from .io import (CACHE_SIZE, PARSER_VERSION, STORE_COLUMNS, ResultStore, RheoSample,
+                 all_tests, all_tests_n, cached_tests, file_hash, read_intervals, segment_intervals,
+                 single_test_n, test_dict_n)
+from .analysis import (ALIGN_SCALES, AVG_VARIABLES, KIND_SCALES, KIND_VARIABLES, METRIC_COLUMNS,
+                       RESULT_COLUMNS, align_tests, all_tests_avg, all_tests_stats, batch_analyze,
+                       bootstrap_batch, crossover, crossover_batch, crossover_n, crossover_step1, crossover_step2,
+                       group_metrics, interp_batch, plateau_batch, plateau_n, recovery, recovery_batch,
+                       recovery_fractions_batch, recovery_fractions_n, recovery_profile,
+                       recovery_kinetics, recovery_kinetics_batch, recovery_kinetics_n, recovery_n,
+                       recovery_start, recovery_step1, recovery_step2, recovery_step3,
+                       replicate_stats, single_test_avg, single_test_avg_var, stack_tests, storage_modulus)
+from .fitting import FLOW_COLUMNS, FLOW_MODELS, flow_batch, flow_metrics, flow_n, maxwell_batch, maxwell_n
+
+# names imported on first use: {name: submodule}
+_LAZY = {'ExportTail': 'live', 'export_name': 'live', 'append_results': 'live', 'watch_exports': 'live',
+         'graph_modulus': 'plotting', 'graph_viscosity': 'plotting', 'SERIES_COLORS': 'plotting',
+         'SERIES_MARKERS': 'plotting', 'GRAPH_STYLES': 'plotting', 'series_colors': 'plotting',
+         'lttb': 'plotting', 'graph_series': 'plotting', 'graph_recovery_series': 'plotting',
+         'graph_modulus_comparison': 'plotting', 'graph_recovery_comparison': 'plotting',
+         'graph_viscosity_comparison': 'plotting',
+         'REPORT_FIGURES': 'report', 'study_report': 'report'}
+
+
+def __getattr__(name):
+    '''
+    Imports the submodule of a lazily loaded name (or a submodule itself)
+    the first time it is looked up.
+    '''
+    if name in ('live', 'plotting', 'report'):
+        return importlib.import_module('.' + name, __name__)
+    if name not in _LAZY:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module('.' + _LAZY[name], __name__), name)
+    globals()[name] = value # later lookups do not come here
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,2059 @@
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+from .io import RheoSample, all_tests_n
+from .profiling import Profile, _emit, listening, stage
+from .protocols import PROTOCOL, protocol_test
+
+
+def single_test_avg_var(group, column, test):
+    '''
+    This function uses rheology data from Jenny Bennett's overall rheology
+    protocol for PXP shear-thinning hydrogels. It returns a dataframe
+    containing multiple samples and their average from the same test.
+
+    Parameters
+    ----------
+    group: list of dictionaries from rheology.all_tests_n
+        ex. txt = [rheology.all_tests_n(df_n1), rheology.all_tests_n(df_n2)]
+
+    column: str
+        column interested in extracting, ex. 'Storage Modulus'
+
+    test: int
+        call the test from group dictionary, ex. 0
+    '''
+    test_avg = pd.DataFrame() # create empty dataframe
+
+    # loop through each n in group using specified column and test
+    for n in range(len(group)):
+        test_avg[column, 'n', n+1] = group[n][test][column]
+
+    # take average value across a row
+    test_avg['Mean'] = test_avg.mean(axis=1)
+    return test_avg
+
+
+def single_test_avg(var, group, test):
+    '''
+    This function uses rheology data from Jenny Bennett's overall rheology
+    protocol for PXP shear-thinning hydrogels. It returns a dataframe
+    containing average data from a single test with multiple samples.
+
+    Parameters
+    ----------
+    group: list of dictionaries from rheology.all_tests_n
+        ex. txt = [rheology.all_tests_n(df_n1), rheology.all_tests_n(df_n2)]
+
+    var: list, str
+        columns/variables interested in extracting, ex. ['Time', 'Storage
+        Modulus', 'Loss Modulus']
+
+    test: int
+        call the test from group dictionary, ex. 0
+    '''
+    var_test = {}
+
+    for v in var:
+        var_test[v] = single_test_avg_var(group, v, test)
+
+
+    avg_test = pd.DataFrame()
+
+    for v in var:
+        avg_test[v] = var_test[v]['Mean']
+
+    return avg_test
+
+
+def stack_tests(group, test, columns):
+    '''
+    This function stacks one test from every sample in a group into a single
+    array so the test can be analyzed for all samples at once. Samples with
+    fewer points than the longest one are padded with NaN at the end.
+
+    Parameters
+    ----------
+    group: list of dictionaries from rheology.all_tests_n
+        ex. txt = [rheology.all_tests_n(df_n1), rheology.all_tests_n(df_n2)]
+
+    test: int
+        call the test from group dictionary, ex. 3
+
+    columns: list, str
+        columns to stack, ex. ['Strain', 'Storage Modulus', 'Loss Modulus'],
+        columns a sample did not measure are NaN
+
+    Returns
+    -------
+    stacked: numpy array
+        float64 array of shape (samples, points, columns)
+    '''
+    frames = [g.labels(test) if isinstance(g, RheoSample) else g[test] for g in group]
+    points = max([len(f) for f in frames], default=0)
+
+    stacked = np.full((len(frames), points, len(columns)), np.nan)
+    for n, (g, f) in enumerate(zip(group, frames)):
+        if isinstance(g, RheoSample):
+            stacked[n, :len(f)] = g.select(test, columns) # straight from the block
+        else:
+            stacked[n, :len(f)] = f.reindex(columns=columns).to_numpy(np.float64)
+    return stacked
+
+
+# variables averaged for each kind of test by all_tests_avg
+KIND_VARIABLES = {'time sweep': ['Time', 'Storage Modulus', 'Loss Modulus'],
+                  'frequency sweep': ['Angular Frequency', 'Storage Modulus', 'Loss Modulus'],
+                  'strain sweep': ['Strain', 'Storage Modulus', 'Loss Modulus'],
+                  'cyclic strain sweep': ['Time', 'Storage Modulus', 'Loss Modulus'],
+                  'shear thinning': ['Shear Rate', 'Viscosity'],
+                  'zoom': ['Time', 'Storage Modulus', 'Loss Modulus']}
+
+# how each kind of test is aligned by align_tests: on time since the start of
+# the test, or on the log of its swept variable
+KIND_SCALES = {'time sweep': 'time', 'frequency sweep': 'log', 'strain sweep': 'log',
+               'cyclic strain sweep': 'time', 'shear thinning': 'log', 'zoom': 'time'}
+
+# the same by test number for the default protocol
+AVG_VARIABLES = {k: KIND_VARIABLES[t['kind']] for k, t in PROTOCOL['tests'].items()}
+ALIGN_SCALES = {k: KIND_SCALES[t['kind']] for k, t in PROTOCOL['tests'].items()}
+
+
+def interp_batch(grid, x, y):
+    '''
+    This function linearly interpolates many curves at once, like np.interp
+    applied to every row, without a Python loop over the rows. Each row may
+    have its own number of points (NaN padding) and may run in either
+    direction. Grid values outside a row's range give NaN.
+
+    Parameters
+    ----------
+    grid : numpy array (grid points) or (rows x grid points)
+        x values to interpolate at
+
+    x : numpy array (rows x points)
+
+    y : numpy array (rows x points) or (rows x points x variables)
+
+    Returns
+    -------
+    out : numpy array (rows x grid points), or (rows x grid points x variables)
+    '''
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    flat = y.ndim == 2
+    if flat:
+        y = y[..., None]
+    rows, points = x.shape
+    grid = np.broadcast_to(np.asarray(grid, dtype=np.float64), (rows, np.shape(grid)[-1]))
+    size = grid.shape[1]
+
+    # sort every row by x, NaN (padding) last
+    order = np.argsort(x, axis=1)
+    x = np.take_along_axis(x, order, axis=1)
+    y = np.take_along_axis(y, order[..., None], axis=1)
+    n = (~np.isnan(x)).sum(axis=1)[:, None]
+
+    # searchsorted (side='right') for every row at once: sort data and grid
+    # values together by (row, value), data first on ties, then count the
+    # data points ahead of each grid value in its row
+    row = np.arange(rows)
+    keys_row = np.concatenate([np.repeat(row, points), np.repeat(row, size)])
+    keys_val = np.concatenate([np.where(np.isnan(x), np.inf, x).ravel(), grid.ravel()])
+    keys_grid = np.concatenate([np.zeros(rows*points, dtype=bool), np.ones(rows*size, dtype=bool)])
+    order = np.lexsort((keys_grid, keys_val, keys_row))
+    grid_before = np.cumsum(keys_grid[order]) # grid values up to each sorted position
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    pos = rank[rows*points:].reshape(rows, size)
+    count = pos - row[:, None]*points - grid_before[pos] + 1
+
+    lo = np.clip(count - 1, 0, np.maximum(n - 2, 0))
+    hi = np.minimum(lo + 1, points - 1)
+    x_lo = np.take_along_axis(x, lo, axis=1)
+    x_hi = np.take_along_axis(x, hi, axis=1)
+    y_lo = np.take_along_axis(y, lo[..., None], axis=1)
+    y_hi = np.take_along_axis(y, hi[..., None], axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        w = np.where(x_hi > x_lo, (grid - x_lo) / (x_hi - x_lo), 0)
+    out = y_lo + w[..., None] * (y_hi - y_lo)
+
+    x_last = np.take_along_axis(x, np.maximum(n - 1, 0), axis=1)
+    outside = (n < 2) | ~(grid >= x[:, :1]) | ~(grid <= x_last)
+    out[outside] = np.nan
+    return out[..., 0] if flat else out
+
+
+def align_tests(group, test, columns=None, grid=None, reference=None, protocol=PROTOCOL):
+    '''
+    This function stacks one test from every sample in a group like
+    rheology.stack_tests, but interpolates every replicate onto a common grid
+    first, so runs with a different number of points or shifted timestamps
+    can be averaged point by point. Time based tests are aligned on the time
+    since the start of the test, sweeps on the log of strain, angular
+    frequency or shear rate (rheology.KIND_SCALES).
+
+    Parameters
+    ----------
+    group: list of dictionaries from rheology.all_tests_n
+
+    test: int
+        call the test from group dictionary, ex. 3
+
+    columns: list, str
+        columns to stack, the first one is the grid variable, defaults to the
+        variables averaged for the kind of test (rheology.KIND_VARIABLES)
+
+    grid: numpy array (optional)
+        points to align on, in the units of the first column (seconds since
+        the start of the test for time based tests); defaults to the points
+        of the reference replicate
+
+    reference: int (optional)
+        replicate whose points (and clock) are used, defaults to the one with
+        the most points
+
+    protocol: dictionary
+        compiled protocol (rheology.compile_protocol) the kind of test is
+        looked up in
+
+    Returns
+    -------
+    aligned: numpy array (replicates x grid points x columns)
+        the first column holds the grid on the reference replicate's scale,
+        NaN where a replicate does not cover the grid point
+    '''
+    kind = protocol['tests'][test]['kind']
+    if columns is None:
+        columns = KIND_VARIABLES[kind]
+    stacked = stack_tests(group, test, columns)
+    x = stacked[..., 0]
+    if reference is None:
+        reference = int(np.argmax((~np.isnan(x)).sum(axis=1)))
+    ref = x[reference][~np.isnan(x[reference])]
+
+    if KIND_SCALES[kind] == 'time':
+        u = x - x[:, :1] # time since the start of each replicate's test
+        if grid is None:
+            grid = ref - ref[0]
+        grid = np.asarray(grid, dtype=np.float64)
+        grid_u = grid
+        x_out = grid + ref[0]
+    else:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            u = np.log10(np.where(x > 0, x, np.nan))
+        if grid is None:
+            grid = ref
+        grid = np.asarray(grid, dtype=np.float64)
+        grid_u = np.log10(grid)
+        x_out = grid
+
+    values = interp_batch(grid_u, u, stacked[..., 1:])
+    covered = ~np.isnan(values).all(axis=2)
+    aligned = np.empty(values.shape[:2] + (len(columns),))
+    aligned[..., 0] = np.where(covered, x_out, np.nan)
+    aligned[..., 1:] = values
+    return aligned
+
+
+def replicate_stats(stacked, confidence=0.95):
+    '''
+    This function returns statistics across replicates of a stacked test
+    (rheology.stack_tests) in one vectorized pass. NaN values (missing points
+    or padding) are skipped.
+
+    Parameters
+    ----------
+    stacked : numpy array (replicates x points x variables)
+
+    confidence : float
+        level of the two-sided confidence interval of the mean
+
+    Returns
+    -------
+    stats : dictionary of numpy arrays (points x variables)
+        'N', 'Mean', 'Std' (sample standard deviation), 'SEM', 'CI Low' and
+        'CI High' (Student t interval of the mean)
+    '''
+    from scipy.stats import t as t_dist # scipy is imported on first use
+
+    valid = ~np.isnan(stacked)
+    n = valid.sum(axis=0)
+    work = np.where(valid, stacked, 0) # one scratch buffer, reused below
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = work.sum(axis=0) / n
+        np.subtract(stacked, mean, out=work)
+        work[~valid] = 0
+        np.square(work, out=work)
+        std = np.sqrt(work.sum(axis=0) / (n - 1))
+        sem = std / np.sqrt(n)
+        half = t_dist.ppf((1 + confidence) / 2, n - 1) * sem
+
+    return {'N': n, 'Mean': mean, 'Std': std, 'SEM': sem,
+            'CI Low': mean - half, 'CI High': mean + half}
+
+
+def all_tests_stats(group, confidence=0.95, align=None, protocol=PROTOCOL):
+    '''
+    This function uses rheology data from Jenny Bennett's overall rheology
+    protocol for PXP shear-thinning hydrogels. It returns a dictionary with
+    the mean, standard deviation, SEM and confidence interval of every test
+    across any number of replicates, for error bars on comparison graphs.
+
+    Parameters
+    ----------
+    group: list of dictionaries from rheology.all_tests_n
+        ex. txt = [rheology.all_tests_n(df_n1), rheology.all_tests_n(df_n2)]
+
+    confidence : float
+        level of the confidence interval
+
+    align : True/False/None
+        interpolate replicates onto a common grid first (rheology.align_tests);
+        None aligns only the tests whose replicates have different numbers of
+        points, False always matches replicates point by point
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol) of the group
+
+    Returns
+    -------
+    all_tests_stats : dictionary of dataframes
+        same keys (0-7) as rheology.all_tests_avg, columns are (variable,
+        statistic) pairs, ex. all_tests_stats[3]['Storage Modulus']['SEM']
+
+    Example
+    -------
+    txt = rheology.all_tests(t1, t2, t3, t4)
+
+    rheology.all_tests_stats(txt)[1]['Storage Modulus']
+    '''
+    all_tests_stats = {}
+
+    for i, t in protocol['tests'].items():
+        with stage('average', rows=len(group)):
+            var = KIND_VARIABLES[t['kind']]
+            lengths = [len(g[i]) for g in group]
+            if align or (align is None and len(set(lengths)) > 1):
+                reference = int(np.argmax(lengths))
+                stacked = align_tests(group, i, var, reference=reference, protocol=protocol)
+                first = group[reference][i].index # rows follow the reference replicate
+            else:
+                stacked = stack_tests(group, i, var)
+                first = group[0][i].index # rows follow the first replicate, as in single_test_avg_var
+            stats = replicate_stats(stacked, confidence)
+
+            rows = len(first)
+            columns = pd.MultiIndex.from_product([var, list(stats)])
+            values = np.stack([stats[k][:rows] for k in stats], axis=-1).reshape(rows, -1)
+            all_tests_stats[i] = pd.DataFrame(values, index=first, columns=columns)
+
+    return all_tests_stats
+
+
+def all_tests_avg(group, align=None, protocol=PROTOCOL):
+    '''
+    This function uses rheology data from Jenny Bennett's overall rheology
+    protocol for PXP shear-thinning hydrogels. It returns a dictionary
+    containing dataframes of average data from all tests with multiple samples.
+    The averages come from rheology.all_tests_stats.
+
+    Parameters
+    ----------
+    group: list of dictionaries from rheology.all_tests_n
+        ex. txt = [rheology.all_tests_n(df_n1), rheology.all_tests_n(df_n2)]
+
+    align: True/False/None
+        see rheology.all_tests_stats, by default replicates are only
+        interpolated onto a common grid when their number of points differs
+
+    protocol: dictionary
+        compiled protocol (rheology.compile_protocol) of the group
+    '''
+    all_tests_avg = {}
+
+    for i, stats in all_tests_stats(group, align=align, protocol=protocol).items():
+        all_tests_avg[i] = stats.xs('Mean', axis=1, level=1)
+
+    return all_tests_avg
+
+
+def _masked_mean(a, mask):
+    '''
+    Returns the NaN-skipping mean of each row of a over the points in mask.
+    '''
+    mask = mask & ~np.isnan(a)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(mask, a, 0).sum(axis=1) / mask.sum(axis=1)
+
+
+def _rolling_sums(a, window):
+    '''
+    Returns the sums of a (samples x points) over every window of window
+    consecutive points, (samples x points - window + 1), from one cumulative
+    sum.
+    '''
+    total = np.zeros((a.shape[0], a.shape[1] + 1))
+    np.cumsum(a, axis=1, out=total[:, 1:])
+    return total[:, window:] - total[:, :-window]
+
+
+def plateau_batch(time, storage, loss, window=20, tol=0.01):
+    '''
+    This function finds the equilibrium plateau of many time sweeps at once.
+    The mean, variance and least squares slope of G' over every window of
+    window points come from running sums (one pass, O(points)), and the
+    plateau starts at the first window from which every later window is
+    steady: its G' drift (slope times duration) and coefficient of variation
+    are both below tol of its mean G'. A sweep that is still changing at its
+    end has no plateau, its last window is reported instead.
+
+    Parameters
+    ----------
+    time : numpy array (samples x points)
+        time [s] of the time sweep
+
+    storage : numpy array (samples x points)
+        storage modulus G'
+
+    loss : numpy array (samples x points)
+        loss modulus G"
+
+    window : int
+        points in each running window
+
+    tol : float
+        largest relative drift and coefficient of variation of a steady window
+
+    Returns
+    -------
+    plateau : dictionary of numpy arrays (samples)
+        'Start' and 'End' (positions in the test, End excluded), "G' [Pa]"
+        and 'G" [Pa]' averaged over the plateau, 'Drift' (relative change of
+        G' over the plateau from its slope) and 'Found'
+
+    Example
+    -------
+    ts = rheology.stack_tests(txt, 4, ['Time', 'Storage Modulus', 'Loss Modulus'])
+
+    rheology.plateau_batch(ts[..., 0], ts[..., 1], ts[..., 2])['Start']
+    '''
+    time = np.atleast_2d(np.asarray(time, dtype=np.float64))
+    storage = np.atleast_2d(np.asarray(storage, dtype=np.float64))
+    loss = np.atleast_2d(np.asarray(loss, dtype=np.float64))
+    samples, points = storage.shape
+    rows = np.arange(samples)
+
+    valid = ~(np.isnan(time) | np.isnan(storage))
+    end = points - np.argmax(valid[:, ::-1], axis=1) # one past the last measured point
+    end[~valid.any(axis=1)] = 0
+
+    # centred on each sample's first point, so the sums of squares keep their precision
+    first = np.argmax(valid, axis=1)
+    t = np.where(valid, time - time[rows, first][:, None], 0)
+    g = np.where(valid, storage - storage[rows, first][:, None], 0)
+    w = min(window, points)
+
+    with stage('plateau', rows=samples):
+        n = _rolling_sums(valid.astype(np.float64), w)
+        st, sg = _rolling_sums(t, w), _rolling_sums(g, w)
+        stt, sgg, stg = _rolling_sums(t * t, w), _rolling_sums(g * g, w), _rolling_sums(t * g, w)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = sg / n + storage[rows, first][:, None]
+            var = (sgg - sg * sg / n) / (n - 1)
+            slope = (n * stg - st * sg) / (n * stt - st * st)
+            span = _rolling_sums(np.where(valid, time, 0), 1)[:, w-1:] - np.where(valid, time, 0)[:, :points-w+1]
+            steady = (n == w) & (np.abs(slope * span) < tol * np.abs(mean)) & (np.sqrt(var) < tol * np.abs(mean))
+
+        # windows reaching past the data do not count, a plateau runs to the end
+        inside = np.arange(points - w + 1) <= (end - w)[:, None]
+        settled = np.logical_and.accumulate((steady | ~inside)[:, ::-1], axis=1)[:, ::-1] & inside
+        found = settled.any(axis=1)
+        start = np.where(found, np.argmax(settled, axis=1), np.maximum(end - w, 0))
+
+        # averages and drift over start:end from the same running sums
+        def over(a):
+            total = np.zeros((samples, points + 1))
+            np.cumsum(a, axis=1, out=total[:, 1:])
+            return total[rows, end] - total[rows, start]
+
+        count = over(valid.astype(np.float64))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sm = over(g) / count + storage[rows, first]
+            lm = over(np.where(valid & ~np.isnan(loss), loss, 0)) / over((valid & ~np.isnan(loss)).astype(np.float64))
+            ts, gs = over(t), over(g)
+            b = (count * over(t * g) - ts * gs) / (count * over(t * t) - ts * ts)
+            duration = time[rows, np.maximum(end - 1, 0)] - time[rows, start]
+            drift = b * duration / sm
+
+    empty = end == 0
+    return {'Start': np.where(empty, 0, start), 'End': end,
+            "G' [Pa]": np.where(empty, np.nan, sm), 'G" [Pa]': np.where(empty, np.nan, lm),
+            'Drift': np.where(empty, np.nan, drift), 'Found': found}
+
+
+def plateau_n(group, window=20, tol=0.01, protocol=PROTOCOL):
+    '''
+    This function finds the plateau of every time sweep of the protocol (0, 2
+    and 4 in Jenny Bennett's protocol) for every n in a group, using
+    rheology.plateau_batch. The group is only read.
+
+    Parameters
+    ----------
+    group : list of dictionaries
+        each dictionary is from a single n processed in rheology.all_tests_n(df)
+
+    window : int
+        points in each running window
+
+    tol : float
+        largest relative drift and coefficient of variation of a steady window
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol)
+
+    Returns
+    -------
+    plateaus : dictionary
+        {test: dictionary from rheology.plateau_batch}
+
+    Example
+    -------
+    plateaus = rheology.plateau_n(txt)
+
+    plateaus[4]["G' [Pa]"] # plateau G' after the strain sweep of every n
+    '''
+    plateaus = {}
+    for k in protocol['kinds'].get('time sweep', []):
+        ts = stack_tests(group, k, ['Time', 'Storage Modulus', 'Loss Modulus'])
+        plateaus[k] = plateau_batch(ts[..., 0], ts[..., 1], ts[..., 2], window, tol)
+    return plateaus
+
+
+def storage_modulus(group, protocol=PROTOCOL, adaptive=False):
+    '''
+    This function returns a dataframe summarizing the average storage modulus from Jenny Bennett's
+    overall rheology test for shear-thinning PXP hydrogels.
+
+    Parameters
+    ----------
+    group : list of dictionaries
+        each dictionary is from a single n processed in rheology.all_tests_n(df)
+        the list includes one dictionary per n
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol), G' is averaged over the
+        plateau window of every test that has one
+
+    adaptive : True/False
+        average G' over the plateau each sample reaches in every time sweep
+        (rheology.plateau_n), including those without a protocol window,
+        instead of the fixed windows of the protocol
+
+    Example
+    -------
+    txt_n1 = rheology.all_tests_n(df_n1)
+    txt_n2 = rheology.all_tests_n(df_n2)
+    txt_n3 = rheology.all_tests_n(df_n3)
+
+    txt = [txt_n1, txt_n2, txt_n3]
+
+    storage_modulus(txt)
+    '''
+    # average storage modulus over the plateau of each time sweep (0, 2), or of every time sweep (0, 2, 4)
+    if adaptive:
+        plateau = dict.fromkeys(protocol['kinds'].get('time sweep', []))
+    else:
+        plateau = {k: t['plateau'] for k, t in protocol['tests'].items() if t['plateau'] is not None}
+
+    with stage('storage_modulus', rows=len(group)):
+        sm = np.full((len(plateau), len(group)), np.nan) # G' of each period for each n
+        for j, (i, window) in enumerate(plateau.items()):
+            ts = stack_tests(group, i, ['Time', 'Storage Modulus', 'Loss Modulus'])
+            if adaptive:
+                sm[j] = plateau_batch(ts[..., 0], ts[..., 1], ts[..., 2])["G' [Pa]"]
+            else:
+                first, last = window
+                # the protocol window sliced from each n's own points, as group[n][i][first:last]
+                lengths = [len(g.labels(i) if isinstance(g, RheoSample) else g[i]) for g in group]
+                bounds = np.array([slice(first, last).indices(n)[:2] for n in lengths]).reshape(-1, 2)
+                position = np.arange(ts.shape[1])
+                window = (position >= bounds[:, :1]) & (position < bounds[:, 1:])
+                sm[j] = _masked_mean(ts[..., 1], window)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            measured = ~np.isnan(sm)
+            sm_final = list(np.where(measured, sm, 0).sum(axis=0) / measured.sum(axis=0)) # mean over the periods
+    return sm_final # return list of average storage modulus per n
+
+
+def crossover_step1(df, cotype=1):
+    '''
+    (Step 1/3) This function returns two dataframe entries describing the crossover from a single strain sweep
+    in Jenny Bennett's overall rheology test for shear-thinning PXP hydrogels.
+
+    Parameters
+    ----------
+    df : dataframe
+        dataframe from strain sweep with an n of 1
+
+    cotype : int
+        1 (strain) or 2 (frequency)
+
+    Example
+    -------
+    txt_n1 = rheology.all_tests_n(df_n1)
+
+    crossover_step1(txt_n1[3])
+    '''
+    df = df.copy() # work on a scratch copy, the caller's strain sweep is not modified
+
+    if cotype==1:
+        df['position'] = df['Loss Modulus'] > df['Storage Modulus'] # determine where G" > G'
+    else:
+        df['position'] = df['Storage Modulus'] > df['Loss Modulus']
+
+    df['pre_position'] = df['position'].shift(1) # determine entry just before G" > G'
+    df['crossover'] = np.where(df['position'] == df['pre_position'], False, True) # flag intersection between the two
+    df = df.dropna() # drop rows with NaN values
+
+    co_l_in = df.loc[df['crossover'] == True] # store crossover row (low crossover)
+    co_l = co_l_in.iloc[-1:]
+    index = co_l.index.values # determine index of crossover
+
+    co_h = pd.DataFrame(df.loc[index-1]) # store previous entry before crossover (high crossover)
+
+    return co_l, co_h # return low crossover and high crossover
+
+
+def _fsolve(f, guess):
+    '''
+    Solves f(w) = 0 with scipy's fsolve from guess and returns the solution,
+    recorded as an 'fsolve' stage with the function evaluations as
+    iterations and a failed solve as unconverged. Failures warn (or raise)
+    the same way fsolve does.
+    '''
+    from scipy.optimize import fsolve # scipy is imported on first use
+
+    with stage('fsolve') as st:
+        result, info, ier, message = fsolve(f, guess, full_output=True)
+        st.add(rows=1, iterations=info['nfev'], unconverged=int(ier != 1))
+    if ier in (2, 3, 4, 5):
+        warnings.warn(message, RuntimeWarning, stacklevel=2)
+    elif ier != 1:
+        raise TypeError(message)
+    return result
+
+
+def crossover_step2(co_l, co_h, cotype=1):
+    '''
+    (Step 2/3) This function returns the crossover strain% from a single strain sweep
+    in Jenny Bennett's overall rheology test for shear-thinning PXP hydrogels.
+
+    Parameters
+    ----------
+    co_l : dataframe entry from rheology.crossover_step1(df)
+
+    co_h : dataframe entry from rheology.crossover_step1(df)
+
+    cotype : int
+        1 (strain) or 2 (frequency)
+
+    Example
+    -------
+    txt_n1 = rheology.all_tests_n(df_n1)
+
+    co_l, co_h = rheology.crossover_step1(txt_n1[3])
+
+    rheology.crossover_step2(co_l, co_h)
+    '''
+    if cotype==1:
+        a_x = co_h['Strain'].values # define x from high entry
+        c_x = co_l['Strain'].values # define x from low entry
+    else:
+        a_x = co_h['Angular Frequency'].values
+        c_x = co_l['Angular Frequency'].values
+
+    a_y = co_h['Storage Modulus'].values # define y from high entry
+    a_z = co_h['Loss Modulus'].values # define z from high entry
+
+    c_y = co_l['Storage Modulus'].values # define y from low entry
+    c_z = co_l['Loss Modulus'].values # define z from low entry
+
+    # use solver below to interpolate between high and low entries for crossover
+    def f(w):
+        b_x = w[0] # crossover strain or frequency
+        b_y = w[1] # crossover G'
+        b_z = w[2] # crossover G"
+
+        # 3 equations and 3 unknowns using loglog scale
+
+        if cotype==1:
+            range_x = np.log10(c_x[0] - a_x[0]) # range between high and low x values
+            if a_y[0] < c_y[0]:
+                range_y = np.log10(c_y[0] - a_y[0]) # range between high and low y values
+                f1 = b_y - a_y[0] - 10**((np.log10(b_x - a_x[0])) / range_x*range_y)
+            else:
+                range_y = np.log10(a_y[0] - c_y[0]) # range between high and low y values
+                f1 = b_y - a_y[0] + 10**((np.log10(b_x - a_x[0])) / range_x*range_y)
+
+            if a_z[0] < c_z[0]:
+                range_z = np.log10(c_z[0] - a_z[0]) # range between high and low z values
+                f2 = b_z - a_z[0] - 10**((np.log10(b_x - a_x[0])) / range_x*range_z)
+            else:
+                range_z = np.log10(a_z[0] - c_z[0]) # range between high and low z values
+                f2 = b_z - a_z[0] + 10**((np.log10(b_x - a_x[0])) / range_x*range_z)
+        else:
+            range_x = np.log10(a_x[0] - c_x[0]) # range between high and low x values
+            if a_y[0] < c_y[0]:
+                range_y = np.log10(c_y[0] - a_y[0]) # range between high and low y values
+                f1 = b_y - a_y[0] - 10**((np.log10(a_x[0] - b_x)) / range_x*range_y)
+            else:
+                range_y = np.log10(a_y[0] - c_y[0]) # range between high and low y values
+                f1 = b_y - a_y[0] + 10**((np.log10(a_x[0] - b_x)) / range_x*range_y)
+
+            if a_z[0] < c_z[0]:
+                range_z = np.log10(c_z[0] - a_z[0]) # range between high and low z values
+                f2 = b_z - a_z[0] - 10**((np.log10(a_x[0] - b_x)) / range_x*range_z)
+            else:
+                range_z = np.log10(a_z[0] - c_z[0]) # range between high and low z values
+                f2 = b_z - a_z[0] + 10**((np.log10(a_x[0] - b_x)) / range_x*range_z)
+
+        f3 = b_y - b_z
+
+        return(f1, f2, f3)
+
+    result = _fsolve(f, [c_x[0], c_y[0], c_z[0]]) # guess using high values
+    crossover = result[0]
+    return crossover # return crossover strain%
+
+def _loglog_root(a_y, a_z, c_y, c_z, max_iter=50, tol=1e-12):
+    '''
+    Solves a_y + s_y*|c_y - a_y|**t = a_z + s_z*|c_z - a_z|**t for t (s is the
+    sign of c - a) over whole arrays at once. This is the scalar equation the
+    log-log interpolation systems of crossover_step2 and recovery_step2 reduce
+    to once b_y = b_z is substituted; t = 1 is the low entry. Newton steps are
+    started from t = 1, the same starting point fsolve is given there. Entries
+    that do not converge are returned as NaN.
+    '''
+    s_y = np.sign(c_y - a_y)
+    s_z = np.sign(c_z - a_z)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        l_y = np.log(np.abs(c_y - a_y))
+        l_z = np.log(np.abs(c_z - a_z))
+
+        t = np.ones(np.broadcast(a_y, a_z, c_y, c_z).shape)
+        step = np.full(t.shape, np.inf)
+        with stage('loglog_root', rows=t.size) as st:
+            for i in range(max_iter):
+                e_y = s_y * np.exp(t * l_y)
+                e_z = s_z * np.exp(t * l_z)
+                step = (a_y - a_z + e_y - e_z) / (l_y * e_y - l_z * e_z)
+                t = t - step
+                if not (np.abs(step) > tol).any(): # NaN entries count as done
+                    break
+            # entries without a crossover are NaN from the start, they are not failures
+            st.add(iterations=i + 1, unconverged=int((np.abs(step) > tol).sum()))
+
+    t[~(np.abs(step) <= tol)] = np.nan
+    return t
+
+
+def _loglog_point(a_x, c_x, t):
+    '''
+    Returns the x value at interpolation parameter t between a_x (t = 0 side)
+    and c_x (t = 1) on the log scale used by crossover_step2.
+    '''
+    with np.errstate(invalid='ignore'):
+        return a_x + np.sign(c_x - a_x) * np.abs(c_x - a_x)**t
+
+
+def crossover_batch(x, storage, loss, cotype=1):
+    '''
+    This function returns the crossover of many strain sweeps (cotype=1) or
+    frequency sweeps (cotype=2) at once. The last point where the sign of
+    G" - G' flips is found with array operations and the log-log
+    interpolation of crossover_step2 is solved directly instead of calling
+    fsolve for each sample.
+
+    Parameters
+    ----------
+    x : numpy array (samples x points)
+        strain [%] (cotype=1) or angular frequency [rad/s] (cotype=2)
+
+    storage : numpy array (samples x points)
+        storage modulus G'
+
+    loss : numpy array (samples x points)
+        loss modulus G"
+
+    cotype : int
+        1 (strain) or 2 (frequency)
+
+    Returns
+    -------
+    co : numpy array (samples)
+        crossover strain% or angular frequency, NaN where there is none
+
+    Example
+    -------
+    ss = rheology.stack_tests(txt, 3, ['Strain', 'Storage Modulus', 'Loss Modulus'])
+
+    rheology.crossover_batch(ss[..., 0], ss[..., 1], ss[..., 2])
+    '''
+    x = np.atleast_2d(x)
+    storage = np.atleast_2d(storage)
+    loss = np.atleast_2d(loss)
+
+    if cotype==1:
+        position = loss > storage # determine where G" > G'
+    else:
+        position = storage > loss
+
+    valid = ~(np.isnan(x) | np.isnan(storage) | np.isnan(loss))
+    flip = (position[:, 1:] != position[:, :-1]) & valid[:, 1:] & valid[:, :-1]
+
+    found = flip.any(axis=1)
+    last = flip.shape[1] - np.argmax(flip[:, ::-1], axis=1) # index of the low entry
+    low = last[:, None]
+    high = low - 1 # entry just before the crossover
+
+    def pick(a, i):
+        return np.take_along_axis(a, i, axis=1)[:, 0]
+
+    t = _loglog_root(pick(storage, high), pick(loss, high), pick(storage, low), pick(loss, low))
+    co = _loglog_point(pick(x, high), pick(x, low), t)
+    co[~found] = np.nan
+    return co
+
+
+def bootstrap_batch(sweeps, metric, resamples=2000, confidence=0.95, noise=None, seed=None, block=2**21):
+    '''
+    This function returns a percentile bootstrap confidence interval of the
+    mean of a per-replicate metric. Every resample draws the replicates with
+    replacement and, if noise is given, perturbs G' and G" of each drawn
+    sweep, then the metric is computed for all resamples in a few batched
+    calls of metric (rheology.crossover_batch, rheology.recovery_batch)
+    rather than one solve per resample.
+
+    Parameters
+    ----------
+    sweeps : numpy array (replicates x points x 3)
+        x, storage modulus and loss modulus of one test (rheology.stack_tests)
+
+    metric : function(sweeps, rows)
+        returns the metric of each sweep as an array (sweeps), rows are the
+        replicates the sweeps were drawn from
+
+    resamples : int
+        number of bootstrap resamples
+
+    confidence : float
+        level of the two-sided percentile interval
+
+    noise : float (optional)
+        relative standard deviation of measurement noise added to every
+        point of G' and G", ex. 0.02; None resamples replicates only
+
+    seed : int (optional)
+        seed of the random generator, for repeatable intervals
+
+    block : int
+        largest number of points passed to metric at once, bounds memory
+
+    Returns
+    -------
+    ci : dictionary
+        'CI Low' and 'CI High' of the mean, NaN if every resample is NaN
+
+    Example
+    -------
+    ss = rheology.stack_tests(txt, 3, ['Strain', 'Storage Modulus', 'Loss Modulus'])
+
+    rheology.bootstrap_batch(ss, lambda s, rows: rheology.crossover_batch(s[..., 0], s[..., 1], s[..., 2]))
+    '''
+    rng = np.random.default_rng(seed)
+    replicates, points = sweeps.shape[:2]
+    draws = rng.integers(0, replicates, size=(resamples, replicates))
+
+    with stage('bootstrap', rows=resamples):
+        if noise is None:
+            # the metric of each replicate only has to be computed once
+            values = metric(sweeps, np.arange(replicates))[draws]
+        else:
+            rows = draws.ravel()
+            values = np.empty(rows.size)
+            size = max(1, block // max(points, 1)) # sweeps per call
+            for i in range(0, rows.size, size):
+                part = sweeps[rows[i:i+size]] # a copy, safe to perturb
+                part[..., 1:] *= rng.normal(1, noise, size=part.shape[:2] + (2,))
+                values[i:i+size] = metric(part, rows[i:i+size])
+            values = values.reshape(resamples, replicates)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning) # all-NaN resamples
+            means = np.nanmean(values, axis=1) # as the Mean column, missing replicates are skipped
+            low, high = np.nanpercentile(means, [50 * (1 - confidence), 50 * (1 + confidence)])
+    return {'CI Low': low, 'CI High': high}
+
+
+def _crossover_sweep(cotype, protocol=PROTOCOL):
+    '''
+    Returns the test and the x column of the crossover sweep, the strain
+    sweep and Strain (cotype=1) or the frequency sweep and Angular Frequency
+    (cotype=2).
+    '''
+    if cotype==1:
+        return protocol_test('strain sweep', protocol), 'Strain'
+    return protocol_test('frequency sweep', protocol), 'Angular Frequency'
+
+
+def crossover_n(group, cotype=1, protocol=PROTOCOL):
+    '''
+    This function returns the crossover strain% (cotype=1) or angular
+    frequency (cotype=2) of every n in a group as an array, using
+    rheology.crossover_batch. The group is only read.
+
+    Parameters
+    ----------
+    group : list of dictionaries
+        each dictionary is from a single n processed in rheology.all_tests_n(df)
+
+    cotype : int
+        1 (strain) or 2 (frequency)
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol) the sweep is looked up in
+    '''
+    k, x = _crossover_sweep(cotype, protocol)
+    with stage('crossover', rows=len(group)):
+        sweeps = stack_tests(group, k, [x, 'Storage Modulus', 'Loss Modulus'])
+        return crossover_batch(sweeps[..., 0], sweeps[..., 1], sweeps[..., 2], cotype)
+
+
+def crossover(group, name, cotype=1, protocol=PROTOCOL, bootstrap=None, confidence=0.95, noise=None, seed=None):
+    '''
+    (Step 3/3) This function returns the crossover strain% in a dataframe from all strain sweeps
+    in Jenny Bennett's overall rheology test for shear-thinning PXP hydrogels. (multiple ns)
+
+    Parameters
+    ----------
+    group : list of dictionaries
+        each dictionary is from a single n processed in rheology.all_tests_n(df)
+        the list includes one dictionary per n
+
+    name : list, str
+        names for the output dataframe columns
+
+    cotype : int
+        1 (strain) or 2 (frequency)
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol)
+
+    bootstrap : int (optional)
+        number of bootstrap resamples, adds 'CI Low' and 'CI High' columns
+        with a percentile interval of the mean (rheology.bootstrap_batch)
+
+    confidence : float
+        level of the bootstrap interval
+
+    noise : float (optional)
+        relative measurement noise added to G' and G" in every resample,
+        ex. 0.02, None resamples replicates only
+
+    seed : int (optional)
+        seed of the bootstrap, for repeatable intervals
+
+    Example
+    -------
+    txt_n1 = rheology.all_tests_n(df_n1)
+    txt_n2 = rheology.all_tests_n(df_n2)
+    txt_n3 = rheology.all_tests_n(df_n3)
+
+    txt = [txt_n1, txt_n2, txt_n3]
+    name = ["n1 Crossover Strain [%]", "n2 Crossover Strain [%]", "n3 Crossover Strain [%]"]
+
+    rheology.crossover(group, name)
+    rheology.crossover(group, name, bootstrap=2000, noise=0.02)
+    '''
+    co = crossover_n(group, cotype, protocol) # crossover for every n at once
+
+    co_df = pd.DataFrame(co).transpose() # turn array of crossovers into dataframe
+
+    k, x = _crossover_sweep(cotype, protocol)
+    co_df['Test'] = ['%s Sweep %d' % ('Strain' if cotype==1 else 'Frequency', k)] # add test title
+
+    co_df = co_df.set_index(co_df['Test']) # change test title to index
+    co_df = co_df.drop(['Test'], axis=1) # remove extra test title column
+
+    for i in range(len(name)):
+        co_df = co_df.rename(columns={i: name[i]}) # add names of columns for each n
+
+    co_df['Mean'] = co_df.mean(axis=1) # calculate the mean of each row
+
+    if bootstrap:
+        sweeps = stack_tests(group, k, [x, 'Storage Modulus', 'Loss Modulus'])
+        ci = bootstrap_batch(sweeps, lambda s, rows: crossover_batch(s[..., 0], s[..., 1], s[..., 2], cotype),
+                             bootstrap, confidence, noise, seed)
+        co_df['CI Low'] = ci['CI Low']
+        co_df['CI High'] = ci['CI High']
+    return co_df # return final dataframe summarizing crossover points
+
+
+def recovery_start(sample, protocol=PROTOCOL):
+    '''
+    This function returns the row labels recovery time is measured from in
+    the cyclic strain sweep of a sample, the last high strain point of each
+    cycle in the protocol (ex. [1081, 1727, 2373, 3019] for the example
+    exports).
+
+    Parameters
+    ----------
+    sample : dictionary from rheology.all_tests_n
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol)
+
+    Example
+    -------
+    txt_n1 = rheology.all_tests_n('exampledata/TXT_N1.csv')
+
+    start = rheology.recovery_start(txt_n1)
+    '''
+    k = protocol_test('cyclic strain sweep', protocol)
+    return [int(i) for i in sample[k].index[protocol['tests'][k]['start']]]
+
+
+def recovery_step1(group, rtype=1, protocol=PROTOCOL):
+    '''
+    (Step 1/4) This function returns a dictionary of dataframes indicating recovery entry and indexes for each entry
+    from cyclic strain sweep in Jenny Bennett's overall rheology test for shear-thinning PXP hydrogels.
+
+    Parameters
+    ----------
+    group : list of dictionaries
+        each dictionary is from a single n processed in rheology.all_tests_n(df)
+        the list includes one dictionary per n
+
+    rtype : int
+        1 (t1/2 recovery time) or 2 (crossover)
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol) with the low and high
+        strain windows of the cyclic strain sweep
+
+    Example
+    -------
+    txt_n1 = rheology.all_tests_n(df_n1)
+    txt_n2 = rheology.all_tests_n(df_n2)
+    txt_n3 = rheology.all_tests_n(df_n3)
+
+    txt = [txt_n1, txt_n2, txt_n3]
+
+    rheology.recovery_step1(txt)
+    '''
+    k = protocol_test('cyclic strain sweep', protocol)
+    cycle = protocol['tests'][k]
+
+    css = {} # scratch copies of each cyclic strain sweep, the group is not modified
+    for n,g in zip(range(len(group)), group):
+        css[n] = g[k].copy()
+
+        sm = []
+        for low, high in zip(cycle['low'], cycle['high']):
+            for s, e in (low, high):
+                sm.append(css[n][s:e]['Storage Modulus'].mean()) # average G' from interval
+
+        sm_half =[]
+        for i in range(0, len(sm), 2):
+            sm_half.append((sm[i] - sm[i+1]) / 2) # half the average G' from difference between intial low and high strain
+
+        # each G' 1/2 runs to the end of the recovery after its high strain period
+        lengths = np.diff(np.concatenate(([0], cycle['end'])))
+        sm_half_array = np.repeat(sm_half, lengths)
+
+        css[n]['sm_half'] = sm_half_array # insert new column into df to include half G' value
+
+        if rtype==1:
+            css[n]['position'] = css[n]['Storage Modulus'] > css[n]['sm_half'] # flag where G' > initial G' 1/2
+        else:
+            css[n]['position'] = css[n]['Storage Modulus'] > css[n]['Loss Modulus'] # flag where G' > G"
+
+        css[n]['pre_position'] = css[n]['position'].shift(1) # flag next entry
+        css[n]['crossover'] = np.where(css[n]['position'] == css[n]['pre_position'], False, True) # flag where it tansitions
+
+    rt = {} # empty recovery dictionary
+    for n in range(len(group)):
+        rt_in = css[n].loc[css[n]['crossover'] == True] # locate where G' > initial G' 1/2 or G' > G"
+        rt_in2 = rt_in.dropna() # drop NaN rows
+        rt[n] = rt_in2[rt_in2.Strain < 400] # include only 5% strain intervals
+
+    indexes = [] # empty list for indexes
+    for n in range(len(group)):
+        indexes_n = []
+        for i in range(len(rt[n])):
+            indexes_n.append(rt[n][i:i+1].index.values[0]) # find index for first entry
+        indexes.append(indexes_n)
+
+    return rt, indexes # return recovery time dicitonary of dataframes and indexes
+
+
+def recovery_step2(rtime_l, rtime_h, rtime_start, rtype=1):
+    '''
+    (Step 2/4) This function interpolates between high and low values for t1/2 recovery time in Jenny Bennett's
+    overall rheology test for shear-thinning PXP hydrogels.
+
+    Parameters
+    ----------
+    rtime_l : dictionary containing recovery time low entries for interpolation
+
+    rtime_h : dictionary containing recovery time high entries for interpolation
+
+    rtime_start : dictionary containing recovery time first entries for start time
+
+    rtype : int
+        1 (t1/2 recovery time) or 2 (crossover)
+
+    Example
+    -------
+    rtime_l = {}
+    rtime_h = {}
+    rtime_start = {}
+
+    j = 0
+    ind = indexes[n]
+    for i,s in zip(ind,start):
+        rtime_l[j] = pd.DataFrame(rt[n].loc[i]).transpose()
+        rtime_start[j] = pd.DataFrame(g[5].loc[s]).transpose()
+        if rtime_l[j]['Meas. Pts.'].values > 2:
+            index = i - 1
+            rtime_h[j] = pd.DataFrame(g[5].loc[index]).transpose()
+        else:
+            rtime_h[j] = pd.DataFrame(g[5].loc[s]).transpose()
+
+    rheology.recovery_step2(rtime_l, rtime_h, rtime_start)
+    '''
+    a_x = rtime_h['Time'].values # define high x value
+    a_y = rtime_h['Storage Modulus'].values # define high y value
+    a_z = rtime_h['Loss Modulus'].values # define high z value
+
+    c_x = rtime_l['Time'].values # define low x value
+    c_y = rtime_l['Storage Modulus'].values # define low y value
+    c_z = rtime_l['Loss Modulus'].values # define low z value
+
+    sm_half = rtime_l['sm_half'].values # define G' 1/2
+
+    # use solver to interpolate for recovery time
+
+    if rtype==1:
+        def f(w):
+            b_x = w[0] # recovery time
+            b_y = w[1] # storage modulus
+
+            range_x = c_x[0] - a_x[0] # range between high and low x values (linear scale)
+            range_y = np.log10(c_y[0] - a_y[0]) # range between high and low y values (log scale)
+
+            # 2 equations and 2 unknowns
+            f1 = b_y - a_y[0] - 10**(range_y * (b_x - a_x[0]) / range_x)
+            f2 = b_y - sm_half[0]
+
+            return(f1, f2)
+
+        result = _fsolve(f, [c_x[0], c_y[0]]) # use high values for guess
+
+    else:
+        def f(w):
+            b_x = w[0] # recovery time
+            b_y = w[1] # storage modulus
+            b_z = w[2] # loss modulus
+
+            range_x = c_x[0] - a_x[0] # range between high and low x values (linear scale)
+            range_y = np.log10(c_y[0] - a_y[0]) # range between high and low y values (log scale)
+
+            # 3 equations and 3 unknowns
+            f1 = b_y - a_y[0] - 10**(range_y * (b_x - a_x[0]) / range_x)
+
+            if a_z[0] < c_z[0]:
+                range_z = np.log10(c_z[0] - a_z[0]) # range between high and low y values (log scale)
+                f2 = b_z - a_z[0] - 10**(range_z * (b_x - a_x[0]) / range_x)
+            else:
+                range_z = np.log10(a_z[0] - c_z[0]) # range between high and low y values (log scale)
+                f2 = b_z - a_z[0] + 10**(range_z * (b_x - a_x[0]) / range_x)
+
+            f3 = b_y - b_z
+
+            return(f1, f2, f3)
+
+        g_x = (a_x[0]+c_x[0])/2
+        g_y = (a_y[0]+c_y[0])/2
+        g_z = (a_z[0]+c_z[0])/2
+
+        result = _fsolve(f, [c_x[0], c_y[0], c_z[0]]) # use avg values for guess
+
+    crossover = result[0] # return recovery time
+
+    start = rtime_start['Time'].values # define where time starts for interval
+    recovery = crossover - start[0] # subtract initial time
+    return recovery
+
+
+def recovery_step3(indexes, start, rt, group, rtype=1, protocol=PROTOCOL):
+    '''
+    (Step 3/4) This function returns a list of t1/2 recovery times from each n in cyclic strain test from
+    Jenny Bennett's overall rheology test for shear-thinning PXP hydrogels.
+
+    Parameters
+    ----------
+    indexes : list of indexes for each entry
+
+    start : list of indexes where each interval starts
+
+    rt : dictionary of dataframes indicating recovery entry
+
+    group : list of dictionaries
+        each dictionary is from a single n processed in rheology.all_tests_n(df)
+        the list includes one dictionary per n
+
+    rtype : int
+        1 (t1/2 recovery time) or 2 (crossover)
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol)
+
+    Example
+    -------
+    txt_n1 = rheology.all_tests_n(df_n1)
+    txt_n2 = rheology.all_tests_n(df_n2)
+    txt_n3 = rheology.all_tests_n(df_n3)
+
+    txt = [txt_n1, txt_n2, txt_n3]
+
+    start = rheology.recovery_start(txt_n1)
+
+    rt, indexes = rheology.recovery_step1(txt)
+
+    rheology.recovery_step3(indexes, start, rt, txt)
+    '''
+    k = protocol_test('cyclic strain sweep', protocol)
+    rtime_all = [] # empty list for average recovery from all 4 intervals
+    for n,g in zip(range(len(group)), group):
+        rtime_l = {} # empty dictionary for low recovery time
+        rtime_h = {} # empty dictionary for high recovery time
+        rtime_start = {} # empty dictionary for recover time start
+        recovery_fulltest = [] # empty list for storing each interval
+
+        j = 0
+        ind = indexes[n]
+        for i,s in zip(ind,start):
+            rtime_l[j] = pd.DataFrame(rt[n].loc[i]).transpose() # low value
+            rtime_start[j] = pd.DataFrame(g[k].loc[s]).transpose() # start value
+            if rtime_l[j]['Meas. Pts.'].values > 2: # if greater then first measuring pt
+                index = i - 1
+                rtime_h[j] = pd.DataFrame(g[k].loc[index]).transpose() # use previous entry as high value
+            else:
+                rtime_h[j] = pd.DataFrame(g[k].loc[s]).transpose() # use start value as high value
+
+            rec = recovery_step2(rtime_l[j], rtime_h[j], rtime_start[j], rtype) # recovery from step 2
+            recovery_fulltest.append(rec) # store recovery in list
+
+            j = j + 1
+
+            rec_time = np.average(recovery_fulltest) # take average of recovery from all intervals
+
+        rtime_all.append(rec_time) # add average to final list
+
+    return rtime_all # return list of recovery times for each n
+
+
+def _window_means(a, windows):
+    '''
+    Returns the NaN-skipping mean of a (samples x points) over each (start,
+    end) window as a (samples x windows) array, using one cumulative sum.
+    '''
+    valid = ~np.isnan(a)
+    total = np.zeros((a.shape[0], a.shape[1] + 1))
+    count = np.zeros((a.shape[0], a.shape[1] + 1))
+    np.cumsum(np.where(valid, a, 0), axis=1, out=total[:, 1:])
+    np.cumsum(valid, axis=1, out=count[:, 1:])
+
+    starts = np.array([w[0] for w in windows])
+    ends = np.array([w[1] for w in windows])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (total[:, ends] - total[:, starts]) / (count[:, ends] - count[:, starts])
+
+
+def _first_flips(position, cycle):
+    '''
+    Returns the position of the first change of position (..., points) at or
+    after the first point of each recovery period of the cyclic strain sweep
+    (..., cycles), and whether there is one before the period ends. Where
+    there is none the first point of the period is returned.
+    '''
+    points = position.shape[-1]
+    first = np.array([h[1] for h in cycle['high']]) # first point of each recovery
+    last = np.array(cycle['end'])
+
+    flip = np.zeros(position.shape, dtype=bool)
+    flip[..., 1:] = position[..., 1:] != position[..., :-1]
+    index = np.where(flip, np.arange(points), points)
+    next_flip = np.minimum.accumulate(index[..., ::-1], axis=-1)[..., ::-1]
+    low = next_flip[..., first]
+    found = low < last
+    return np.where(found, low, first), found
+
+
+def recovery_fractions_batch(time, storage, fractions=(0.1, 0.25, 0.5, 0.75, 0.9), start=None, protocol=PROTOCOL,
+                             block=2**22):
+    '''
+    This function returns the time G' takes to recover past several
+    thresholds after every high strain period of the cyclic strain sweep,
+    for many samples at once. The threshold of a fraction f is f times the
+    difference between average G' at low and high strain (f = 0.5 is the
+    G' 1/2 of the t1/2 recovery time), and every fraction is found in the
+    same pass over the data: the threshold crossings of all fractions are
+    located together and interpolated as in recovery_step2.
+
+    Parameters
+    ----------
+    time : numpy array (samples x points)
+        time [s] from the cyclic strain sweep (test 5)
+
+    storage : numpy array (samples x points)
+        storage modulus G'
+
+    fractions : list, float
+        fractions of the low - high strain G' difference, ex. [0.1, 0.5, 0.9]
+
+    start : numpy array (samples x cycles) (optional)
+        positions in the segment where time is measured from for each cycle,
+        defaults to the last point of each high strain period
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol)
+
+    block : int
+        most points times fractions handled at once, bounds memory
+
+    Returns
+    -------
+    recovery : numpy array (samples x cycles x fractions)
+        recovery time [s] to each threshold, NaN where G' does not reach it
+
+    Example
+    -------
+    css = rheology.stack_tests(txt, 5, ['Time', 'Storage Modulus', 'Loss Modulus'])
+
+    rheology.recovery_fractions_batch(css[..., 0], css[..., 1], [0.1, 0.5, 0.9])
+    '''
+    time = np.atleast_2d(time)
+    storage = np.atleast_2d(storage)
+    fractions = np.atleast_1d(np.asarray(fractions, dtype=np.float64))
+    samples, points = storage.shape
+    cycle = protocol['tests'][protocol_test('cyclic strain sweep', protocol)]
+    cycles = len(cycle['high'])
+    if start is None:
+        start = np.broadcast_to(cycle['start'], (samples, cycles))
+    start = np.asarray(start)
+
+    with stage('recovery_fractions', rows=samples):
+        # thresholds (samples x fractions x cycles) from the low and high strain means
+        sm = _window_means(storage, cycle['low'] + cycle['high'])
+        level = fractions[:, None] * (sm[:, None, :cycles] - sm[:, None, cycles:])
+
+        # each cycle's threshold runs to the end of its recovery
+        last = np.array(cycle['end'])
+        lengths = np.diff(np.concatenate(([0], last)))
+        t0 = np.take_along_axis(time, start, axis=1)[:, None, :]
+        recovery = np.empty((samples, len(fractions), cycles))
+        size = max(1, block // max(points * len(fractions), 1)) # samples per pass
+        for i in range(0, samples, size):
+            part = slice(i, i + size)
+            threshold = np.full(level[part].shape[:2] + (points,), np.nan)
+            threshold[..., :last[-1]] = np.repeat(level[part], lengths, axis=2)
+
+            g = storage[part, None, :]
+            low, found = _first_flips(g > threshold, cycle) # flag where G' > threshold
+            high = low - 1 # entry just before the transition
+
+            def pick(a, j):
+                return np.take_along_axis(a, j, axis=2)
+
+            x = time[part, None, :]
+            a_x, c_x = pick(x, high), pick(x, low)
+            a_y, c_y = pick(g, high), pick(g, low)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                # G' is interpolated on a log scale against linear time
+                frac = np.log(level[part] - a_y) / np.log(c_y - a_y)
+            rec = a_x + frac * (c_x - a_x) - t0[part]
+            rec[~found] = np.nan
+            recovery[part] = rec
+
+    return recovery.transpose(0, 2, 1)
+
+
+def recovery_batch(time, storage, loss, rtype=1, start=None, protocol=PROTOCOL):
+    '''
+    This function returns the recovery time after every high strain period of
+    the cyclic strain sweep for many samples at once (no fsolve, no one-row
+    dataframes). Interval means, G' 1/2 thresholds and threshold crossings are
+    computed with array operations and the interpolation of recovery_step2 is
+    solved directly.
+
+    Parameters
+    ----------
+    time : numpy array (samples x points)
+        time [s] from the cyclic strain sweep (test 5)
+
+    storage : numpy array (samples x points)
+        storage modulus G'
+
+    loss : numpy array (samples x points)
+        loss modulus G"
+
+    rtype : int
+        1 (t1/2 recovery time) or 2 (crossover)
+
+    start : numpy array (samples x cycles) (optional)
+        positions in the segment where time is measured from for each cycle,
+        defaults to the last point of each high strain period
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol) with the low and high
+        strain windows of the cyclic strain sweep
+
+    Returns
+    -------
+    recovery : numpy array (samples x cycles)
+        recovery time [s] of each cycle, NaN where G' does not recover
+
+    Example
+    -------
+    css = rheology.stack_tests(txt, 5, ['Time', 'Storage Modulus', 'Loss Modulus'])
+
+    rheology.recovery_batch(css[..., 0], css[..., 1], css[..., 2])
+    '''
+    time = np.atleast_2d(time)
+    storage = np.atleast_2d(storage)
+    loss = np.atleast_2d(loss)
+    if rtype==1:
+        # G' 1/2: half the difference between average G' at low and high strain
+        return recovery_fractions_batch(time, storage, [0.5], start, protocol)[..., 0]
+
+    samples, points = storage.shape
+    cycle = protocol['tests'][protocol_test('cyclic strain sweep', protocol)]
+    if start is None:
+        start = np.broadcast_to(cycle['start'], (samples, len(cycle['high'])))
+    start = np.asarray(start)
+
+    low, found = _first_flips(storage > loss, cycle) # flag where G' > G"
+    high = low - 1 # entry just before the transition
+
+    def pick(a, i):
+        return np.take_along_axis(a, i, axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        frac = _loglog_root(pick(storage, high), pick(loss, high), pick(storage, low), pick(loss, low))
+
+    a_x = pick(time, high)
+    recovery = a_x + frac * (pick(time, low) - a_x) - pick(time, start)
+    recovery[~found] = np.nan
+    return recovery
+
+
+def _start_positions(group, k, start):
+    '''
+    Returns the positions (n x cycles) of the start labels in test k of
+    every n in a group. Raises ValueError naming any label that is not in
+    the test, which get_indexer would give as -1 (the last point).
+    '''
+    positions = np.array([g[k].index.get_indexer(start) for g in group]) # labels to positions
+    missing = sorted(set(np.asarray(start)[np.any(positions < 0, axis=0)].tolist()))
+    if missing:
+        raise ValueError('start labels %s not in test %d' % (missing, k))
+    return positions
+
+
+def recovery_n(group, rtype=1, start=None, protocol=PROTOCOL):
+    '''
+    This function returns the recovery time of every cycle of every n in a
+    group as an array (n x cycles), using rheology.recovery_batch. The group
+    is only read.
+
+    Parameters
+    ----------
+    group : list of dictionaries
+        each dictionary is from a single n processed in rheology.all_tests_n(df)
+
+    rtype : int
+        1 (t1/2 recovery time) or 2 (crossover)
+
+    start : list of indexes where each interval starts (optional)
+        defaults to the last point of each high strain period
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol)
+    '''
+    k = protocol_test('cyclic strain sweep', protocol)
+    with stage('recovery', rows=len(group)):
+        css = stack_tests(group, k, ['Time', 'Storage Modulus', 'Loss Modulus'])
+        if start is not None:
+            start = _start_positions(group, k, start)
+
+        return recovery_batch(css[..., 0], css[..., 1], css[..., 2], rtype, start, protocol)
+
+
+def _segment_sums(a, bounds):
+    '''
+    Returns the sums of a (samples x points) over each (first, end) segment
+    as a (samples x segments) array. The segments must be in order and not
+    overlap.
+    '''
+    edges = np.array([e for b in bounds for e in b])
+    total = np.zeros((a.shape[0], a.shape[1] + 1))
+    np.cumsum(a, axis=1, out=total[:, 1:])
+    return total[:, edges[1::2]] - total[:, edges[0::2]]
+
+
+def recovery_kinetics_batch(time, storage, loss, model='stretched', start=None, protocol=PROTOCOL):
+    '''
+    This function returns the recovery kinetics of every cycle of the cyclic
+    strain sweep for many samples at once, instead of one t1/2 averaged over
+    the cycles: the t1/2 and crossover recovery times (rheology.recovery_batch),
+    the pre-yield G' (low strain window before each high strain period), the
+    recovered G' (the last points of each recovery period), their ratio and a
+    recovery time constant fitted to
+
+        G'(t) = G'r - (G'r - G'0) exp(-(t/tau)^beta)
+
+    where G'0 is G' at the start of the recovery and G'r the recovered G'.
+    The fit is linear in log log space over the points between 5% and 95%
+    recovered, so every cycle of every sample is fitted from running sums in
+    the same pass.
+
+    Parameters
+    ----------
+    time : numpy array (samples x points)
+        time [s] from the cyclic strain sweep (test 5)
+
+    storage : numpy array (samples x points)
+        storage modulus G'
+
+    loss : numpy array (samples x points)
+        loss modulus G"
+
+    model : str
+        'stretched' (tau and beta fitted) or 'exponential' (beta = 1)
+
+    start : numpy array (samples x cycles) (optional)
+        positions in the segment where time is measured from for each cycle,
+        defaults to the last point of each high strain period
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol)
+
+    Returns
+    -------
+    kinetics : dictionary of numpy arrays (samples x cycles)
+        't1/2 [s]', 'Recovery Crossover [s]', "Pre-Yield G' [Pa]",
+        "Recovered G' [Pa]", 'Recovered Fraction' (of the cycle's pre-yield
+        G'), 'Retained Fraction' (of the first pre-yield G', fatigue across
+        cycles), 'Tau [s]' and 'Beta'
+
+    Example
+    -------
+    css = rheology.stack_tests(txt, 5, ['Time', 'Storage Modulus', 'Loss Modulus'])
+
+    rheology.recovery_kinetics_batch(css[..., 0], css[..., 1], css[..., 2])['Retained Fraction']
+    '''
+    if model not in ('stretched', 'exponential'):
+        raise ValueError("model is 'stretched' or 'exponential', not %r" % (model,))
+    time = np.atleast_2d(time)
+    storage = np.atleast_2d(storage)
+    loss = np.atleast_2d(loss)
+    samples, points = storage.shape
+    cycle = protocol['tests'][protocol_test('cyclic strain sweep', protocol)]
+    cycles = len(cycle['high'])
+    if start is None:
+        start = np.broadcast_to(cycle['start'], (samples, cycles))
+    start = np.asarray(start)
+
+    kinetics = {'t1/2 [s]': recovery_batch(time, storage, loss, 1, start, protocol),
+                'Recovery Crossover [s]': recovery_batch(time, storage, loss, 2, start, protocol)}
+
+    with stage('recovery_kinetics', rows=samples):
+        # recovered G' over as many points as the last low strain window
+        tail = cycle['low'][-1][1] - cycle['low'][-1][0]
+        recovered = [(e - tail, e) for e in cycle['end']]
+        means = _window_means(storage, cycle['low'] + recovered)
+        pre, final = means[:, :cycles], means[:, cycles:]
+
+        # every recovery period, from the first point after high strain to its end
+        periods = [(h[1], e) for h, e in zip(cycle['high'], cycle['end'])]
+        label = np.full(points, -1)
+        for c, (first, end) in enumerate(periods):
+            label[first:end] = c
+        inside = label >= 0
+        column = np.where(inside, label, 0)
+
+        t0 = np.take_along_axis(time, start, axis=1)
+        g0 = np.take_along_axis(storage, start, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t = time - t0[:, column]
+            u = (final[:, column] - storage) / (final - g0)[:, column] # fraction still to recover
+            fit = inside & (t > 0) & (u > 0.05) & (u < 0.95)
+            x = np.where(fit, np.log(t), 0)
+            y = np.where(fit, np.log(-np.log(u)), 0) # = beta ln t - beta ln tau
+
+        n = _segment_sums(fit.astype(np.float64), periods)
+        sx, sy = _segment_sums(x, periods), _segment_sums(y, periods)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if model == 'stretched':
+                sxx, sxy = _segment_sums(x * x, periods), _segment_sums(x * y, periods)
+                beta = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+            else:
+                beta = np.ones((samples, cycles))
+            ln_tau = (sx - sy / beta) / n
+        enough = n >= 3
+
+        kinetics["Pre-Yield G' [Pa]"] = pre
+        kinetics["Recovered G' [Pa]"] = final
+        with np.errstate(invalid='ignore', divide='ignore'):
+            kinetics['Recovered Fraction'] = final / pre
+            kinetics['Retained Fraction'] = final / pre[:, :1]
+        kinetics['Tau [s]'] = np.where(enough, np.exp(ln_tau), np.nan)
+        kinetics['Beta'] = np.where(enough, beta, np.nan)
+    return kinetics
+
+
+def recovery_kinetics_n(group, model='stretched', start=None, protocol=PROTOCOL):
+    '''
+    This function returns the recovery kinetics of every cycle of every n in
+    a group (rheology.recovery_kinetics_batch) as a dictionary of arrays
+    (n x cycles). The group is only read.
+
+    Parameters
+    ----------
+    group : list of dictionaries
+        each dictionary is from a single n processed in rheology.all_tests_n(df)
+
+    model : str
+        'stretched' or 'exponential' recovery
+
+    start : list of indexes where each interval starts (optional)
+        defaults to the last point of each high strain period
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol)
+    '''
+    k = protocol_test('cyclic strain sweep', protocol)
+    css = stack_tests(group, k, ['Time', 'Storage Modulus', 'Loss Modulus'])
+    if start is not None:
+        start = _start_positions(group, k, start)
+    return recovery_kinetics_batch(css[..., 0], css[..., 1], css[..., 2], model, start, protocol)
+
+
+def _cycle_index(group, name, cycles):
+    '''
+    Returns the (n, Cycle) index of a per cycle table of a group. Raises
+    ValueError unless there is one name per n.
+    '''
+    name = list(name)
+    if len(name) != len(group):
+        raise ValueError('%d names for %d samples, give one name per n' % (len(name), len(group)))
+    return pd.MultiIndex.from_product([name, range(1, cycles + 1)], names=['n', 'Cycle'])
+
+
+def recovery_kinetics(group, name, model='stretched', start=None, protocol=PROTOCOL):
+    '''
+    This function returns a dataframe of the recovery kinetics of every cycle
+    of the cyclic strain sweep for every n in a group, one row per n and
+    cycle, for following fatigue across the cycles.
+
+    Parameters
+    ----------
+    group : list of dictionaries
+        each dictionary is from a single n processed in rheology.all_tests_n(df)
+
+    name : list, str
+        names of the ns, ex. ['n1', 'n2', 'n3']
+
+    model : str
+        'stretched' or 'exponential' recovery
+
+    start : list of indexes where each interval starts (optional)
+        defaults to the last point of each high strain period
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol)
+
+    Example
+    -------
+    txt = [txt_n1, txt_n2, txt_n3]
+
+    kin = rheology.recovery_kinetics(txt, ['n1', 'n2', 'n3'])
+    kin['Retained Fraction'].unstack() # one column per cycle
+    '''
+    kinetics = recovery_kinetics_n(group, model, start, protocol)
+    cycles = next(iter(kinetics.values())).shape[1]
+    index = _cycle_index(group, name, cycles)
+    return pd.DataFrame({k: v.ravel() for k, v in kinetics.items()}, index=index)
+
+
+def recovery_fractions_n(group, fractions=(0.1, 0.25, 0.5, 0.75, 0.9), start=None, protocol=PROTOCOL):
+    '''
+    This function returns the recovery time of every n in a group to each
+    fraction of its low - high strain G' difference, after every cycle
+    (rheology.recovery_fractions_batch), as an array (n x cycles x
+    fractions). The group is only read.
+
+    Parameters
+    ----------
+    group : list of dictionaries
+        each dictionary is from a single n processed in rheology.all_tests_n(df)
+
+    fractions : list, float
+        fractions of the low - high strain G' difference, ex. [0.1, 0.5, 0.9]
+
+    start : list of indexes where each interval starts (optional)
+        defaults to the last point of each high strain period
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol)
+    '''
+    k = protocol_test('cyclic strain sweep', protocol)
+    css = stack_tests(group, k, ['Time', 'Storage Modulus'])
+    if start is not None:
+        start = _start_positions(group, k, start)
+    return recovery_fractions_batch(css[..., 0], css[..., 1], fractions, start, protocol)
+
+
+def recovery_profile(group, name, fractions=(0.1, 0.25, 0.5, 0.75, 0.9), start=None, protocol=PROTOCOL):
+    '''
+    This function returns a dataframe of the recovery times of every cycle of
+    the cyclic strain sweep for every n in a group, one row per n and cycle
+    and one column per fraction of recovery (t10 [s], t50 [s], ...). The t50
+    column is the t1/2 recovery time of rheology.recovery.
+
+    Parameters
+    ----------
+    group : list of dictionaries
+        each dictionary is from a single n processed in rheology.all_tests_n(df)
+
+    name : list, str
+        names of the ns, ex. ['n1', 'n2', 'n3']
+
+    fractions : list, float
+        fractions of the low - high strain G' difference, ex. [0.1, 0.5, 0.9]
+
+    start : list of indexes where each interval starts (optional)
+        defaults to the last point of each high strain period
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol)
+
+    Example
+    -------
+    txt = [txt_n1, txt_n2, txt_n3]
+
+    prof = rheology.recovery_profile(txt, ['n1', 'n2', 'n3'], [0.1, 0.5, 0.9])
+    prof['t90 [s]'].unstack() # one column per cycle
+    '''
+    fractions = np.atleast_1d(fractions)
+    times = recovery_fractions_n(group, fractions, start, protocol)
+    cycles = times.shape[1]
+    index = _cycle_index(group, name, cycles)
+    columns = ['t%g [s]' % (100 * f) for f in fractions]
+    return pd.DataFrame(times.reshape(-1, len(fractions)), index=index, columns=columns)
+
+
+def _cycle_mean(cycles):
+    '''
+    Returns the average recovery time of each n (rows of cycles) over the
+    cycles G' recovered after, NaN only where it recovered after none, so
+    one cycle that does not recover (NaN) does not hide the others.
+    '''
+    cycles = np.asarray(cycles, dtype=np.float64)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning) # mean of no recovered cycles
+        return np.nanmean(cycles, axis=-1)
+
+
+def recovery(start, group, name, rtype=1, protocol=PROTOCOL, bootstrap=None, confidence=0.95, noise=None,
+             seed=None):
+    '''
+    (Step 4/4) This function returns a dataframe summarizing t1/2 recovery time for Jenny Bennett's overall
+    rheology test for shear-thinning PXP hydrogels. (cyclic strain sweep)
+    Each n is averaged over the cycles it recovered after,
+    it is NaN only if it recovered after none.
+
+    Parameters
+    ----------
+    start : list of indexes where each interval starts
+        None measures from the last high strain point of each cycle in the
+        protocol (rheology.recovery_start)
+
+    group : list of dictionaries
+        each dictionary is from a single n processed in rheology.all_tests_n(df)
+        the list includes one dictionary per n
+
+    name : list, str
+        names for the output dataframe columns
+
+    rtype : int
+        1 (t1/2 recovery time) or 2 (crossover)
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol)
+
+    bootstrap : int (optional)
+        number of bootstrap resamples, adds 'CI Low' and 'CI High' columns
+        with a percentile interval of the mean (rheology.bootstrap_batch)
+
+    confidence : float
+        level of the bootstrap interval
+
+    noise : float (optional)
+        relative measurement noise added to G' and G" in every resample,
+        ex. 0.02, None resamples replicates only
+
+    seed : int (optional)
+        seed of the bootstrap, for repeatable intervals
+
+    Example
+    -------
+    start = None
+
+    txt_n1 = rheology.all_tests_n(df_n1)
+    txt_n2 = rheology.all_tests_n(df_n2)
+    txt_n3 = rheology.all_tests_n(df_n3)
+
+    txt = [txt_n1, txt_n2, txt_n3]
+
+    name = ['n1 t1/2 [s]', 'n2 t1/2 [s]', 'n3 t1/2 [s]']
+
+    rheology.recovery(start, txt, name)
+    rheology.recovery(start, txt, name, bootstrap=2000, noise=0.02)
+    '''
+    cycles = recovery_n(group, rtype, start, protocol) # recovery time of each interval for each n
+    recovery = _cycle_mean(cycles) # take average over the recovered intervals for each n
+    rec_df = pd.DataFrame(recovery).transpose() # place in dataframe
+    rec_df['Test'] = ['Cyclic Strain Sweep %d' % protocol_test('cyclic strain sweep', protocol)] # rename test
+
+    rec_df = rec_df.set_index(rec_df['Test'])
+    rec_df = rec_df.drop(['Test'], axis=1)
+
+    for i in range(len(name)):
+        rec_df = rec_df.rename(columns={i: name[i]}) # add names for columns (n1, n2, etc.)
+
+    rec_df['Mean'] = rec_df.mean(axis=1) # find mean for recovery time
+
+    if bootstrap:
+        k = protocol_test('cyclic strain sweep', protocol)
+        sweeps = stack_tests(group, k, ['Time', 'Storage Modulus', 'Loss Modulus'])
+        if start is not None:
+            start = _start_positions(group, k, start)
+
+        def metric(s, rows):
+            cycles = recovery_batch(s[..., 0], s[..., 1], s[..., 2], rtype,
+                                    None if start is None else start[rows], protocol)
+            return _cycle_mean(cycles) # average over the recovered intervals, as above
+
+        ci = bootstrap_batch(sweeps, metric, bootstrap, confidence, noise, seed)
+        rec_df['CI Low'] = ci['CI Low']
+        rec_df['CI High'] = ci['CI High']
+    return rec_df # return dataframe with recovery time
+
+
+METRIC_COLUMNS = ["G' [Pa]", 'Crossover Strain [%]', 'Crossover Frequency [rad/s]',
+                  't1/2 [s]', 'Recovery Crossover [s]', 'Flow Index', 'Consistency [Pa*s^n]',
+                  'Flow Index R2', 'Flow Index Valid', 'Zero Shear Viscosity [Pa*s]']
+
+# columns of the result tables of rheology.batch_analyze, one row per export
+RESULT_COLUMNS = ['Formulation', 'Replicate', 'File'] + METRIC_COLUMNS + ['Error']
+
+
+def group_metrics(group, workers=1, adaptive=False, protocol=PROTOCOL):
+    '''
+    This function returns the average storage modulus, strain and frequency
+    crossover, t1/2 recovery time, crossover recovery time and shear thinning
+    fit (rheology.flow_metrics) of every n in a group, one row per n. The
+    recovery times are averaged over the cycles G' recovered after. The
+    analysis functions only read the group, so with workers > 1 the metrics
+    are computed at the same time on a thread pool sharing the same
+    in-memory (or cached) data.
+
+    Parameters
+    ----------
+    group : list of dictionaries
+        each dictionary is from a single n processed in rheology.all_tests_n(df)
+
+    workers : int
+        number of threads
+
+    adaptive : True/False
+        average G' over the plateau each sample reaches in every time sweep
+        (see rheology.storage_modulus)
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol) of the group
+
+    Returns
+    -------
+    metrics : dataframe
+        columns rheology.METRIC_COLUMNS
+
+    Example
+    -------
+    txt = rheology.all_tests('exampledata/TXT_N1.csv', 'exampledata/TXT_N2.csv')
+
+    rheology.group_metrics(txt, workers=4)
+    '''
+    from .fitting import flow_metrics # rheology.fitting imports this module
+
+    tasks = [lambda: storage_modulus(group, protocol, adaptive),
+             lambda: crossover_n(group, 1, protocol),
+             lambda: crossover_n(group, 2, protocol),
+             lambda: _cycle_mean(recovery_n(group, 1, protocol=protocol)),
+             lambda: _cycle_mean(recovery_n(group, 2, protocol=protocol)),
+             lambda: flow_metrics(group, protocol=protocol)]
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            values = list(pool.map(lambda task: task(), tasks))
+    else:
+        values = [task() for task in tasks]
+
+    metrics = dict(zip(METRIC_COLUMNS, values[:-1]))
+    metrics.update(values[-1]) # the flow columns come together
+    return pd.DataFrame(metrics, columns=METRIC_COLUMNS)
+
+
+def _analyze_chunk(jobs, cache_dir=None, protocol=PROTOCOL, profiled=False, adaptive=False):
+    '''
+    Parses a chunk of exports and returns one metric record per export. The
+    crossover and recovery engines run once over the whole chunk. Exports
+    that fail to parse get NaN metrics and the error message. If the
+    analysis of the chunk fails, its exports are analyzed one at a time and
+    those that fail get the error the same way. profiled=True
+    records the chunk's stages (in a worker process) and returns them too,
+    as (records, events). adaptive=True reports the adaptive plateau G'.
+    '''
+    if profiled:
+        with Profile() as prof:
+            records = _analyze_chunk(jobs, cache_dir, protocol, adaptive=adaptive)
+        return records, prof.events
+
+    records = []
+    group = []
+    for formulation, replicate, path in jobs:
+        record = {'Formulation': formulation, 'Replicate': replicate, 'File': str(path), 'Error': ''}
+        try:
+            sample = all_tests_n(path, cache_dir, protocol=protocol)
+            missing = [k for k in protocol['tests'] if k not in sample]
+            if missing:
+                raise ValueError('incomplete export, tests %s missing' % missing)
+            group.append(sample)
+        except Exception as e:
+            record['Error'] = '%s: %s' % (type(e).__name__, e)
+        records.append(record)
+
+    ok = [r for r in records if not r['Error']]
+    if ok:
+        try:
+            metrics = group_metrics(group, adaptive=adaptive, protocol=protocol).to_dict('records')
+        except Exception:
+            # one export the analysis fails on: run them one at a time to find it
+            metrics = []
+            for r, sample in zip(ok, group):
+                try:
+                    metrics.extend(group_metrics([sample], adaptive=adaptive, protocol=protocol).to_dict('records'))
+                except Exception as e:
+                    r['Error'] = '%s: %s' % (type(e).__name__, e)
+                    metrics.append({})
+        for r, m in zip(ok, metrics):
+            r.update(m)
+    for r in records:
+        if r['Error']:
+            r.update(dict.fromkeys(METRIC_COLUMNS, np.nan))
+    return records
+
+
+def batch_analyze(paths, workers=None, chunksize=8, cache_dir=None, adaptive=False, protocol=PROTOCOL):
+    '''
+    This function parses, segments and analyzes any number of exports from
+    Jenny Bennett's overall rheology protocol over a pool of worker processes
+    and returns one tidy table with a row per export: average storage
+    modulus, strain and frequency crossover, t1/2 recovery time and crossover
+    recovery time.
+
+    Parameters
+    ----------
+    paths : dictionary or list
+        {formulation: [paths to csv exports]}, or a plain list of paths
+
+    workers : int (optional)
+        number of worker processes, defaults to the number of CPUs; 1 runs
+        everything in the calling process
+
+    chunksize : int
+        number of exports each worker analyzes together
+
+    cache_dir : str (optional)
+        segment cache directory (see rheology.cached_tests)
+
+    adaptive : True/False
+        average G' over the plateau each sample reaches in every time sweep
+        (see rheology.storage_modulus)
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol) the exports follow
+
+    Returns
+    -------
+    results : dataframe
+        columns Formulation, Replicate, File, Error and rheology.METRIC_COLUMNS
+
+    Example
+    -------
+    paths = {'PXP': ['exampledata/PXP_N1.csv', 'exampledata/PXP_N2.csv'],
+             'T40A': ['exampledata/TXT_N1.csv', 'exampledata/TXT_N2.csv']}
+
+    rheology.batch_analyze(paths, workers=4)
+    '''
+    if not isinstance(paths, dict):
+        paths = {None: paths}
+
+    jobs = []
+    for formulation, files in paths.items():
+        for n, path in enumerate(files):
+            jobs.append((formulation, n+1, path))
+    chunks = [jobs[i:i+chunksize] for i in range(0, len(jobs), chunksize)]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(chunks)))
+
+    records = []
+    with stage('batch_analyze', rows=len(jobs)):
+        if workers == 1:
+            for chunk in chunks:
+                records.extend(_analyze_chunk(chunk, cache_dir, protocol, adaptive=adaptive))
+        else:
+            # the stages run in the workers are passed on to this process's listeners
+            profiled = [listening()]*len(chunks)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for out in pool.map(_analyze_chunk, chunks, [cache_dir]*len(chunks), [protocol]*len(chunks), profiled,
+                                    [adaptive]*len(chunks)):
+                    if profiled[0]:
+                        out, events = out
+                        for event in events:
+                            _emit(event)
+                    records.extend(out)
+
+    return pd.DataFrame(records, columns=RESULT_COLUMNS)
@@ -0,0 +1,636 @@
+import numpy as np
+
+from .analysis import stack_tests
+from .profiling import stage
+from .protocols import PROTOCOL, protocol_test
+
+
+def _levenberg_marquardt(model, p, y, weight, lower=None, upper=None, max_iter=100, tol=1e-6):
+    '''
+    Levenberg-Marquardt least squares for many independent fits at once.
+    model(p, rows) returns the model values (fits x residuals) and their
+    Jacobian (fits x residuals x parameters) for the fits in rows; residuals
+    with weight 0 (missing points) are ignored. Every fit keeps its own
+    damping, and fits that have converged drop out of the batch, so the cost
+    of an iteration follows the fits still running. Parameters are clipped to
+    lower and upper.
+
+    Returns the parameters, the cost (sum of squared weighted residuals), the
+    number of iterations and whether each fit converged.
+    '''
+    p = np.array(p, dtype=np.float64)
+    fits, size = p.shape
+    lower = np.broadcast_to(-np.inf if lower is None else lower, p.shape)
+    upper = np.broadcast_to(np.inf if upper is None else upper, p.shape)
+    p = np.clip(p, lower, upper)
+
+    rows = np.arange(fits)
+    f, J = model(p, rows)
+    r = weight * (f - y)
+    jac = weight[..., None] * J
+    cost = np.einsum('ij,ij->i', r, r)
+
+    damping = np.full(fits, 1e-3)
+    iterations = np.zeros(fits, dtype=int)
+    converged = np.zeros(fits, dtype=bool)
+    active = np.isfinite(cost)
+
+    with stage('levenberg_marquardt', rows=fits) as st:
+        for i in range(max_iter):
+            rows = np.flatnonzero(active)
+            if not rows.size:
+                break
+            iterations[rows] += 1
+            Ja, ra = jac[rows], r[rows]
+
+            # damped normal equations, Marquardt's scaling by the diagonal
+            Jt = Ja.transpose(0, 2, 1)
+            A = Jt @ Ja
+            g = (Jt @ ra[..., None])[..., 0]
+            diag = A.diagonal(axis1=1, axis2=2).copy()
+            A[:, np.arange(size), np.arange(size)] += damping[rows, None] * (diag + 1e-12)
+            step = np.linalg.solve(A, -g[..., None])[..., 0]
+
+            trial = np.clip(p[rows] + step, lower[rows], upper[rows])
+            f_t, J_t = model(trial, rows)
+            r_t = weight[rows] * (f_t - y[rows])
+            cost_t = np.einsum('ij,ij->i', r_t, r_t)
+
+            with np.errstate(invalid='ignore'):
+                better = cost_t < cost[rows] # NaN trials are rejected
+                gain = (cost[rows] - cost_t) <= tol * cost[rows]
+            moved = np.abs(trial - p[rows]).max(axis=1)
+
+            keep = rows[better]
+            p[keep], r[keep], cost[keep] = trial[better], r_t[better], cost_t[better]
+            jac[keep] = weight[keep, :, None] * J_t[better]
+            damping[rows] = np.where(better, damping[rows] / 3, damping[rows] * 2)
+
+            # done when a step no longer improves the fit or no longer moves it
+            done = (better & gain) | (moved < 1e-9)
+            converged[rows[done]] = True
+            active[rows[done | (damping[rows] > 1e12)]] = False
+
+        st.add(iterations=int(iterations.max(initial=0)), unconverged=int((~converged).sum()))
+
+    return p, cost, iterations, converged
+
+
+def _maxwell_model(omega):
+    '''
+    Returns model(p, rows) of ln G' and ln G" of a generalized Maxwell model
+    for rheology._levenberg_marquardt, with p = (ln g_1..ln g_m, ln tau_1..
+    ln tau_m) and the analytic Jacobian. omega is (samples x points).
+    '''
+    def model(p, rows):
+        m = p.shape[1] // 2
+        g = np.exp(p[:, None, :m])
+        x = omega[rows][..., None] * np.exp(p[:, None, m:]) # omega*tau, (fits x points x modes)
+        x2 = x * x
+        d = 1 / (1 + x2)
+        storage_i = g * x2 * d # contribution of each mode
+        loss_i = g * x * d
+        storage = storage_i.sum(axis=2)
+        loss = loss_i.sum(axis=2)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f = np.concatenate((np.log(storage), np.log(loss)), axis=1)
+            # d ln G / d ln g and d ln G / d ln tau for every mode
+            J = np.concatenate((np.concatenate((storage_i, 2 * storage_i * d), axis=2) / storage[..., None],
+                                np.concatenate((loss_i, loss_i * (1 - x2) * d), axis=2) / loss[..., None]),
+                               axis=1)
+        return np.nan_to_num(f), np.nan_to_num(J)
+    return model
+
+
+def _maxwell_start(omega, storage, loss, modes):
+    '''
+    Cold start of rheology.maxwell_batch: relaxation times spread evenly on
+    a log scale over the measured frequencies and the moduli of those modes
+    from a linear least squares fit of G' and G" (relative errors), floored
+    so every ln g is finite.
+    '''
+    with np.errstate(invalid='ignore', divide='ignore'):
+        lo = np.log(1 / np.nanmax(omega, axis=1))
+        hi = np.log(1 / np.nanmin(omega, axis=1))
+    frac = (np.arange(modes) + 0.5) / modes
+    ln_tau = lo[:, None] + frac * (hi - lo)[:, None]
+
+    x = omega[..., None] * np.exp(ln_tau[:, None, :])
+    d = 1 / (1 + x * x)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        K = np.concatenate((x * x * d / storage[..., None], x * d / loss[..., None]), axis=1)
+    K = np.nan_to_num(K, nan=0, posinf=0, neginf=0)
+    A = K.transpose(0, 2, 1) @ K + 1e-12 * np.eye(modes)
+    g = np.linalg.solve(A, K.sum(axis=1)[..., None])[..., 0]
+
+    floor = 1e-3 * np.nanmax(np.fmax(storage, loss), axis=1)
+    g = np.maximum(g, np.nan_to_num(floor, nan=1)[:, None])
+    return np.concatenate((np.log(g), ln_tau), axis=1)
+
+
+def maxwell_batch(omega, storage, loss, modes=3, init=None, warm=1, max_iter=100, tol=1e-6):
+    '''
+    This function fits a generalized Maxwell model (a relaxation spectrum)
+
+        G'(w) = sum g_i (w tau_i)^2 / (1 + (w tau_i)^2)
+        G"(w) = sum g_i w tau_i / (1 + (w tau_i)^2)
+
+    jointly to G' and G" of many frequency sweeps at once. The fits are
+    least squares on ln G' and ln G" (relative errors), solved together by a
+    batched Levenberg-Marquardt with the analytic Jacobian. Fits start from
+    init (ex. the last run of a campaign) where it is closer than the cold
+    start, and with warm > 1 only one sample in every warm (ordered by
+    ln G' - ln G") is fitted from a cold start, the others start from the fit
+    of the nearest of those, rescaled to their own modulus.
+
+    Parameters
+    ----------
+    omega : numpy array (samples x points)
+        angular frequency [rad/s]
+
+    storage : numpy array (samples x points)
+        storage modulus G'
+
+    loss : numpy array (samples x points)
+        loss modulus G"
+
+    modes : int
+        number of Maxwell modes, at most one per decade of frequency measured
+        plus one
+
+    init : dictionary (optional)
+        an earlier result of rheology.maxwell_batch for the same samples, ex.
+        the previous batch of a campaign, used as warm starts where it fits
+        better than the cold start
+
+    warm : int
+        one sample in warm is fitted from a cold start and the rest from its
+        neighbours, 1 fits every sample from a cold start
+
+    max_iter : int
+        most Levenberg-Marquardt iterations
+
+    tol : float
+        relative decrease of the cost below which a fit has converged
+
+    Returns
+    -------
+    maxwell : dictionary
+        'Moduli' g_i [Pa] and 'Relaxation Times' tau_i [s] (samples x modes,
+        shortest tau first), 'RMS' (root mean square of the ln residuals,
+        about the relative error), 'Iterations' and 'Converged' per sample.
+        Samples with too few points are NaN.
+
+    Example
+    -------
+    fs = rheology.stack_tests(txt, 1, ['Angular Frequency', 'Storage Modulus', 'Loss Modulus'])
+
+    rheology.maxwell_batch(fs[..., 0], fs[..., 1], fs[..., 2], modes=3)
+    '''
+    omega = np.atleast_2d(np.asarray(omega, dtype=np.float64))
+    storage = np.atleast_2d(np.asarray(storage, dtype=np.float64))
+    loss = np.atleast_2d(np.asarray(loss, dtype=np.float64))
+    samples = omega.shape[0]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        decades = np.log10(np.nanmax(omega) / np.nanmin(omega)) if np.isfinite(omega).any() else 0
+        y = np.concatenate((np.log(storage), np.log(loss)), axis=1)
+    if not 1 <= modes <= int(decades) + 1:
+        raise ValueError('%d modes for %.1f decades of frequency, use 1 to %d' % (modes, decades, int(decades) + 1))
+
+    valid = np.isfinite(y) & np.isfinite(np.concatenate((omega, omega), axis=1))
+    weight = valid.astype(np.float64)
+    y = np.where(valid, y, 0)
+    omega = np.where(np.isfinite(omega), omega, 1) # masked by weight, kept finite
+    fit = valid.sum(axis=1) >= 2 * modes # enough points for the parameters
+
+    model = _maxwell_model(omega)
+    measured = np.where(fit[:, None] & valid[:, :omega.shape[1]], omega, np.nan)
+    start = _maxwell_start(measured, storage, loss, modes)
+    start[~fit] = 0
+
+    # tau is kept within two decades of 1/omega measured
+    with np.errstate(invalid='ignore', divide='ignore'):
+        lo = np.nan_to_num(-np.log(np.nanmax(measured, axis=1)) - np.log(100))
+        hi = np.nan_to_num(-np.log(np.nanmin(measured, axis=1)) + np.log(100))
+    lower = np.concatenate((np.full((samples, modes), -np.inf), np.repeat(lo[:, None], modes, axis=1)), axis=1)
+    upper = np.concatenate((np.full((samples, modes), np.inf), np.repeat(hi[:, None], modes, axis=1)), axis=1)
+
+    def cost(p, rows):
+        r = weight[rows] * (model(p, rows)[0] - y[rows])
+        return np.einsum('ij,ij->i', r, r)
+
+    rows = np.flatnonzero(fit)
+    with stage('maxwell', rows=rows.size):
+        level = (y * weight).sum(axis=1) / np.maximum(weight.sum(axis=1), 1) # mean ln modulus
+        if init is not None:
+            earlier = np.concatenate((np.log(init['Moduli']), np.log(init['Relaxation Times'])), axis=1)
+            usable = rows[np.isfinite(earlier[rows]).all(axis=1)]
+            closer = cost(earlier[usable], usable) < cost(start[usable], usable)
+            start[usable[closer]] = earlier[usable[closer]]
+
+        # pilot fits spread over the batch, ordered by how elastic the samples are
+        n = valid.shape[1] // 2
+        elastic = ((y[:, :n] - y[:, n:]) * weight[:, :n] * weight[:, n:]).sum(axis=1)
+        elastic = elastic / np.maximum((weight[:, :n] * weight[:, n:]).sum(axis=1), 1)
+        order = rows[np.argsort(elastic[rows], kind='stable')]
+        pilot = order[::max(1, warm)]
+        p, c, it, ok = _levenberg_marquardt(_maxwell_model(omega[pilot]), start[pilot], y[pilot], weight[pilot],
+                                            lower[pilot], upper[pilot], max_iter, tol)
+        params = start.copy()
+        params[pilot] = p
+        costs = np.full(samples, np.nan)
+        iterations = np.zeros(samples, dtype=int)
+        converged = np.zeros(samples, dtype=bool)
+        costs[pilot], iterations[pilot], converged[pilot] = c, it, ok
+
+        rest = np.setdiff1d(order, pilot)
+        if rest.size:
+            # warm start from the nearest pilot, shifted to the sample's modulus
+            near = np.searchsorted(elastic[pilot], elastic[rest]).clip(1, pilot.size) - 1
+            up = (near + 1).clip(max=pilot.size - 1)
+            near = np.where(np.abs(elastic[pilot[up]] - elastic[rest]) < np.abs(elastic[pilot[near]] - elastic[rest]),
+                            up, near)
+            guess = params[pilot[near]].copy()
+            guess[:, :modes] += (level[rest] - level[pilot[near]])[:, None]
+            guess = np.clip(guess, lower[rest], upper[rest])
+            closer = cost(guess, rest) < cost(start[rest], rest)
+            first = np.where(closer[:, None], guess, start[rest])
+
+            p, c, it, ok = _levenberg_marquardt(_maxwell_model(omega[rest]), first, y[rest], weight[rest],
+                                                lower[rest], upper[rest], max_iter, tol)
+            params[rest] = p
+            costs[rest], iterations[rest], converged[rest] = c, it, ok
+
+            # a warm start can settle in another minimum, those fitting worse
+            # than their pilot are fitted again from the cold start
+            worse = rest[closer & (c / weight[rest].sum(axis=1) > 1.05 * costs[pilot[near]] / weight[pilot[near]].sum(axis=1))]
+            if worse.size:
+                p, c, it, ok = _levenberg_marquardt(_maxwell_model(omega[worse]), start[worse], y[worse],
+                                                    weight[worse], lower[worse], upper[worse], max_iter, tol)
+                better = c < costs[worse]
+                params[worse[better]] = p[better]
+                costs[worse[better]], converged[worse[better]] = c[better], ok[better]
+                iterations[worse] += it
+
+    moduli = np.exp(params[:, :modes])
+    times = np.exp(params[:, modes:])
+    shortest = np.argsort(times, axis=1)
+    moduli = np.take_along_axis(moduli, shortest, axis=1)
+    times = np.take_along_axis(times, shortest, axis=1)
+    moduli[~fit] = np.nan
+    times[~fit] = np.nan
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rms = np.sqrt(costs / weight.sum(axis=1))
+    return {'Moduli': moduli, 'Relaxation Times': times, 'RMS': rms,
+            'Iterations': iterations, 'Converged': converged}
+
+
+def maxwell_n(group, modes=3, init=None, protocol=PROTOCOL):
+    '''
+    This function fits the relaxation spectrum of the frequency sweep of
+    every n in a group, using rheology.maxwell_batch. The group is only
+    read.
+
+    Parameters
+    ----------
+    group : list of dictionaries
+        each dictionary is from a single n processed in rheology.all_tests_n(df)
+
+    modes : int
+        number of Maxwell modes
+
+    init : dictionary (optional)
+        earlier result of rheology.maxwell_n for the same group, as warm starts
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol) the sweep is looked up in
+
+    Example
+    -------
+    spectra = rheology.maxwell_n(txt, modes=3)
+
+    spectra['Relaxation Times'][0] # tau of n1
+    '''
+    k = protocol_test('frequency sweep', protocol)
+    sweeps = stack_tests(group, k, ['Angular Frequency', 'Storage Modulus', 'Loss Modulus'])
+    return maxwell_batch(sweeps[..., 0], sweeps[..., 1], sweeps[..., 2], modes, init)
+
+
+# viscosity models fitted by rheology.flow_batch
+FLOW_MODELS = ('power law', 'cross', 'carreau-yasuda')
+
+# columns of rheology.METRIC_COLUMNS filled by rheology.flow_metrics
+FLOW_COLUMNS = ['Flow Index', 'Consistency [Pa*s^n]', 'Flow Index R2', 'Flow Index Valid',
+                'Zero Shear Viscosity [Pa*s]']
+
+
+def _logistic(z):
+    '''
+    Returns 1/(1 + exp(-z)) without overflow warnings.
+    '''
+    with np.errstate(over='ignore'):
+        return 1 / (1 + np.exp(-z))
+
+
+def _cross_model(ln_rate):
+    '''
+    Returns model(p, rows) of ln viscosity of the Cross model
+    eta = eta0 / (1 + (lambda*rate)^m) for rheology._levenberg_marquardt,
+    with p = (ln eta0, ln lambda, m) and the analytic Jacobian.
+    '''
+    def model(p, rows):
+        L = p[:, 1:2] + ln_rate[rows] # ln(lambda*rate)
+        m = p[:, 2:3]
+        s = _logistic(m * L)
+        f = p[:, 0:1] - np.logaddexp(0, m * L)
+        J = np.stack((np.ones_like(f), -m * s, -L * s), axis=2)
+        return f, J
+    return model
+
+
+def _carreau_yasuda_model(ln_rate):
+    '''
+    Returns model(p, rows) of ln viscosity of the Carreau-Yasuda model
+    eta = eta0 * (1 + (lambda*rate)^a)^((n - 1)/a) for
+    rheology._levenberg_marquardt, with p = (ln eta0, ln lambda, n, ln a)
+    and the analytic Jacobian.
+    '''
+    def model(p, rows):
+        L = p[:, 1:2] + ln_rate[rows]
+        n = p[:, 2:3]
+        a = np.exp(p[:, 3:4])
+        z = a * L
+        soft = np.logaddexp(0, z) # ln(1 + (lambda*rate)^a)
+        s = _logistic(z)
+        f = p[:, 0:1] + (n - 1) / a * soft
+        J = np.stack((np.ones_like(f), (n - 1) * s, soft / a, (n - 1) * (L * s - soft / a)), axis=2)
+        return f, J
+    return model
+
+
+def _fit_quality(residual, y, weight):
+    '''
+    Returns the R2 and the root mean square of weighted ln residuals.
+    '''
+    count = weight.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (y * weight).sum(axis=1) / count
+        total = (((y - mean[:, None]) * weight)**2).sum(axis=1)
+        squares = ((residual * weight)**2).sum(axis=1)
+        return 1 - squares / total, np.sqrt(squares / count)
+
+
+def flow_batch(rate, viscosity, models=FLOW_MODELS, low=None, high=None, drop=0.1, max_iter=200, tol=1e-6):
+    '''
+    This function fits viscosity models to the shear thinning test of many
+    samples at once, all in log space (least squares on ln viscosity):
+
+        power law        eta = K rate^(n - 1)
+        cross            eta = eta0 / (1 + (lambda rate)^m)
+        carreau-yasuda   eta = eta0 (1 + (lambda rate)^a)^((n - 1)/a)
+
+    The power law is a linear fit solved in closed form, the Cross and
+    Carreau-Yasuda models are fitted together by a batched Levenberg-
+    Marquardt with analytic Jacobians. The infinite shear viscosity is
+    taken as 0, the shear rates measured do not reach it.
+
+    By default only the shear thinning region is fitted: the power law from
+    the viscosity peak, and every model up to the point before the shear
+    stress first falls by more than drop. Past that the gel has yielded or
+    slips and the viscosity collapses, which no model describes (fitted
+    over it the flow index comes out negative with a high R2).
+
+    Parameters
+    ----------
+    rate : numpy array (samples x points)
+        shear rate [1/s]
+
+    viscosity : numpy array (samples x points)
+        viscosity [Pa*s]
+
+    models : list, str
+        models to fit, from rheology.FLOW_MODELS
+
+    low, high : float or numpy array (samples) (optional)
+        range of shear rates [1/s] of the shear thinning region, the power
+        law is fitted over it and the other models up to high; found from
+        the data by default
+
+    drop : float
+        fall of the shear stress between two points that ends the shear
+        thinning region, None fits the whole test
+
+    max_iter : int
+        most Levenberg-Marquardt iterations
+
+    tol : float
+        relative decrease of the cost below which a fit has converged
+
+    Returns
+    -------
+    flow : dictionary
+        {model: {parameter: numpy array (samples)}}, parameters 'K [Pa*s^n]'
+        and 'n' (power law), 'Eta0 [Pa*s]', 'Lambda [s]' and 'm' (cross),
+        'Eta0 [Pa*s]', 'Lambda [s]', 'n' and 'a' (carreau-yasuda), and for
+        every model 'R2' and 'RMS' of ln viscosity, 'Converged' and 'Valid'
+        (converged with no parameter at a bound, n in (0, 1] and at least 3
+        points for the power law). Samples with fewer points than
+        parameters are NaN.
+
+    Example
+    -------
+    st = rheology.stack_tests(txt, 6, ['Shear Rate', 'Viscosity'])
+
+    rheology.flow_batch(st[..., 0], st[..., 1])['power law']['n']
+    '''
+    unknown = [m for m in models if m not in FLOW_MODELS]
+    if unknown:
+        raise ValueError('unknown viscosity models %s, use %s' % (unknown, list(FLOW_MODELS)))
+
+    rate = np.atleast_2d(np.asarray(rate, dtype=np.float64))
+    viscosity = np.atleast_2d(np.asarray(viscosity, dtype=np.float64))
+    if drop is not None:
+        first, last = _thinning_window(rate, viscosity, drop)
+        low = first if low is None else low
+        high = last if high is None else high
+    if high is not None:
+        with np.errstate(invalid='ignore'):
+            viscosity = np.where(rate <= np.reshape(high, (-1, 1)), viscosity, np.nan) # collapse left out
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x = np.log(rate)
+        y = np.log(viscosity)
+    valid = np.isfinite(x) & np.isfinite(y)
+    weight = valid.astype(np.float64)
+    x = np.where(valid, x, 0)
+    y = np.where(valid, y, 0)
+    count = weight.sum(axis=1)
+    flow = {}
+
+    with stage('flow', rows=len(rate)):
+        if 'power law' in models:
+            # weighted linear regression of ln viscosity on ln rate
+            w = weight.copy()
+            with np.errstate(invalid='ignore'):
+                if low is not None:
+                    w[rate < np.reshape(low, (-1, 1))] = 0
+            n = w.sum(axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mx = (w * x).sum(axis=1) / n
+                my = (w * y).sum(axis=1) / n
+                slope = (w * (x - mx[:, None]) * (y - my[:, None])).sum(axis=1) / (w * (x - mx[:, None])**2).sum(axis=1)
+            intercept = my - slope * mx
+            r2, rms = _fit_quality(y - intercept[:, None] - slope[:, None] * x, y, w)
+            ok = n >= 2
+            flow['power law'] = {'K [Pa*s^n]': np.where(ok, np.exp(intercept), np.nan),
+                                 'n': np.where(ok, slope + 1, np.nan),
+                                 'R2': np.where(ok, r2, np.nan), 'RMS': np.where(ok, rms, np.nan),
+                                 'Converged': ok}
+            with np.errstate(invalid='ignore'):
+                flow['power law']['Valid'] = (n >= 3) & (slope > -1) & (slope <= 0) # shear thinning
+
+        # starts: eta0 the highest viscosity, 1/lambda where it has halved
+        with np.errstate(invalid='ignore'):
+            eta0 = np.where(valid, y, -np.inf).max(axis=1)
+            halved = valid & (y < eta0[:, None] - np.log(2))
+        lam = -np.where(halved.any(axis=1), x[np.arange(len(x)), halved.argmax(axis=1)],
+                        np.where(valid, x, -np.inf).max(axis=1))
+        eta0 = np.where(np.isfinite(eta0), eta0, 0)
+        lam = np.where(np.isfinite(lam), lam, 0)
+        with np.errstate(invalid='ignore'):
+            lo = np.where(valid, x, np.inf).min(axis=1)
+            hi = np.where(valid, x, -np.inf).max(axis=1)
+        # lambda within three decades of 1/rate measured
+        lam_lo = np.where(np.isfinite(hi), -hi - 3 * np.log(10), -np.inf)
+        lam_hi = np.where(np.isfinite(lo), -lo + 3 * np.log(10), np.inf)
+        inf = np.full(len(x), np.inf)
+
+        for name, model, start, lower, upper, keys in (
+                ('cross', _cross_model, (eta0, lam, np.ones(len(x))),
+                 (-inf, lam_lo, np.zeros(len(x))), (inf, lam_hi, np.full(len(x), 10.0)),
+                 ('Eta0 [Pa*s]', 'Lambda [s]', 'm')),
+                ('carreau-yasuda', _carreau_yasuda_model, (eta0, lam, np.full(len(x), 0.2), np.full(len(x), np.log(2))),
+                 (-inf, lam_lo, np.zeros(len(x)), np.full(len(x), np.log(0.1))),
+                 (inf, lam_hi, np.ones(len(x)), np.full(len(x), np.log(10))),
+                 ('Eta0 [Pa*s]', 'Lambda [s]', 'n', 'a'))):
+            if name not in models:
+                continue
+            fit = np.flatnonzero(count > len(start))
+            p = np.full((len(x), len(start)), np.nan)
+            converged = np.zeros(len(x), dtype=bool)
+            if fit.size:
+                p[fit], c, it, converged[fit] = _levenberg_marquardt(
+                    model(x[fit]), np.stack(start, axis=1)[fit], y[fit], weight[fit],
+                    np.stack(lower, axis=1)[fit], np.stack(upper, axis=1)[fit], max_iter, tol)
+            residual = np.zeros_like(y)
+            if fit.size:
+                residual[fit] = y[fit] - model(x[fit])(p[fit], np.arange(fit.size))[0]
+            r2, rms = _fit_quality(residual, y, weight)
+
+            values = [np.exp(p[:, 0]), np.exp(p[:, 1]), p[:, 2]] + [np.exp(v) for v in p[:, 3:].T] # a from ln a
+            result = dict(zip(keys, values))
+            missing = count <= len(start)
+            result['R2'] = np.where(missing, np.nan, r2)
+            result['RMS'] = np.where(missing, np.nan, rms)
+            result['Converged'] = converged
+            # a parameter held at a bound is not a fit of the model, ex. carreau-yasuda n at 0
+            lower, upper = np.stack(lower, axis=1), np.stack(upper, axis=1)
+            with np.errstate(invalid='ignore'):
+                bound = (np.isfinite(lower) & (p - lower <= 1e-8 * (1 + np.abs(lower)))) | \
+                        (np.isfinite(upper) & (upper - p <= 1e-8 * (1 + np.abs(upper))))
+            bound = bound.any(axis=1)
+            result['Valid'] = converged & ~bound
+            flow[name] = result
+
+    return flow
+
+
+def flow_n(group, models=FLOW_MODELS, low=None, high=None, drop=0.1, protocol=PROTOCOL):
+    '''
+    This function fits the viscosity models of rheology.flow_batch to the
+    shear thinning test of every n in a group. The group is only read.
+
+    Parameters
+    ----------
+    group : list of dictionaries
+        each dictionary is from a single n processed in rheology.all_tests_n(df)
+
+    models : list, str
+        models to fit, from rheology.FLOW_MODELS
+
+    low, high : float or numpy array (n) (optional)
+        range of shear rates [1/s] of the shear thinning region, found from
+        the data by default (see rheology.flow_batch)
+
+    drop : float
+        fall of the shear stress between two points that ends the shear
+        thinning region, None fits the whole test
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol) the test is looked up in
+
+    Example
+    -------
+    flow = rheology.flow_n(txt)
+
+    flow['power law']['n'] # flow index of every n
+    '''
+    k = protocol_test('shear thinning', protocol)
+    st = stack_tests(group, k, ['Shear Rate', 'Viscosity'])
+    return flow_batch(st[..., 0], st[..., 1], models, low, high, drop)
+
+
+def _thinning_window(rate, viscosity, drop=0.1):
+    '''
+    Returns the first and last shear rate (samples) of the shear thinning
+    region of each sample: from the viscosity peak (the points before it
+    are start up) to the point before the shear stress first falls by more
+    than drop between two points. Past that the gel has yielded or slips,
+    the viscosity collapses and a power law over it gives n < 0.
+    '''
+    points = rate.shape[1]
+    finite = np.isfinite(rate) & np.isfinite(viscosity)
+    peak = np.argmax(np.where(finite, viscosity, -np.inf), axis=1)
+    end = points - 1 - np.argmax(finite[:, ::-1], axis=1) # last point measured
+    stress = rate * viscosity
+    with np.errstate(invalid='ignore'):
+        falls = np.zeros(rate.shape, dtype=bool)
+        falls[:, :-1] = stress[:, 1:] < (1 - drop) * stress[:, :-1] # last point before a fall
+    falls = falls & (np.arange(points) >= peak[:, None])
+    last = np.where(falls.any(axis=1), np.argmax(falls, axis=1), end)
+    rows = np.arange(len(rate))
+    return rate[rows, peak], rate[rows, last]
+
+
+def flow_metrics(group, low=None, high=None, drop=0.1, protocol=PROTOCOL):
+    '''
+    Returns {column of rheology.FLOW_COLUMNS: array} for every n in a group:
+    the power law flow index, consistency and R2 over the shear thinning
+    region and the Cross zero shear viscosity up to its end. The
+    region runs from the viscosity peak to the point before the shear
+    stress first falls by more than drop (the viscosity collapse of a gel
+    that yields or slips), unless low or high are given. A flow index
+    outside (0, 1], or a region of fewer than 3 points, is not shear
+    thinning: the power law columns are NaN and 'Flow Index Valid' is 0.
+
+    Parameters
+    ----------
+    group : list of dictionaries
+        each dictionary is from a single n processed in rheology.all_tests_n(df)
+
+    low, high : float or numpy array (samples) (optional)
+        range of shear rates [1/s] of the shear thinning region
+
+    drop : float
+        fall of the shear stress between two points that ends the region
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol)
+    '''
+    flow = flow_n(group, ('power law', 'cross'), low, high, drop, protocol)
+    law = flow['power law']
+    valid = law['Valid']
+    return dict(zip(FLOW_COLUMNS, (np.where(valid, law['n'], np.nan), np.where(valid, law['K [Pa*s^n]'], np.nan),
+                                   np.where(valid, law['R2'], np.nan), valid.astype(np.float64),
+                                   flow['cross']['Eta0 [Pa*s]'])))
@@ -0,0 +1,813 @@
+import csv
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+from .profiling import stage
+from .protocols import PROTOCOL
+
+
+PARSER_VERSION = 2 # bump when read_intervals/segment_intervals change their output
+
+CACHE_SIZE = 2**30 # default size cap of the segment cache (1 GB)
+
+_MISSING = '******' # written by the rheometer when a variable is not measured
+_INVALID = 'invalid point' # written by the rheometer in place of a rejected point
+
+# columns without a measurement in oscillatory and rotational tests
+_MODE_DROP = {'oscillation': ['Status', 'Viscosity', 'Speed'],
+              'rotation': ['Status', 'Storage Modulus', 'Loss Modulus', 'Angular Frequency']}
+
+
+def single_test_n(df, start, end, drop_columns):
+    '''
+    This function returns a single test from Jenny Bennett's overall rheology
+    protocol for PXP shear-thinning hydrogels. There are a total of 7 tests in
+    the following order: time sweep, frequency sweep, time sweep, strain sweep,
+    time sweep, cyclic strain sweep, shear thinning test.
+
+    Parameters
+    ----------
+    df: pandas dataframe
+        read from excel file from overall test
+
+    start: int
+        row start of interval on excel spreadsheet
+
+    end: int
+        row end of interval on excel spreadsheet
+
+    drop_columns: list
+        list of column names in df to be dropped (columns with text or invalid
+        data for interval)
+
+    '''
+    with stage('single_test_n', rows=max(end - start + 1, 0)):
+        rheo_test = df[start-2:end-1].drop(columns=drop_columns).apply(pd.to_numeric)
+    return rheo_test
+
+
+def test_dict_n(df, start, end, drop_columns):
+    '''
+    This function returns a dictionary containing multiple tests for a single
+    sample in Jenny Bennett's overall rheology protocol for PXP shear-thinning
+    hydrogels.
+
+    Parameters
+    ----------
+    df: pandas dataframe
+        read from excel file from overall test
+
+    start: int
+        row start of interval on excel spreadsheet
+
+    end: int
+        row end of interval on excel spreadsheet
+
+    drop_columns: list
+        list of column names in df to be dropped (columns with text or invalid
+        data for interval)
+
+    '''
+    rheo_data = {} # empty dictionary for tests
+
+    # loop through each test using start/end points
+    n = 0
+    for s, e in zip(start, end):
+        rheo_data[n] = single_test_n(df, s, e, drop_columns)
+        n = n + 1
+    return rheo_data
+
+
+def all_tests_n(df, cache_dir=None, cache_size=CACHE_SIZE, dtype=np.float64, protocol=PROTOCOL):
+    '''
+    This function returns a dictionary containing all tests from a single
+    sample (n) in Jenny Bennett's overall rheology protocol for PXP hydrogels.
+
+    Paramters
+    ---------
+    df: pandas dataframe or str
+        read from excel file from overall test, or path to the csv export
+
+    cache_dir: str (optional)
+        directory of the segment cache, only used when df is a path
+
+    cache_size: int
+        size cap of the segment cache in bytes
+
+    dtype: numpy dtype
+        float64, or float32 for half the memory (only used when df is a path)
+
+    protocol: dictionary
+        compiled protocol (rheology.compile_protocol) the export follows
+
+    Returns
+    -------
+    rheo_data: dict
+        {0: time sweep, 1: frequency sweep, 2: time sweep, 3: strain sweep, 4:
+        time sweep, 5: cyclic strain sweep, 6: shear thinning}
+
+    The intervals are found from the "Meas. Pts." header blocks of the export
+    and assigned to the tests of the protocol in order. If df is a path to
+    the csv export instead of a dataframe, the file is read with
+    rheology.read_intervals and the tests come back as a compact
+    rheology.RheoSample (indexed the same way as the dictionary). Passing cache_dir keeps the segmented tests in
+    an on-disk cache (see rheology.cached_tests) so unchanged exports are not
+    parsed again.
+    '''
+    if _is_path(df):
+        if cache_dir is not None:
+            return cached_tests(df, cache_dir, cache_size, dtype, protocol)
+        return segment_intervals(read_intervals(df), dtype, protocol)
+
+    intervals = _frame_intervals(df)
+    modes = []
+    for labels in intervals:
+        sm = pd.to_numeric(df.loc[labels, 'Storage Modulus'], errors='coerce')
+        modes.append('rotation' if sm.isna().all() else 'oscillation')
+
+    rheo_data = {}
+    pieces = {} # intervals of each test, zoomed in tests are built from them
+    for k, ivs in _protocol_intervals(modes, protocol).items():
+        t = protocol['tests'][k]
+        drop_columns = _MODE_DROP[t['mode']] # columns containing text or no measurement
+
+        # every interval but the first of a test starts after its skipped points
+        objs = []
+        for n, i in enumerate(ivs):
+            labels = intervals[i][t['skip'] if n else 0:]
+            with stage('to_numeric', rows=len(labels)):
+                objs.append(df.loc[labels].drop(columns=drop_columns).apply(pd.to_numeric))
+
+        # combine the intervals of the test and add to final dictionary
+        rheo_data[k] = pd.concat(objs, axis=0) if len(objs) > 1 else objs[0]
+        pieces[k] = objs
+
+    # zoomed in tests are windows into another test, combined from the part
+    # of each interval inside the window
+    for k, t in protocol['tests'].items():
+        if t['view'] is not None and t['view'][0] in rheo_data:
+            base, first, last = t['view']
+            objs_zoom = []
+            pos = 0
+            for obj in pieces[base]:
+                if pos < last and pos + len(obj) > first:
+                    objs_zoom.append(obj[max(first - pos, 0):last - pos])
+                pos = pos + len(obj)
+            rheo_data[k] = pd.concat(objs_zoom, axis=0)
+
+    return rheo_data
+
+
+def all_tests(df1, df2=pd.DataFrame([]), df3=pd.DataFrame([]), df4=pd.DataFrame([]), df5=pd.DataFrame([]), *more, cache_dir=None, cache_size=CACHE_SIZE, dtype=np.float64, protocol=PROTOCOL):
+    out = []
+
+    # each df can be a dataframe read with pd.read_csv or a path to the export,
+    # replicates past the fifth are passed as extra positional arguments
+    for df in (df1, df2, df3, df4, df5) + more:
+        if _is_path(df) or df.empty==False:
+            out.append(all_tests_n(df, cache_dir, cache_size, dtype, protocol))
+
+    return out
+
+
+def _is_path(df):
+    '''
+    Returns True if df is a file path rather than a dataframe.
+    '''
+    return isinstance(df, (str, os.PathLike))
+
+
+def _interval_array(cells):
+    '''
+    Converts the text cells collected for one interval into a float64 array,
+    mapping '******' and empty cells to NaN.
+    '''
+    if not cells:
+        return np.empty((0, 0))
+
+    text = np.array(cells)
+    text[(text == _MISSING) | (text == '')] = 'nan'
+    return text.astype(np.float64)
+
+
+def _frame_intervals(df):
+    '''
+    Returns the row labels of the valid data rows of each interval in a
+    dataframe read from the export with pd.read_csv. Data rows are the runs
+    of rows numbered in the Meas. Pts. column, the header, unit and blank
+    rows between intervals are not numbered.
+    '''
+    numbered = pd.to_numeric(df.iloc[:, 0], errors='coerce').notna().to_numpy()
+    invalid = (df == _INVALID).any(axis=1).to_numpy()
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], numbered.astype(np.int8), [0]))))
+
+    intervals = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        intervals.append(df.index[start:end][~invalid[start:end]])
+    return intervals
+
+
+def _protocol_intervals(modes, protocol):
+    '''
+    Assigns the intervals of an export, in file order, to the tests of a
+    compiled protocol. modes holds 'oscillation' or 'rotation' for each
+    interval. Returns {test: [interval positions]} for the tests the export
+    reaches (an aborted run has fewer), and raises ValueError when an
+    interval is not the kind of measurement the protocol expects.
+    '''
+    assigned = {}
+    n = 0
+    for k, t in protocol['tests'].items():
+        if t['view'] is not None or n >= len(modes):
+            continue
+        ivs = list(range(n, min(n + t['intervals'], len(modes))))
+        for i in ivs:
+            if modes[i] != t['mode']:
+                raise ValueError('interval %d is %s, but test %d (%s) of %s is %s'
+                                 % (i+1, modes[i], k, t['kind'], protocol['key'], t['mode']))
+        assigned[k] = ivs
+        n = n + t['intervals']
+    return assigned
+
+
+def _read_rows(rows, state):
+    '''
+    Reads csv rows of an export into state (see rheology.read_intervals),
+    from where the previous call stopped, so a file can be read in one go or
+    in pieces as it is written. state holds 'intervals' (dictionaries with
+    the text cells collected so far), 'current' (the interval being read,
+    None between data blocks), 'number', 'keep', 'units' and 'label'.
+    '''
+    intervals = state['intervals']
+    current = state['current'] # interval currently being read
+    number = state['number'] # the first interval has no "Interval:" line
+    keep = state['keep']
+    pending_units = state['units'] # True for the row right after a "Meas. Pts." header
+    label = state['label'] # pd.read_csv labels the first row after the header 0
+
+    for row in rows:
+        if not row:
+            continue # pd.read_csv skips blank lines, keep labels in step
+        first = row[0]
+
+        if first == 'Meas. Pts.':
+            # header of a data block, keep every column except Status
+            keep = [i for i, c in enumerate(row) if c != 'Status']
+            current = {'interval': number,
+                       'columns': [row[i] for i in keep],
+                       'units': [],
+                       'index': [],
+                       'cells': []}
+            intervals.append(current)
+            pending_units = True
+        elif pending_units:
+            current['units'] = [row[i] for i in keep]
+            pending_units = False
+        elif first == 'Interval:':
+            number = int(float(row[3]))
+            current = None
+        elif first == '':
+            current = None # blank separator closes the data block
+        elif current is not None and _INVALID not in row:
+            current['index'].append(label)
+            current['cells'].append([row[i] for i in keep])
+
+        label = label + 1
+
+    state.update(current=current, number=number, keep=keep, units=pending_units, label=label)
+    return state
+
+
+def _read_state():
+    '''
+    Returns the state of rheology._read_rows before the first row.
+    '''
+    return {'intervals': [], 'current': None, 'number': 1, 'keep': None, 'units': False, 'label': -1}
+
+
+def read_intervals(path, encoding='ISO-8859-1'):
+    '''
+    This function reads a csv export of Jenny Bennett's overall rheology
+    protocol in a single pass. Intervals are found from the "Interval:" and
+    "Meas. Pts." header blocks in the file, so no row offsets are assumed and
+    runs with a different number of measuring points are read correctly.
+
+    Parameters
+    ----------
+    path : str
+        path to the csv exported from the rheometer
+
+    encoding : str
+        encoding of the export (the rheometer software writes ISO-8859-1)
+
+    Returns
+    -------
+    intervals : list of dictionaries, one per interval in file order
+        'interval': interval number from the export
+        'columns': list of numeric column names (Status is left out)
+        'units': list of units matching 'columns'
+        'index': row labels, the same labels pd.read_csv gives these rows
+        'data': float64 array (points x columns), '******' read as NaN
+
+    Example
+    -------
+    intervals = rheology.read_intervals('exampledata/PXP_N1.csv')
+    '''
+    with stage('read_intervals') as st:
+        with open(path, newline='', encoding=encoding) as f:
+            state = _read_rows(csv.reader(f), _read_state())
+        intervals = state['intervals']
+
+        for iv in intervals:
+            iv['data'] = _interval_array(iv.pop('cells'))
+            iv['index'] = np.array(iv['index'], dtype=np.int64)
+        st.add(rows=state['label'] + 1)
+
+    return intervals
+
+
+class RheoSample:
+    '''
+    This class holds every test of one sample from Jenny Bennett's overall
+    rheology protocol in a single contiguous array. Each test is stored once,
+    column by column, without the columns that were not measured in it, and
+    the zoomed cyclic strain sweep (7) is a window into the cyclic strain
+    sweep (5) rather than a copy. A sample is indexed like the dictionary from
+    rheology.all_tests_n; the dataframe returned is a zero-copy view of the
+    block.
+
+    Parameters
+    ----------
+    data : numpy array
+        1-D float64 (or float32) block holding every stored test
+
+    index : numpy array
+        row labels of every stored test, back to back
+
+    segments : dictionary
+        {test: (offset, row, points, columns, first, last)} where offset is
+        where the test's block starts in data, row where its labels start in
+        index, and first:last the rows of the block that make up the test
+
+    Example
+    -------
+    txt_n1 = rheology.all_tests_n('exampledata/TXT_N1.csv')
+
+    txt_n1[3]['Storage Modulus']
+    '''
+    __slots__ = ('data', 'index', 'segments')
+
+    def __init__(self, data, index, segments):
+        self.data = data
+        self.index = index
+        self.segments = segments
+
+    @classmethod
+    def pack(cls, parts, windows=None, dtype=np.float64):
+        '''
+        Builds a sample from {test: (columns, pieces)}, where pieces is a list
+        of (array, labels, first) with the rows from first onward of each
+        array used in order. Columns that are all NaN are left out. windows
+        is {test: (stored test, first, last)} for tests that are views.
+        '''
+        layout = {}
+        size = 0
+        rows = 0
+        for k, (columns, pieces) in parts.items():
+            points = sum(len(a) - first for a, labels, first in pieces)
+            keep = [i for i in range(len(columns))
+                    if not all(np.isnan(a[first:, i]).all() for a, labels, first in pieces)]
+            layout[k] = (size, rows, points, keep)
+            size = size + points * len(keep)
+            rows = rows + points
+
+        data = np.empty(size, dtype=dtype)
+        index = np.empty(rows, dtype=np.int32)
+        segments = {}
+        for k, (columns, pieces) in parts.items():
+            offset, row, points, keep = layout[k]
+            block = data[offset:offset + points * len(keep)].reshape(len(keep), points)
+            r = 0
+            for a, labels, first in pieces:
+                n = len(a) - first
+                for j, i in enumerate(keep):
+                    block[j, r:r+n] = a[first:, i]
+                index[row+r:row+r+n] = labels[first:]
+                r = r + n
+            segments[k] = (offset, row, points, tuple(columns[i] for i in keep), 0, points)
+
+        for k, (base, first, last) in (windows or {}).items():
+            offset, row, points, columns = segments[base][:4]
+            last = min(last, points) # a shorter (aborted) test
+            segments[k] = (offset, row, points, columns, min(first, last), last)
+
+        return cls(data, index, dict(sorted(segments.items())))
+
+    @classmethod
+    def from_frames(cls, rheo_data, dtype=np.float64, protocol=PROTOCOL):
+        '''
+        Builds a sample from the dictionary of dataframes returned by
+        rheology.all_tests_n for a dataframe. Zoomed in tests of the protocol
+        (7) become windows into the test they zoom into (5) when their rows
+        are found there.
+        '''
+        views = {k: t['view'][0] for k, t in protocol['tests'].items() if t['view'] is not None}
+        parts = {}
+        windows = {}
+        for k, df in rheo_data.items():
+            base = views.get(k)
+            if base in rheo_data:
+                labels = rheo_data[base].index
+                first = int(labels.get_indexer(df.index[:1])[0])
+                if first >= 0 and labels[first:first+len(df)].equals(df.index):
+                    windows[k] = (base, first, first + len(df))
+                    continue
+            parts[k] = (list(df.columns), [(df.to_numpy(np.float64), df.index.to_numpy(np.int64), 0)])
+        return cls.pack(parts, windows, dtype)
+
+    def columns(self, test):
+        '''
+        Returns the column names stored for a test.
+        '''
+        return list(self.segments[test][3])
+
+    def array(self, test):
+        '''
+        Returns a test as a (points x columns) view of the block.
+        '''
+        offset, row, points, columns, first, last = self.segments[test]
+        block = self.data[offset:offset + points * len(columns)].reshape(len(columns), points)
+        return block[:, first:last].T
+
+    def labels(self, test):
+        '''
+        Returns the row labels of a test (the labels pd.read_csv gives them).
+        '''
+        offset, row, points, columns, first, last = self.segments[test]
+        return self.index[row+first:row+last]
+
+    def select(self, test, columns):
+        '''
+        Returns the given columns of a test as a float64 (points x columns)
+        array, with NaN for columns that were not measured.
+        '''
+        stored = self.segments[test][3]
+        a = self.array(test)
+        out = np.full((len(a), len(columns)), np.nan)
+        for j, c in enumerate(columns):
+            if c in stored:
+                out[:, j] = a[:, stored.index(c)]
+        return out
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.index.nbytes
+
+    def __getitem__(self, test):
+        return pd.DataFrame(self.array(test), index=self.labels(test),
+                            columns=self.columns(test), copy=False)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __iter__(self):
+        return iter(self.segments)
+
+    def __contains__(self, test):
+        return test in self.segments
+
+    def keys(self):
+        return self.segments.keys()
+
+    def values(self):
+        return [self[k] for k in self.segments]
+
+    def items(self):
+        return [(k, self[k]) for k in self.segments]
+
+    def __repr__(self):
+        return 'RheoSample(tests=%s, %s, %d bytes)' % (list(self.segments), self.data.dtype, self.nbytes)
+
+
+def segment_intervals(intervals, dtype=np.float64, protocol=PROTOCOL):
+    '''
+    This function groups the intervals returned by rheology.read_intervals
+    into the tests of a protocol, in order. Oscillatory intervals are told
+    apart from rotational ones by whether storage modulus was measured, and
+    an interval of the wrong kind raises ValueError.
+
+    Parameters
+    ----------
+    intervals : list of dictionaries from rheology.read_intervals
+
+    dtype : numpy dtype
+        float64, or float32 to halve the memory of the sample
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol)
+
+    Returns
+    -------
+    rheo_data: rheology.RheoSample
+        same tests as rheology.all_tests_n, {0: time sweep, 1: frequency
+        sweep, 2: time sweep, 3: strain sweep, 4: time sweep, 5: cyclic strain
+        sweep, 6: shear thinning, 7: zoomed cyclic strain sweep}
+    '''
+    with stage('segment_intervals', rows=sum(len(iv['index']) for iv in intervals)):
+        modes = []
+        for iv in intervals:
+            sm = iv['data'][:, iv['columns'].index('Storage Modulus')]
+            modes.append('rotation' if np.isnan(sm).all() else 'oscillation')
+
+        parts = {}
+        for k, ivs in _protocol_intervals(modes, protocol).items():
+            t = protocol['tests'][k]
+            columns = intervals[ivs[0]]['columns']
+            keep = [i for i, c in enumerate(columns) if c not in _MODE_DROP[t['mode']]]
+
+            # the skipped points at the start of every interval but the first are
+            # dropped the same way the original row offsets dropped them
+            pieces = []
+            for n, i in enumerate(ivs):
+                iv = intervals[i]
+                pieces.append((iv['data'][:, keep], iv['index'], t['skip'] if n else 0))
+            parts[k] = ([columns[i] for i in keep], pieces)
+
+        # zoomed in tests, ex. 7 around the first high strain period of 5
+        windows = {}
+        for k, t in protocol['tests'].items():
+            if t['view'] is not None and t['view'][0] in parts:
+                windows[k] = t['view']
+
+        return RheoSample.pack(parts, windows, dtype)
+
+
+def file_hash(path):
+    '''
+    Returns the sha256 hex digest of a file's contents.
+    '''
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_store(entry, sample):
+    '''
+    Writes a rheology.RheoSample into a cache entry directory: the data block
+    and row labels as .npy files (so they can be memory mapped back) and the
+    segment table as json.
+    '''
+    tmp = tempfile.mkdtemp(dir=os.path.dirname(entry))
+    np.save(os.path.join(tmp, 'data.npy'), sample.data)
+    np.save(os.path.join(tmp, 'index.npy'), sample.index)
+    with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+        json.dump({k: list(v) for k, v in sample.segments.items()}, f)
+
+    try:
+        os.replace(tmp, entry) # atomic, a concurrent writer may have won
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _cache_load(entry):
+    '''
+    Returns the rheology.RheoSample in a cache entry, with the data block as
+    a read-only memory map.
+    '''
+    with open(os.path.join(entry, 'meta.json')) as f:
+        meta = json.load(f)
+
+    data = np.load(os.path.join(entry, 'data.npy'), mmap_mode='r')
+    index = np.load(os.path.join(entry, 'index.npy'), mmap_mode='r')
+    segments = {}
+    for k, (offset, row, points, columns, first, last) in meta.items():
+        segments[int(k)] = (offset, row, points, tuple(columns), first, last)
+    return RheoSample(data, index, segments)
+
+
+def _cache_evict(cache_dir, cache_size):
+    '''
+    Deletes least recently used cache entries until the cache is no larger
+    than cache_size bytes. Entries are ranked by the mtime of meta.json,
+    which is touched on every cache hit.
+    '''
+    entries = []
+    total = 0
+    for name in os.listdir(cache_dir):
+        entry = os.path.join(cache_dir, name)
+        try:
+            used = os.path.getmtime(os.path.join(entry, 'meta.json'))
+            size = sum(e.stat().st_size for e in os.scandir(entry))
+        except OSError:
+            continue # temporary directory of a writer, or removed meanwhile
+        entries.append((used, size, entry))
+        total = total + size
+
+    for used, size, entry in sorted(entries):
+        if total <= cache_size:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total = total - size
+
+
+def cached_tests(path, cache_dir, cache_size=CACHE_SIZE, dtype=np.float64, protocol=PROTOCOL):
+    '''
+    This function returns the segmented tests of an export (the
+    rheology.RheoSample from rheology.all_tests_n) through an on-disk cache. Entries are keyed by the
+    hash of the file contents, rheology.PARSER_VERSION and the protocol, so
+    edited files, parser changes and protocol variants never return stale
+    data. A cache hit memory maps the saved
+    arrays instead of parsing the csv.
+
+    Parameters
+    ----------
+    path : str
+        path to the csv exported from the rheometer
+
+    cache_dir : str
+        directory for the cache, created if missing
+
+    cache_size : int
+        size cap in bytes, least recently used entries are evicted past it
+
+    dtype : numpy dtype
+        float64 or float32, cached separately
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol)
+
+    Example
+    -------
+    txt_n1 = rheology.cached_tests('exampledata/TXT_N1.csv', 'rheo_cache')
+    '''
+    os.makedirs(cache_dir, exist_ok=True)
+    key = '%s-v%d-%s-%s' % (file_hash(path), PARSER_VERSION, np.dtype(dtype).name, protocol['key'])
+    entry = os.path.join(cache_dir, key)
+
+    try:
+        with stage('cache_load') as st:
+            rheo_data = _cache_load(entry)
+            os.utime(os.path.join(entry, 'meta.json')) # mark as recently used
+            st.add(rows=len(rheo_data.index))
+        return rheo_data
+    except (OSError, ValueError):
+        pass # not cached yet (or a damaged entry, which is rewritten)
+
+    rheo_data = segment_intervals(read_intervals(path), dtype, protocol)
+    with stage('cache_store', rows=len(rheo_data.index)):
+        shutil.rmtree(entry, ignore_errors=True)
+        _cache_store(entry, rheo_data)
+        _cache_evict(cache_dir, cache_size)
+    return rheo_data
+
+
+# columns of a rheology.ResultStore: (result column, sql column, sql type)
+STORE_COLUMNS = [('Formulation', 'formulation', 'TEXT'),
+                 ('Replicate', 'replicate', 'INTEGER'),
+                 ('File', 'file', 'TEXT'),
+                 ('Hash', 'file_hash', 'TEXT'),
+                 ('Date', 'date', 'TEXT'),
+                 ('Protocol', 'protocol', 'TEXT'),
+                 ('Protocol Version', 'protocol_version', 'INTEGER'),
+                 ("G' [Pa]", 'storage_modulus', 'REAL'),
+                 ('Crossover Strain [%]', 'crossover_strain', 'REAL'),
+                 ('Crossover Frequency [rad/s]', 'crossover_frequency', 'REAL'),
+                 ('t1/2 [s]', 't_half', 'REAL'),
+                 ('Recovery Crossover [s]', 'recovery_crossover', 'REAL'),
+                 ('Flow Index', 'flow_index', 'REAL'),
+                 ('Consistency [Pa*s^n]', 'consistency', 'REAL'),
+                 ('Flow Index R2', 'flow_index_r2', 'REAL'),
+                 ('Flow Index Valid', 'flow_index_valid', 'REAL'),
+                 ('Zero Shear Viscosity [Pa*s]', 'zero_shear_viscosity', 'REAL'),
+                 ('Error', 'error', 'TEXT'),
+                 ('Analyzed', 'analyzed', 'TEXT')]
+
+
+def _sql_value(v):
+    '''
+    Returns a value as sqlite stores it, NaN and None as NULL.
+    '''
+    if v is None or (isinstance(v, float) and np.isnan(v)):
+        return None
+    if isinstance(v, np.generic):
+        return _sql_value(v.item())
+    return v
+
+
+class ResultStore:
+    '''
+    This class keeps the metrics of every analyzed export in a sqlite
+    database, one row per export with its formulation, replicate, file, the
+    sha256 of the file, the date it was measured (the file's modification
+    time), the protocol and its version, the metrics of
+    rheology.METRIC_COLUMNS and any error. Rows are keyed by file hash and
+    protocol (by file for exports that could not be read), so analyzing an
+    export again replaces its row. Formulation and date are indexed.
+
+    Parameters
+    ----------
+    path : str
+        database file, created if it does not exist
+
+    Example
+    -------
+    store = rheology.ResultStore('results.db')
+    store.add(rheology.batch_analyze(paths, workers=4))
+
+    store.query('crossover_strain > ?', [200])
+
+    The sql column names are in rheology.STORE_COLUMNS, results come back
+    with the result column names. A store can be the sink of
+    rheology.watch_exports (sink=store.add).
+    '''
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock() # add may be called from several threads
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL') # readers do not wait for writers
+        with self.connection:
+            self.connection.execute('CREATE TABLE IF NOT EXISTS results (%s, UNIQUE (file_hash, protocol, protocol_version))'
+                                    % ', '.join('%s %s' % (c, t) for name, c, t in STORE_COLUMNS))
+            # stores made before a column was added get it, NULL for their rows
+            have = [row[1] for row in self.connection.execute('PRAGMA table_info(results)')]
+            for name, c, t in STORE_COLUMNS:
+                if c not in have:
+                    self.connection.execute('ALTER TABLE results ADD COLUMN %s %s' % (c, t))
+            self.connection.execute('CREATE INDEX IF NOT EXISTS results_formulation ON results (formulation)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS results_date ON results (date)')
+
+    def add(self, records, protocol=PROTOCOL):
+        '''
+        Writes metric records (a list of dictionaries or the dataframe from
+        rheology.batch_analyze) in one transaction and returns how many were
+        written. Hash and Date are read from the file when a record does not
+        have them.
+        '''
+        if isinstance(records, pd.DataFrame):
+            records = records.to_dict('records')
+        analyzed = datetime.datetime.now().isoformat(sep=' ', timespec='seconds')
+
+        rows = []
+        for r in records:
+            r = dict(r)
+            path = r.get('File')
+            if r.get('Hash') is None and path and os.path.isfile(path):
+                r['Hash'] = file_hash(path)
+            if r.get('Date') is None and path and os.path.isfile(path):
+                mtime = os.path.getmtime(path)
+                r['Date'] = datetime.datetime.fromtimestamp(mtime).isoformat(sep=' ', timespec='seconds')
+            r.setdefault('Protocol', protocol['name'])
+            r.setdefault('Protocol Version', protocol['version'])
+            r.setdefault('Analyzed', analyzed)
+            rows.append(tuple(_sql_value(r.get(name)) for name, c, t in STORE_COLUMNS))
+
+        sql = 'INSERT OR REPLACE INTO results (%s) VALUES (%s)' % (
+            ', '.join(c for name, c, t in STORE_COLUMNS), ', '.join('?' * len(STORE_COLUMNS)))
+        with self.lock, self.connection:
+            # rows of files that could not be read have no hash to be keyed by
+            unhashed = [(r[2], r[5], r[6]) for r in rows if r[3] is None]
+            self.connection.executemany('DELETE FROM results WHERE file = ? AND file_hash IS NULL AND protocol = ? '
+                                        'AND protocol_version = ?', unhashed)
+            self.connection.executemany(sql, rows)
+        return len(rows)
+
+    def query(self, where=None, params=(), order='date'):
+        '''
+        Returns the rows matching a sql condition on the columns of
+        rheology.STORE_COLUMNS (ex. "formulation = ? AND date >= ?") as a
+        dataframe, every row by default.
+        '''
+        sql = 'SELECT %s FROM results' % ', '.join(c for name, c, t in STORE_COLUMNS)
+        if where:
+            sql = sql + ' WHERE ' + where
+        if order:
+            sql = sql + ' ORDER BY ' + order
+        with self.lock:
+            df = pd.read_sql_query(sql, self.connection, params=list(params))
+        return df.rename(columns={c: name for name, c, t in STORE_COLUMNS})
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def __repr__(self):
+        return 'ResultStore(%r, %d rows)' % (self.path, len(self))
@@ -0,0 +1,517 @@
+import asyncio
+import csv
+import fnmatch
+import functools
+import io
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+
+from .analysis import (METRIC_COLUMNS, RESULT_COLUMNS, _analyze_chunk, _cycle_mean, crossover_n,
+                       recovery_batch, storage_modulus)
+from .fitting import flow_metrics
+from .io import _interval_array, _protocol_intervals, _read_rows, _read_state, segment_intervals
+from .profiling import stage
+from .protocols import PROTOCOL, protocol_test
+
+log = logging.getLogger(__name__)
+
+
+class ExportTail:
+    '''
+    This class follows an export of Jenny Bennett's overall rheology protocol
+    while the rheometer is still writing it. Each poll reads only the bytes
+    appended since the previous one and adds the new rows to the interval
+    being measured, then updates the metrics of what has completed: the
+    plateau G' once its time sweeps end, the strain and frequency crossover
+    once their sweeps end, the viscosity fits once the shear thinning test
+    ends and the recovery time of each cycle of the cyclic
+    strain sweep once its recovery period ends. A gel that fails (no strain
+    crossover, or G' not recovering after a high strain period) is flagged
+    as soon as it shows, hours before the run ends, so it can be aborted.
+
+    Parameters
+    ----------
+    path : str
+        path to the csv the rheometer is writing
+
+    encoding : str
+        encoding of the export (the rheometer software writes ISO-8859-1)
+
+    dtype : numpy dtype
+        float64, or float32 for the sample (see rheology.segment_intervals)
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol) the run follows
+
+    Attributes
+    ----------
+    complete : list
+        tests that have completed, in order
+
+    metrics : dictionary
+        {column of rheology.METRIC_COLUMNS: value}, NaN until known
+
+    cycles : dictionary
+        {'t1/2 [s]': array, 'Recovery Crossover [s]': array}, the recovery
+        time of each cycle, NaN until its recovery period ends
+
+    flags : list of str
+        signs of a failing gel, in the order they showed
+
+    Example
+    -------
+    tail = rheology.ExportTail('run.csv')
+
+    for tests in tail.follow(interval=30):
+        print(tests, tail.metrics)
+        if tail.flags:
+            print('abort:', tail.flags)
+            break
+    '''
+    def __init__(self, path, encoding='ISO-8859-1', dtype=np.float64, protocol=PROTOCOL):
+        self.path = path
+        self.encoding = encoding
+        self.dtype = dtype
+        self.protocol = protocol
+        self.reset()
+
+    def reset(self):
+        '''
+        Forgets everything read, the next poll reads the file from the start.
+        '''
+        self.offset = 0 # bytes of the file read so far
+        self.pending = b'' # a last line that is not complete yet
+        self.state = _read_state()
+        self.complete = []
+        self.metrics = dict.fromkeys(METRIC_COLUMNS, np.nan)
+        cycles = len(self.protocol['tests'][protocol_test('cyclic strain sweep', self.protocol)]['high'])
+        self.cycles = {c: np.full(cycles, np.nan) for c in ('t1/2 [s]', 'Recovery Crossover [s]')}
+        self.ready = 0 # cycles whose recovery is in self.cycles
+        self.flags = []
+
+    @property
+    def done(self):
+        '''
+        True once every test of the protocol has completed.
+        '''
+        return len(self.complete) == len(self.protocol['tests'])
+
+    def poll(self, final=False):
+        '''
+        Reads the rows appended since the last poll and returns the tests
+        they completed (a list, empty if none). final=True also reads a last
+        row without a line end, for when the run has stopped. A file that
+        got shorter was rewritten and is read again from the start.
+        '''
+        with open(self.path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size < self.offset:
+                self.reset()
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+        self.offset = size
+
+        # only whole lines are parsed, the rest waits for the next poll
+        data = self.pending + chunk
+        cut = len(data) if final else data.rfind(b'\n') + 1
+        self.pending = data[cut:]
+        with stage('tail_poll') as st:
+            if cut:
+                label = self.state['label']
+                text = data[:cut].decode(self.encoding)
+                _read_rows(csv.reader(io.StringIO(text, newline='')), self.state)
+                st.add(rows=self.state['label'] - label)
+            return self._update()
+
+    def follow(self, interval=10, idle=600):
+        '''
+        Polls the export every interval seconds and yields the tests each
+        poll completes, until every test has completed or the file has not
+        grown for idle seconds (the run was stopped). The file does not have
+        to exist yet.
+        '''
+        grown = time.monotonic()
+        while not self.done:
+            offset = self.offset
+            try:
+                tests = self.poll()
+            except FileNotFoundError:
+                tests = []
+            if self.offset != offset:
+                grown = time.monotonic()
+            elif idle is not None and time.monotonic() - grown >= idle:
+                tests = self.poll(final=True) if self.offset else []
+                if tests:
+                    yield tests
+                return
+            if tests:
+                yield tests
+            if not self.done:
+                time.sleep(interval)
+
+    def intervals(self):
+        '''
+        Returns the intervals read so far, as rheology.read_intervals does,
+        the one being measured included once it has a point.
+        '''
+        current = self.state['current']
+        intervals = []
+        for iv in self.state['intervals']:
+            if iv is current:
+                data = _interval_array(iv['cells'])
+                index = np.array(iv['index'], dtype=np.int64)
+            else:
+                if 'cells' in iv: # closed since the last call, converted once
+                    iv['data'] = _interval_array(iv.pop('cells'))
+                    iv['index'] = np.array(iv['index'], dtype=np.int64)
+                data, index = iv['data'], iv['index']
+            if len(data):
+                intervals.append({'interval': iv['interval'], 'columns': iv['columns'],
+                                  'units': iv['units'], 'index': index, 'data': data})
+        return intervals
+
+    def sample(self):
+        '''
+        Returns the tests read so far as a rheology.RheoSample, the test
+        being measured holding the points up to now.
+        '''
+        return segment_intervals(self.intervals(), self.dtype, self.protocol)
+
+    def _update(self):
+        '''
+        Finds the tests completed since the last update and the metrics they
+        make available, and returns the tests.
+        '''
+        protocol = self.protocol
+        intervals = self.intervals()
+        if not intervals:
+            return []
+        modes = []
+        for iv in intervals:
+            sm = iv['data'][:, iv['columns'].index('Storage Modulus')]
+            modes.append('rotation' if np.isnan(sm).all() else 'oscillation')
+        assigned = _protocol_intervals(modes, protocol)
+
+        # an interval is complete once another one starts, or once it has all
+        # its programmed points (the last interval of the run)
+        current = self.state['current']
+        measuring = current is not None and len(current['index']) > 0
+        tests = []
+        for k, t in protocol['tests'].items():
+            if k in self.complete:
+                continue
+            if t['view'] is not None:
+                if t['view'][0] in self.complete or t['view'][0] in tests:
+                    tests.append(k)
+                continue
+            ivs = assigned.get(k, [])
+            if len(ivs) < t['intervals']:
+                continue
+            n = len(ivs) - 1
+            first, last = t['bounds'][n]
+            if ivs[-1] < len(intervals) - 1 or not measuring or \
+                    len(intervals[ivs[-1]]['index']) >= last - first + (t['skip'] if n else 0):
+                tests.append(k)
+        self.complete = self.complete + tests
+
+        k = protocol_test('cyclic strain sweep', protocol)
+        if not tests and (k not in assigned or self.ready == len(self.cycles['t1/2 [s]'])):
+            return tests
+        sample = self.sample()
+        group = [sample]
+
+        plateau = [i for i, t in protocol['tests'].items() if t['plateau'] is not None]
+        if any(i in tests for i in plateau) and all(i in self.complete for i in plateau):
+            self.metrics["G' [Pa]"] = storage_modulus(group, protocol)[0]
+        s = protocol_test('strain sweep', protocol)
+        if s in tests:
+            self.metrics['Crossover Strain [%]'] = crossover_n(group, 1, protocol)[0]
+            if np.isnan(self.metrics['Crossover Strain [%]']):
+                self.flags.append('no strain crossover in the strain sweep (test %d)' % s)
+        if protocol_test('frequency sweep', protocol) in tests:
+            self.metrics['Crossover Frequency [rad/s]'] = crossover_n(group, 2, protocol)[0]
+        if protocol_test('shear thinning', protocol) in tests:
+            self.metrics.update({c: v[0] for c, v in flow_metrics(group, protocol=protocol).items()})
+
+        # recovery of every cycle whose recovery period has ended
+        if k in sample:
+            self._recovery(sample, k, k in self.complete)
+        return tests
+
+    def _recovery(self, sample, k, complete):
+        '''
+        Adds the recovery time of the cycles of the cyclic strain sweep that
+        have ended to self.cycles, and the averages once every cycle has.
+        '''
+        t = self.protocol['tests'][k]
+        a = sample.select(k, ['Time', 'Storage Modulus', 'Loss Modulus'])
+        ended = len(t['end']) if complete else int(np.searchsorted(t['end'], len(a), side='right'))
+        if ended <= self.ready:
+            return
+
+        # pad the points not measured yet, the cycles that ended do not reach them
+        css = np.full((max(t['points'], len(a)), 3), np.nan)
+        css[:len(a)] = a
+        for rtype, column in ((1, 't1/2 [s]'), (2, 'Recovery Crossover [s]')):
+            rec = recovery_batch(css[:, 0], css[:, 1], css[:, 2], rtype, protocol=self.protocol)[0]
+            self.cycles[column][self.ready:ended] = rec[self.ready:ended]
+        for c in range(self.ready, ended):
+            if np.isnan(self.cycles['t1/2 [s]'][c]):
+                self.flags.append("G' did not recover after high strain period %d of the cyclic strain sweep (test %d)"
+                                  % (c+1, k))
+        self.ready = ended
+        if ended == len(t['end']):
+            for column, values in self.cycles.items():
+                self.metrics[column] = _cycle_mean(values) # as rheology.group_metrics
+
+
+def export_name(path):
+    '''
+    Returns (formulation, replicate) from the name of an export, ex.
+    'data/PXP_N2.csv' gives ('PXP', 2). A name without _N<number> gives the
+    whole name and None.
+    '''
+    stem = os.path.splitext(os.path.basename(str(path)))[0]
+    formulation, sep, n = stem.rpartition('_N')
+    if sep and n.isdigit():
+        return formulation, int(n)
+    return stem, None
+
+
+def append_results(path, records):
+    '''
+    Appends metric records (as made by rheology.batch_analyze) to a csv
+    file, writing the header when the file is new. A file started with
+    other columns (ex. by an earlier version) keeps its own.
+    '''
+    new = not os.path.exists(path) or os.path.getsize(path) == 0
+    columns = RESULT_COLUMNS
+    if not new:
+        with open(path, newline='') as f:
+            columns = next(csv.reader(f))
+    with open(path, 'a', newline='') as f:
+        writer = csv.DictWriter(f, columns, extrasaction='ignore')
+        if new:
+            writer.writeheader()
+        writer.writerows(records)
+
+
+def _scan_exports(directories, pattern):
+    '''
+    Returns {path: (size, modification time)} of the files matching pattern
+    in directories.
+    '''
+    found = {}
+    for directory in directories:
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if fnmatch.fnmatch(entry.name, pattern) and entry.is_file():
+                st = entry.stat()
+                found[entry.path] = (st.st_size, st.st_mtime_ns)
+    return found
+
+
+async def watch_exports(directories, sink, pattern='*.csv', interval=2, settle=5, existing=True, workers=None,
+                        chunksize=8, queue_size=64, cache_dir=None, stop=None, retries=3, protocol=PROTOCOL):
+    '''
+    This function is a long running asyncio service that watches directories
+    for exports of Jenny Bennett's overall rheology protocol and analyzes
+    each new one (as rheology.batch_analyze does), passing the metrics to a
+    sink as soon as they are known.
+
+    Directories are scanned every interval seconds. A file is taken once its
+    size and modification time have not changed for settle seconds, so a
+    file still being written or copied is not read half way, and a file that
+    changes later is analyzed again. Files wait in a queue of queue_size;
+    when a bulk copy drops more files than the workers keep up with, the
+    scanner waits for room instead of piling them up in memory. Each worker
+    takes up to chunksize queued files at once and runs them on a process
+    pool, so the event loop never blocks on parsing or analysis. The pool
+    is spawned, so run it from under if __name__ == '__main__': in a script.
+
+    A failure never ends the service, only stop (or cancelling it) does. An
+    export that fails to parse gets an error row, as in batch_analyze, and
+    so does every export of a chunk whose analysis fails as a whole (the
+    pool is restarted if a worker process died). A sink that raises, ex. a
+    locked results store or a full disk, is retried after interval, then
+    twice as long, and so on; the records are dropped once retries are used
+    up. A scan that fails, ex. on a network share that went away, is tried
+    again after interval. Failures are logged to the rheology.live logger.
+
+    Parameters
+    ----------
+    directories : str or list of str
+        directories to watch (not recursive)
+
+    sink : callable or str
+        called with the list of records of each analyzed chunk (in a thread,
+        so it may block), or a csv file the records are appended to (see
+        rheology.append_results)
+
+    pattern : str
+        file name pattern of the exports
+
+    interval : float
+        seconds between scans
+
+    settle : float
+        seconds a file must stay unchanged before it is analyzed
+
+    existing : True/False
+        also analyze the files already there when the service starts
+
+    workers : int (optional)
+        number of worker processes, defaults to the number of CPUs
+
+    chunksize : int
+        largest number of exports analyzed together
+
+    queue_size : int
+        largest number of files waiting for a worker
+
+    cache_dir : str (optional)
+        segment cache directory (see rheology.cached_tests)
+
+    stop : asyncio.Event (optional)
+        set it to stop watching, the files already queued are finished first;
+        by default the service runs until it is cancelled
+
+    retries : int
+        times the sink is called again for a chunk it failed on
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol) the exports follow
+
+    Returns
+    -------
+    count : int
+        number of exports analyzed
+
+    Example
+    -------
+    async def main():
+        await rheology.watch_exports(['//rheometer/exports'], 'results.csv', workers=4)
+
+    if __name__ == '__main__':
+        asyncio.run(main())
+    '''
+    if isinstance(directories, (str, os.PathLike)):
+        directories = [directories]
+    if not callable(sink):
+        sink = functools.partial(append_results, sink)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if stop is None:
+        stop = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=queue_size)
+    spawn = multiprocessing.get_context('spawn')
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=spawn)
+    done = {} # (size, modification time) of every file taken that is still there
+    seen = {} # (size, modification time) of files settling and when they were first seen so
+    count = 0
+
+    async def scan():
+        first = True
+        while not stop.is_set():
+            try:
+                found = await loop.run_in_executor(None, _scan_exports, directories, pattern)
+            except Exception:
+                log.exception('scanning %s failed', directories)
+                found = None # ex. the share went away, try again next interval
+            if found is not None:
+                now = loop.time()
+                for path in list(seen):
+                    if path not in found:
+                        del seen[path] # removed before it settled
+                for path in list(done):
+                    if path not in found:
+                        del done[path] # removed (or moved away), so done does not grow forever
+                for path, stamp in found.items():
+                    if done.get(path) == stamp:
+                        continue
+                    if first and not existing:
+                        done[path] = stamp
+                    elif path not in seen or seen[path][0] != stamp:
+                        seen[path] = (stamp, now) # new, or still being written
+                    elif now - seen[path][1] >= settle:
+                        del seen[path]
+                        done[path] = stamp
+                        await queue.put(path) # waits while the workers are behind
+                first = False
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def analyze(jobs):
+        nonlocal pool
+        running = pool
+        try:
+            return await loop.run_in_executor(running, _analyze_chunk, jobs, cache_dir, protocol)
+        except Exception as e:
+            log.exception('analysis of %d exports failed', len(jobs))
+            if isinstance(e, BrokenProcessPool) and pool is running:
+                running.shutdown(wait=False) # a worker died, start a new pool
+                pool = ProcessPoolExecutor(max_workers=workers, mp_context=spawn)
+            error = '%s: %s' % (type(e).__name__, e)
+            return [dict({'Formulation': formulation, 'Replicate': replicate, 'File': str(path), 'Error': error},
+                         **dict.fromkeys(METRIC_COLUMNS, np.nan)) for formulation, replicate, path in jobs]
+
+    async def write(records):
+        nonlocal count
+        for attempt in range(retries + 1):
+            try:
+                await loop.run_in_executor(None, sink, records)
+                count = count + len(records)
+                return
+            except Exception:
+                if attempt == retries:
+                    log.exception('sink failed, %d records dropped: %s', len(records),
+                                  [r['File'] for r in records])
+                    return
+                log.warning('sink failed, retrying in %g s', interval * 2**attempt, exc_info=True)
+                await asyncio.sleep(interval * 2**attempt)
+
+    async def work():
+        while True:
+            paths = [await queue.get()]
+            while len(paths) < chunksize and not queue.empty():
+                paths.append(queue.get_nowait())
+            try:
+                jobs = [export_name(path) + (path,) for path in paths]
+                await write(await analyze(jobs))
+            finally:
+                for path in paths:
+                    queue.task_done()
+
+    scanner = asyncio.create_task(scan())
+    tasks = [asyncio.create_task(work()) for i in range(workers)]
+    try:
+        # the scanner returns once stop is set, the workers never return
+        await asyncio.wait([scanner] + tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in [scanner] + tasks:
+            if task.done():
+                task.result()
+        drained = asyncio.create_task(queue.join())
+        await asyncio.wait([drained] + tasks, return_when=asyncio.FIRST_COMPLETED)
+        drained.cancel()
+        for task in tasks:
+            if task.done():
+                task.result()
+    finally:
+        for task in [scanner] + tasks:
+            task.cancel()
+        await asyncio.gather(scanner, *tasks, return_exceptions=True)
+        await loop.run_in_executor(None, functools.partial(pool.shutdown, cancel_futures=True))
+
+    return count
@@ -0,0 +1,735 @@
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from .profiling import stage
+from .protocols import PROTOCOL, protocol_test
+
+
+def graph_modulus(df, x, y1, y2, y1legend, y2legend, ylabel, xlabel, xscale, title):
+    '''
+    This function graphs a rheology dataframe from "OverallTest_Jenny"
+    oscillating tests using storage modulus and loss modulus.
+
+    Parameters
+    ----------
+    df : dataframe
+        Pandas dataframe from a single segment in overall rheology (e.g first
+        time sweep test, 80 measuring points)
+
+    x : column in dataframe, str
+        Column contained in the dataframe df to be used as x values (e.g.
+        'Time')
+
+    y1 : column in dataframe, str
+        Column contained in the dataframe df to be used as y1 values (e.g.
+        'Storage Modulus')
+
+    y2 : column in dataframe, str
+        Column contained in the dataframe df to be used as y2 values (e.g.
+        'Loss Modulus')
+
+    y1legend : str
+        String for labeling y1 in the legend
+
+    y2 legend : str
+        String for labeling y2 in the legend
+
+    ylabel :  str
+        String for labeling y axis
+
+    xlabel : str
+        String for labeling x axis
+
+    xscale : "log" or "linear"
+
+    title : str
+        String for labeling the grpah title
+
+    Returns
+    -------
+    Graph of y1 and y2 vs x.
+
+    Example
+    -------
+    df = TS_1
+    x = 'Time'
+    y1 = 'Storage Modulus'
+    y2 = 'Loss Modulus'
+    y1legend = "G' Storage Modulus"
+    y2legend = 'G" Loss Modulus'
+    ylabel = 'G\' and G\" [Pa]'
+    xlabel = 'Time [s]'
+    title = 'Interval 1: Time Sweep, 10rad/s, 5% Strain'
+
+    graph_modulus(df, x, y1, y2, y1legend, y2legend, ylabel, xlabel, title)
+    '''
+
+    # create figure for graphing
+    fig, ax = plt.subplots(figsize=(6, 6))
+
+    # graph y1 points and line
+    df.plot(y=y1, x=x, kind='scatter', c='r', ax=ax, label=y1legend)
+    df.plot(y=y1, x=x, kind='line', c='r', ax=ax, linewidth=0.5,
+            label='')
+
+    # graph loss modulus points and line
+    df.plot(y=y2, x=x, kind='scatter', c='b', ax=ax, label=y2legend)
+    df.plot(y=y2, x=x, kind='line', c='b', ax=ax, linewidth=0.5,
+            label='')
+
+    # legend location and change yscale to log
+    plt.legend(loc='lower left', fontsize=14, framealpha=1)
+    plt.yscale("log")
+    plt.xscale(xscale)
+
+    # set axis parameters
+    ax.set_ylim(10**1, 10**4)
+    ax.set_ylabel(ylabel, fontsize=18)
+    ax.set_xlabel(xlabel, fontsize=18)
+    ax.tick_params(length=7, labelsize=14)
+    ax.tick_params(which='minor', length=4)
+    ax.set_title(title, fontsize=20)
+
+    # set axis on top layer and non transparent
+    ax.set_zorder(1)
+    ax.set_frame_on(True)
+
+    return
+
+
+def graph_viscosity(df, x, y1, y1legend, ylabel, xlabel, xscale, title):
+    '''
+    This function graphs a rheology dataframe from "OverallTest_Jenny"
+    rotational tests using viscosity and shear rate.
+
+    Parameters
+    ----------
+    df : dataframe
+        Pandas dataframe from a single segment in overall rheology (e.g first
+        time sweep test, 80 measuring points)
+
+    x : column in dataframe, str
+        Column contained in the dataframe df to be used as x values (e.g.
+        'Time')
+
+    y1 : column in dataframe, str
+        Column contained in the dataframe df to be used as y1 values (e.g.
+        'Storage Modulus')
+
+    y1legend : str
+        String for labeling y1 in the legend
+
+    ylabel :  str
+        String for labeling y axis
+
+    xlabel : str
+        String for labeling x axis
+
+    xscale : "log" or "linear"
+
+    title : str
+        String for labeling the grpah title
+
+    Returns
+    -------
+    Graph of y1 vs x.
+
+    Example
+    -------
+    df = ST_7
+    x = 'Shear rate'
+    y1 = 'Viscosity'
+    y1legend = "Viscosity"
+    ylabel = 'Viscosity [Pa*s]'
+    xlabel = 'Shear Rate [1/s]'
+    title = 'Interval 7: Shear Thinning'
+
+    graph_viscosity(df, x, y1, y1legend, ylabel, xlabel, title)
+    '''
+
+    # create figure for graphing
+    fig, ax = plt.subplots(figsize=(6, 6))
+
+    # graph y1 points and line
+    df.plot(y=y1, x=x, kind='scatter', c='r', ax=ax, label=y1legend)
+    df.plot(y=y1, x=x, kind='line', c='r', ax=ax, linewidth=0.5,
+            label='')
+
+    # graph loss modulus points and line
+    df.plot(y=y2, x=x, kind='scatter', c='b', ax=ax, label=y2legend)
+    df.plot(y=y2, x=x, kind='line', c='b', ax=ax, linewidth=0.5,
+            label='')
+
+    # legend location and change yscale to log
+    plt.legend(loc='upper right', fontsize=14, framealpha=1)
+    plt.yscale("log")
+    plt.xscale(xscale)
+
+    # set axis parameters
+    ax.set_ylim(10**0, 10**4)
+    ax.set_ylabel(ylabel, fontsize=18)
+    ax.set_xlabel(xlabel, fontsize=18)
+    ax.tick_params(length=7, labelsize=14)
+    ax.tick_params(which='minor', length=4)
+    ax.set_title(title, fontsize=20)
+
+    # set axis on top layer and non transparent
+    ax.set_zorder(1)
+    ax.set_frame_on(True)
+
+    return
+
+
+# colors of each dataset in comparison graphs, a (dark, light) pair per
+# dataset: the first column (G') is drawn dark and the second (G") light
+SERIES_COLORS = [('red', 'pink'), ('blue', 'lightblue'), ('forestgreen', 'lightgreen'),
+                 ('orange', 'navajowhite')]
+
+# markers of the columns in a graph, G' filled and G" open circles
+SERIES_MARKERS = ['o', "$\u25EF$"]
+
+# axis and line settings for each kind of comparison graph
+GRAPH_STYLES = {'modulus': {'figsize': (6, 6), 'yscale': 'log', 'ylim': (10**1, 10**4),
+                            'linewidth': 1, 'linestyles': ['-', '--'],
+                            'legend': {'loc': 'center left', 'bbox_to_anchor': (1, 0.5)}},
+                'strain sweep': {'figsize': (6, 6), 'yscale': 'log', 'ylim': (50, 10000), 'xlim': (50, 500),
+                                 'linewidth': 1, 'linestyles': ['-', '--'],
+                                 'legend': {'loc': 'center left', 'bbox_to_anchor': (1, 0.5)}},
+                'recovery': {'figsize': (8, 8), 'yscale': 'symlog', 'ylim': (-1, 10**5),
+                             'linewidth': 0.5, 'linestyles': ['-', '-'],
+                             'legend': {'loc': 'center left', 'bbox_to_anchor': (1, 0.5)}},
+                'recovery zoom': {'figsize': (6, 6), 'yscale': 'symlog', 'ylim': (-1, 10**5),
+                                  'linewidth': 0.5, 'linestyles': ['-', '-'],
+                                  'legend': {'loc': 'center left', 'bbox_to_anchor': (1, 0.5)}},
+                'viscosity': {'figsize': (6, 6), 'yscale': 'log', 'ylim': (10**0, 10**4),
+                              'linewidth': 2, 'linestyles': ['-'],
+                              'legend': {'loc': 'upper right'}}}
+
+
+def series_colors(n):
+    '''
+    Returns n (dark, light) color pairs for comparison graphs,
+    rheology.SERIES_COLORS first and then the pairs of the tab20 colormap.
+    '''
+    pairs = list(SERIES_COLORS)
+    tab20 = plt.get_cmap('tab20').colors
+    k = 0
+    while len(pairs) < n:
+        pairs.append((tab20[2*(k % 10)], tab20[2*(k % 10) + 1]))
+        k = k + 1
+    return pairs[:n]
+
+
+def _scaled(v, scale):
+    '''
+    Returns values as they are spaced on an axis of the given scale, log
+    and symlog axes compressed the same way (sign * log10(1 + |v|)).
+    '''
+    if scale in ('log', 'symlog'):
+        return np.sign(v)*np.log10(1 + np.abs(v))
+    return v
+
+
+def lttb(x, y, budget, keep=None):
+    '''
+    This function picks the points of a series to draw with at most budget
+    points, by largest triangle three buckets: the series is cut into
+    budget - 2 buckets and from each the point making the largest triangle
+    with the point picked before and the average of the next bucket is
+    kept, so peaks and sudden drops survive where an even stride would skip
+    them. The first and last points are always kept, and so is every point
+    where keep is True (those do not count against the budget). Points
+    that are not finite are left out.
+
+    Parameters
+    ----------
+    x, y : arrays
+        series values, in the spacing they are drawn in (see rheology._scaled)
+
+    budget : int
+        largest number of points to keep outside of keep, at least 3
+
+    keep : array of bool (optional)
+        points kept at full resolution, ex. inside a zoom window
+
+    Returns
+    -------
+    indexes : array of int
+        sorted positions of the points to draw
+
+    Example
+    -------
+    i = rheology.lttb(t, np.log10(storage), 500)
+    plt.plot(t[i], storage[i])
+    '''
+    x = np.asarray(x, np.float64)
+    y = np.asarray(y, np.float64)
+    finite = np.isfinite(x) & np.isfinite(y)
+    if keep is None:
+        keep = np.zeros(len(x), bool)
+    free = np.flatnonzero(finite & ~keep)
+    if len(free) <= budget:
+        return np.flatnonzero(finite)
+
+    # bucket edges over the free points, first and last alone
+    edges = np.linspace(1, len(free) - 1, budget - 1).astype(np.intp)
+    fx, fy = x[free], y[free]
+    # average of each bucket, the last one is the final point
+    avg_x = np.append(np.add.reduceat(fx[1:-1], edges[:-1] - 1) / np.diff(edges), fx[-1])
+    avg_y = np.append(np.add.reduceat(fy[1:-1], edges[:-1] - 1) / np.diff(edges), fy[-1])
+
+    picked = np.empty(budget, np.intp)
+    picked[0], picked[-1] = 0, len(free) - 1
+    a = 0
+    for b in range(budget - 2):
+        lo, hi = edges[b], edges[b+1]
+        # twice the triangle area with the last pick and the next bucket's average
+        area = np.abs((fx[a] - avg_x[b+1])*(fy[lo:hi] - fy[a]) - (fx[a] - fx[lo:hi])*(avg_y[b+1] - fy[a]))
+        a = lo + np.argmax(area)
+        picked[b+1] = a
+
+    chosen = np.zeros(len(x), bool)
+    chosen[free[picked]] = True
+    return np.flatnonzero(chosen | (finite & keep))
+
+
+def graph_series(frames, x, y, legends, ylabel, xlabel, xscale, title, style='modulus', s=50, l=None, spans=(), ax=None, decimate=None, keep=()):
+    '''
+    This function graphs a comparison of any number of rheology dataframes
+    from "OverallTest_Jenny". Each column of each dataframe is drawn as one
+    line with markers, straight from its numpy values, with colors from
+    rheology.series_colors and axis settings from rheology.GRAPH_STYLES.
+
+    Parameters
+    ----------
+    frames : list of dataframes
+        one per dataset, ex. the averages of each formulation
+
+    x : column in dataframe, str
+        Column to be used as x values (e.g. 'Time')
+
+    y : list of columns, str
+        Columns to be used as y values (e.g. ['Storage Modulus', 'Loss Modulus'])
+
+    legends : list
+        legend entries of each dataframe, a list matching y (or a str for a
+        single column), '' leaves a series out of the legend
+
+    ylabel :  str
+        String for labeling y axis
+
+    xlabel : str
+        String for labeling x axis
+
+    xscale : "log" or "linear"
+
+    title : str
+        String for labeling the graph title
+
+    style : str
+        key of rheology.GRAPH_STYLES, ex. 'modulus', 'strain sweep',
+        'recovery', 'recovery zoom' or 'viscosity'
+
+    s : int
+        marker size (area in points^2, as in scatter plots)
+
+    l : float (optional)
+        line width, defaults to the style's
+
+    spans : list of (start, end)
+        x ranges to highlight in gray
+
+    ax : matplotlib axes (optional)
+        axes to draw on, a new figure is made by default
+
+    decimate : int (optional)
+        largest number of points drawn per series, picked by rheology.lttb
+        in the spacing of the axes; by default every point is drawn
+
+    keep : list of (start, end)
+        x ranges drawn at full resolution when decimating
+
+    Returns
+    -------
+    fig, ax
+
+    Example
+    -------
+    avg = [rheology.all_tests_avg(g) for g in groups]
+    legends = [["G' " + n, 'G" ' + n] for n in names]
+
+    rheology.graph_series([a[0] for a in avg], 'Time', ['Storage Modulus', 'Loss Modulus'],
+                          legends, 'Modulus [Pa]', 'Time [s]', 'linear', 'Time Sweep')
+    '''
+    st = GRAPH_STYLES[style]
+    if ax is None:
+        fig, ax = plt.subplots(figsize=st['figsize'])
+    else:
+        fig = ax.figure
+
+    for start, end in spans:
+        ax.axvspan(start, end, color='lightgray', zorder=0)
+
+    # later datasets on top, and every G' above every G"
+    n = len(frames)
+    lw = st['linewidth'] if l is None else l
+    with stage('graph_series') as drawing:
+        for i, (df, legend, colors) in enumerate(zip(frames, legends, series_colors(n))):
+            if isinstance(legend, str):
+                legend = [legend]
+            xv = df[x].to_numpy(np.float64)
+            if decimate is not None:
+                full = np.zeros(len(xv), bool)
+                for start, end in keep:
+                    full |= (xv >= start) & (xv <= end)
+            for j, column in enumerate(y):
+                yv = df[column].to_numpy(np.float64)
+                if decimate is not None:
+                    drawn = lttb(_scaled(xv, xscale), _scaled(yv, st['yscale']), decimate, full)
+                    xs, yv = xv[drawn], yv[drawn]
+                else:
+                    xs = xv
+                drawing.add(rows=len(xs))
+                ax.plot(xs, yv, color=colors[j], marker=SERIES_MARKERS[j],
+                        markersize=np.sqrt(s), linestyle=st['linestyles'][j], linewidth=lw,
+                        label=legend[j], zorder=(len(y) - 1 - j)*n + i + 1)
+
+    # legend location and axis scales
+    ax.legend(fontsize=14, framealpha=1, **st['legend'])
+    ax.set_yscale(st['yscale'])
+    ax.set_xscale(xscale)
+
+    # set axis parameters
+    if 'xlim' in st:
+        ax.set_xlim(*st['xlim'])
+    ax.set_ylim(*st['ylim'])
+    ax.set_ylabel(ylabel, fontsize=18)
+    ax.set_xlabel(xlabel, fontsize=18)
+    ax.tick_params(length=7, labelsize=14)
+    ax.tick_params(which='minor', length=4)
+    ax.set_title(title, fontsize=20)
+
+    # set axis on top layer and non transparent
+    ax.set_zorder(1)
+    ax.set_frame_on(True)
+
+    return fig, ax
+
+
+def graph_recovery_series(frames, x, y, legends, ylabel, xlabel, xscale, title, s=50, zoom=False, protocol=PROTOCOL, ax=None, decimate=None):
+    '''
+    This function graphs a comparison of any number of cyclic strain sweeps
+    (rheology.graph_series) against the minutes since the first point of
+    each, with the high strain periods of the protocol highlighted.
+
+    Parameters
+    ----------
+    frames, x, y, legends, ylabel, xlabel, xscale, title, s, ax :
+        see rheology.graph_series
+
+    zoom : True/False
+        the frames are the zoomed in cyclic strain sweep (7) rather than the
+        whole one (5)
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol), the high strain periods
+        of its cyclic strain sweep are highlighted
+
+    decimate : int (optional)
+        largest number of points drawn per series outside of the high strain
+        periods and the zoom window, which are always drawn in full (as is
+        the zoomed in graph), see rheology.graph_series
+
+    Returns
+    -------
+    fig, ax
+    '''
+    # convert to minutes from the first point of the test, in new dataframes
+    # (assign), the data passed in is not modified
+    x_min = 'Time (min)'
+    frames = [df.assign(**{x_min: (df[x] - df[x].iloc[0])/60}) for df in frames]
+
+    # highlight high strain regions, from the first high strain point (midway
+    # from the last low strain point, the first one is skipped) to the last
+    k = protocol_test('cyclic strain sweep', protocol)
+    shift = 0
+    if zoom == True:
+        shift = protocol['tests'][protocol_test('zoom', protocol)]['view'][1]
+    t = frames[0][x_min].to_numpy()
+    spans = []
+    for st, end in protocol['tests'][k]['high']:
+        st, end = st - shift, end - shift
+        if 0 < st and end <= len(t):
+            spans.append(((t[st-1] + t[st])/2, t[end-1]))
+
+    # the drops and the zoom window stay at full resolution
+    keep = list(spans)
+    if zoom == True:
+        decimate = None
+    else:
+        view = protocol['tests'][protocol_test('zoom', protocol)]['view']
+        if view[1] < len(t):
+            keep.append((t[view[1]], t[min(view[2], len(t)) - 1]))
+
+    style = 'recovery zoom' if zoom == True else 'recovery'
+    return graph_series(frames, x_min, y, legends, ylabel, xlabel, xscale, title, style, s, spans=spans, ax=ax,
+                        decimate=decimate, keep=keep)
+
+
+def graph_modulus_comparison(df1, x, y1, y2, y1legend_df1, y2legend_df1, ylabel, xlabel, xscale, title, s=50, l=1, df2=pd.Series([]), y1legend_df2='', y2legend_df2='', df3=pd.Series([]), y1legend_df3='', y2legend_df3='', df4=pd.Series([]), y1legend_df4='', y2legend_df4='',ss=False):
+    '''
+    This function graphs a comparison of rheology dataframes from
+    "OverallTest_Jenny" oscillating tests using storage modulus and
+    loss modulus. For more than four dataframes use rheology.graph_series.
+
+    Parameters
+    ----------
+    df1 : dataframe
+        Pandas dataframe from a single segment in overall rheology (e.g first
+        time sweep test, 80 measuring points)
+
+    df2 : dataframe
+        Pandas dataframe from a single segment in overall rheology (e.g first
+        time sweep test, 80 measuring points)
+
+    df3/df4 : dataframe (optional)
+        Pandas dataframe from a single segment in overall rheology (e.g first
+        time sweep test, 80 measuring points)
+
+    x : column in dataframe, str
+        Column contained in the dataframe df to be used as x values (e.g.
+        'Time')
+
+    y1 : column in dataframe, str
+        Column contained in the dataframe df to be used as y1 values (e.g.
+        'Storage Modulus')
+
+    y2 : column in dataframe, str
+        Column contained in the dataframe df to be used as y2 values (e.g.
+        'Loss Modulus')
+
+    y1legend_df1 : str
+        String for labeling y1_df1 in the legend
+
+    y2legend_df1 : str
+        String for labeling y2_df1 in the legend
+
+    y1legend_df2 : str
+        String for labeling y1_df2 in the legend
+
+    y2legend_df2 : str
+        String for labeling y2_df2 in the legend
+
+    ylabel :  str
+        String for labeling y axis
+
+    xlabel : str
+        String for labeling x axis
+
+    xscale : "log" or "linear"
+
+    title : str
+        String for labeling the grpah title
+
+    ss : True/False
+        Changes x range for strain sweep (10-500% strain)
+
+    Returns
+    -------
+    Graph of y1 and y2 vs x.
+
+    Example
+    -------
+    df = TS_1
+    x = 'Time'
+    y1 = 'Storage Modulus'
+    y2 = 'Loss Modulus'
+    y1legend = "G' Storage Modulus"
+    y2legend = 'G" Loss Modulus'
+    ylabel = 'G\' and G\" [Pa]'
+    xlabel = 'Time [s]'
+    title = 'Interval 1: Time Sweep, 10rad/s, 5% Strain'
+
+    graph_modulus(df, x, y1, y2, y1legend, y2legend, ylabel, xlabel, title)
+    '''
+    frames = [df1]
+    legends = [[y1legend_df1, y2legend_df1]]
+    for df, y1legend, y2legend in ((df2, y1legend_df2, y2legend_df2), (df3, y1legend_df3, y2legend_df3),
+                                   (df4, y1legend_df4, y2legend_df4)):
+        if df.empty==False:
+            frames.append(df)
+            legends.append([y1legend, y2legend])
+
+    style = 'strain sweep' if ss==True else 'modulus' # change x limit for strain sweep
+    graph_series(frames, x, [y1, y2], legends, ylabel, xlabel, xscale, title, style, s, l)
+
+    return
+
+
+def graph_recovery_comparison(df1, x, y1, y2, y1legend_df1, y2legend_df1, ylabel, xlabel, xscale, title, s=50, df2=pd.Series([]), y1legend_df2='', y2legend_df2='', df3=pd.Series([]), y1legend_df3='', y2legend_df3='', df4=pd.Series([]), y1legend_df4='', y2legend_df4='', zoom=False, protocol=PROTOCOL, decimate=None):
+    '''
+    This function graphs a comparison of rheology dataframes from
+    "OverallTest_Jenny" oscillating tests using storage modulus and
+    loss modulus in cyclic strain tests. For more than four dataframes use
+    rheology.graph_recovery_series.
+
+    Parameters
+    ----------
+    df1 : dataframe
+        Pandas dataframe from a single segment in overall rheology (e.g first
+        time sweep test, 80 measuring points)
+
+    df2 : dataframe
+        Pandas dataframe from a single segment in overall rheology (e.g first
+        time sweep test, 80 measuring points)
+
+    df3 : dataframe (optional)
+        Pandas dataframe from a single segment in overall rheology (e.g first
+        time sweep test, 80 measuring points)
+
+    x : column in dataframe, str
+        Column contained in the dataframe df to be used as x values (e.g.
+        'Time')
+
+    y1 : column in dataframe, str
+        Column contained in the dataframe df to be used as y1 values (e.g.
+        'Storage Modulus')
+
+    y2 : column in dataframe, str
+        Column contained in the dataframe df to be used as y2 values (e.g.
+        'Loss Modulus')
+
+    y1legend_df1 : str
+        String for labeling y1_df1 in the legend
+
+    y2legend_df1 : str
+        String for labeling y2_df1 in the legend
+
+    y1legend_df2 : str
+        String for labeling y1_df2 in the legend
+
+    y2legend_df2 : str
+        String for labeling y2_df2 in the legend
+
+    ylabel :  str
+        String for labeling y axis
+
+    xlabel : str
+        String for labeling x axis
+
+    xscale : "log" or "linear"
+
+    title : str
+        String for labeling the grpah title
+
+    zoom : True/False
+        df1 is the zoomed in cyclic strain sweep (7) rather than the whole one (5)
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol), the high strain periods
+        of its cyclic strain sweep are highlighted
+
+    decimate : int (optional)
+        largest number of points drawn per series, see
+        rheology.graph_recovery_series
+
+    Returns
+    -------
+    Graph of y1 and y2 vs x.
+
+    Example
+    -------
+    df = TS_1
+    x = 'Time'
+    y1 = 'Storage Modulus'
+    y2 = 'Loss Modulus'
+    y1legend = "G' Storage Modulus"
+    y2legend = 'G" Loss Modulus'
+    ylabel = 'G\' and G\" [Pa]'
+    xlabel = 'Time [s]'
+    title = 'Interval 1: Time Sweep, 10rad/s, 5% Strain'
+
+    graph_modulus(df, x, y1, y2, y1legend, y2legend, ylabel, xlabel, title)
+    '''
+    frames = [df1]
+    legends = [[y1legend_df1, y2legend_df1]]
+    for df, y1legend, y2legend in ((df2, y1legend_df2, y2legend_df2), (df3, y1legend_df3, y2legend_df3),
+                                   (df4, y1legend_df4, y2legend_df4)):
+        if df.empty==False:
+            frames.append(df)
+            legends.append([y1legend, y2legend])
+
+    graph_recovery_series(frames, x, [y1, y2], legends, ylabel, xlabel, xscale, title, s, zoom, protocol,
+                          decimate=decimate)
+
+    return
+
+
+def graph_viscosity_comparison(df1, x, y1, y1legend_df1, ylabel, xlabel, xscale, title, df2=pd.Series([]), y1legend_df2='', df3=pd.Series([]), y1legend_df3='', df4=pd.Series([]), y1legend_df4=''):
+    '''
+    This function graphs a rheology dataframe from "OverallTest_Jenny"
+    rotational tests using viscosity and shear rate. For more than four
+    dataframes use rheology.graph_series with style='viscosity'.
+
+    Parameters
+    ----------
+    df1 : dataframe
+        Pandas dataframe from a single segment in overall rheology (e.g first
+        time sweep test, 80 measuring points)
+
+    df2 : dataframe
+        Pandas dataframe from a single segment in overall rheology (e.g first
+        time sweep test, 80 measuring points)
+
+    x : column in dataframe, str
+        Column contained in the dataframe df to be used as x values (e.g.
+        'Time')
+
+    y1 : column in dataframe, str
+        Column contained in the dataframe df to be used as y1 values (e.g.
+        'Storage Modulus')
+
+    y1legend_df1 : str
+        String for labeling y1_df1 in the legend
+
+    y1legend_df2 : str
+        String for labeling y1_df2 in the legend
+
+    ylabel :  str
+        String for labeling y axis
+
+    xlabel : str
+        String for labeling x axis
+
+    xscale : "log" or "linear"
+
+    title : str
+        String for labeling the grpah title
+
+    Returns
+    -------
+    Graph of y1 vs x.
+
+    Example
+    -------
+    df = ST_7
+    x = 'Shear rate'
+    y1 = 'Viscosity'
+    y1legend = "Viscosity"
+    ylabel = 'Viscosity [Pa*s]'
+    xlabel = 'Shear Rate [1/s]'
+    title = 'Interval 7: Shear Thinning'
+
+    graph_viscosity(df, x, y1, y1legend, ylabel, xlabel, title)
+    '''
+    frames = [df1]
+    legends = [y1legend_df1]
+    for df, y1legend in ((df2, y1legend_df2), (df3, y1legend_df3), (df4, y1legend_df4)):
+        if df.empty==False:
+            frames.append(df)
+            legends.append(y1legend)
+
+    graph_series(frames, x, [y1], legends, ylabel, xlabel, xscale, title, 'viscosity')
+
+    return
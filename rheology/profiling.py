@@ -0,0 +1,194 @@
+import json
+import os
+import threading
+import time
+
+
+# what is listening to stages: profiles being recorded (rheology.Profile)
+# and callbacks (rheology.add_hook). Stages cost one check of these while
+# both are empty.
+_PROFILES = []
+_HOOKS = []
+
+# counts every stage can record
+COUNTERS = ('rows', 'iterations', 'unconverged')
+
+
+class _NullStage:
+    '''
+    Stage returned while nothing listens, does nothing.
+    '''
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, **counts):
+        pass
+
+
+_NULL = _NullStage()
+
+
+class _Stage:
+    '''
+    Times one run of a stage and passes it to the listeners on exit.
+    '''
+    __slots__ = ('name', 'counts', 'start')
+
+    def __init__(self, name, counts):
+        self.name = name
+        self.counts = counts
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        event = {'stage': self.name, 'start': self.start, 'seconds': end - self.start,
+                 'pid': os.getpid(), 'tid': threading.get_ident()}
+        event.update(self.counts)
+        _emit(event)
+        return False
+
+    def add(self, **counts):
+        '''
+        Adds to the counts of this run, ex. rows once they are known.
+        '''
+        for k, v in counts.items():
+            self.counts[k] = self.counts.get(k, 0) + v
+
+
+def stage(name, **counts):
+    '''
+    This function marks a stage of the pipeline for rheology.Profile and
+    the callbacks of rheology.add_hook. It returns a context manager timing
+    the block it wraps; counts (rows, iterations, unconverged) can be given
+    here or added with .add() inside the block. While nothing is listening
+    it returns a shared do-nothing object, so a stage costs one function
+    call.
+
+    Example
+    -------
+    with rheology.profiling.stage('read_intervals') as st:
+        ...
+        st.add(rows=len(rows))
+    '''
+    if not (_PROFILES or _HOOKS):
+        return _NULL
+    return _Stage(name, counts)
+
+
+def listening():
+    '''
+    Returns True while a profile or a callback is listening to stages.
+    '''
+    return bool(_PROFILES or _HOOKS)
+
+
+def _emit(event):
+    '''
+    Passes a finished stage to every listener.
+    '''
+    for p in list(_PROFILES):
+        p.events.append(event)
+    for hook in list(_HOOKS):
+        hook(event)
+
+
+def add_hook(callback):
+    '''
+    Registers callback(event) to be called after every stage, where event
+    is a dictionary with 'stage', 'start' (time.perf_counter), 'seconds',
+    'pid', 'tid' and any counts. Returns callback, so it can be used as a
+    decorator.
+    '''
+    _HOOKS.append(callback)
+    return callback
+
+
+def remove_hook(callback):
+    '''
+    Unregisters a callback added with rheology.add_hook.
+    '''
+    _HOOKS.remove(callback)
+
+
+class Profile:
+    '''
+    This class records every stage run while it is active, as a context
+    manager (or between start() and stop()). Stages run in the worker
+    processes of rheology.batch_analyze are recorded too; other process
+    pools are not followed.
+
+    Example
+    -------
+    with rheology.Profile() as prof:
+        rheology.batch_analyze(paths)
+
+    prof.records()            # one dictionary per stage
+    prof.write_trace('batch.json')  # open in chrome://tracing or Perfetto
+    '''
+    def __init__(self):
+        self.events = []
+
+    def start(self):
+        _PROFILES.append(self)
+        return self
+
+    def stop(self):
+        _PROFILES.remove(self)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def records(self):
+        '''
+        Returns one dictionary per stage, in the order they first ran, with
+        'stage', 'calls', 'seconds' (total wall time), 'max_seconds' and
+        the total of each count in rheology.profiling.COUNTERS.
+        '''
+        stages = {}
+        for e in self.events:
+            r = stages.get(e['stage'])
+            if r is None:
+                r = stages[e['stage']] = dict({'stage': e['stage'], 'calls': 0, 'seconds': 0.0,
+                                               'max_seconds': 0.0}, **dict.fromkeys(COUNTERS, 0))
+            r['calls'] = r['calls'] + 1
+            r['seconds'] = r['seconds'] + e['seconds']
+            r['max_seconds'] = max(r['max_seconds'], e['seconds'])
+            for c in COUNTERS:
+                r[c] = r[c] + e.get(c, 0)
+        return list(stages.values())
+
+    def trace(self):
+        '''
+        Returns the stages as a Chrome trace (the Trace Event Format read by
+        chrome://tracing and Perfetto), one complete event per stage run.
+        '''
+        origin = min((e['start'] for e in self.events), default=0)
+        events = []
+        for e in self.events:
+            args = {c: e[c] for c in COUNTERS if c in e}
+            events.append({'name': e['stage'], 'cat': 'rheology', 'ph': 'X',
+                           'ts': (e['start'] - origin) * 1e6, 'dur': e['seconds'] * 1e6,
+                           'pid': e['pid'], 'tid': e['tid'], 'args': args})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_trace(self, path):
+        '''
+        Writes rheology.Profile.trace to a json file.
+        '''
+        with open(path, 'w') as f:
+            json.dump(self.trace(), f)
+
+    def __repr__(self):
+        return 'Profile(%d stage runs)' % len(self.events)
@@ -0,0 +1,124 @@
+import hashlib
+import json
+
+# Jenny Bennett's overall rheology protocol ("Overall_Test_Jenny"), one entry
+# per test in the order they are run (the position is the test number):
+#   kind: what the test is, the analysis looks tests up by kind
+#   mode: 'oscillation' or 'rotation'
+#   points: programmed measuring points of each interval of the test
+#   skip: points dropped at the start of every interval but the first
+#   plateau: (first, last) points averaged for the plateau G'
+#   low/high: cyclic strain sweep windows, (interval, first, last) points of
+#       the low strain interval before each high strain period and the high
+#       strain intervals; the recovery runs to the end of the next interval
+#   view: (test, interval, before, after) a zoom into another test around
+#       one of its intervals, stored as a window rather than a copy
+OVERALL_TEST_JENNY = {
+    'name': 'Overall_Test_Jenny',
+    'version': 1,
+    'tests': [
+        {'kind': 'time sweep', 'mode': 'oscillation', 'points': [80], 'plateau': (59, None)},
+        {'kind': 'frequency sweep', 'mode': 'oscillation', 'points': [31]},
+        {'kind': 'time sweep', 'mode': 'oscillation', 'points': [80], 'plateau': (59, None)},
+        {'kind': 'strain sweep', 'mode': 'oscillation', 'points': [113]},
+        {'kind': 'time sweep', 'mode': 'oscillation', 'points': [80]},
+        {'kind': 'cyclic strain sweep', 'mode': 'oscillation',
+         'points': [600, 20, 600, 20, 600, 20, 600, 20, 600], 'skip': 1,
+         'low': [(0, 0, None), (2, -201, None), (4, -201, None), (6, -201, None)],
+         'high': [1, 3, 5, 7]},
+        {'kind': 'shear thinning', 'mode': 'rotation', 'points': [28]},
+        {'kind': 'zoom', 'view': (5, 1, 101, 100)},
+    ],
+}
+
+
+def compile_protocol(definition):
+    '''
+    This function compiles a protocol definition (see
+    rheology.OVERALL_TEST_JENNY) into the index of positions used by the
+    parsers, the analysis and the graphs, so a protocol variant only needs
+    its own definition. Compile a definition once and pass the result as
+    protocol= to the functions that take it.
+
+    Parameters
+    ----------
+    definition : dictionary
+        'name', 'version' and 'tests', a list of test dictionaries
+
+    Returns
+    -------
+    protocol : dictionary
+        'name', 'version', 'key' (name, version and a hash of the test
+        layout, used in cache keys, so editing a definition without
+        changing its version does not load stale caches),
+        'kinds' ({kind: [tests]}) and 'tests', {test: dictionary} with
+        'kind', 'mode', 'intervals' (number of intervals read), 'skip',
+        'points' (stored points), 'bounds' ((first, last) position of each
+        interval in the test), 'plateau', 'view' ((test, first, last)) and
+        for cyclic tests 'low', 'high' (lists of (first, last)), 'end' (last
+        position of each recovery) and 'start' (position recovery time is
+        measured from, the last high strain point)
+
+    Example
+    -------
+    variant = dict(rheology.OVERALL_TEST_JENNY, name='Short_Cycles', tests=[...])
+
+    protocol = rheology.compile_protocol(variant)
+    '''
+    tests = {}
+    kinds = {}
+    for k, t in enumerate(definition['tests']):
+        kinds.setdefault(t['kind'], []).append(k)
+        test = {'kind': t['kind'], 'mode': t.get('mode'), 'intervals': 0, 'skip': 0,
+                'points': 0, 'bounds': [], 'plateau': t.get('plateau'), 'view': None}
+        tests[k] = test
+        if 'view' in t:
+            continue
+
+        # position of each interval once the skipped points are dropped
+        skip = t.get('skip', 0)
+        pos = 0
+        for n, points in enumerate(t['points']):
+            stored = points - (skip if n else 0)
+            test['bounds'].append((pos, pos + stored))
+            pos = pos + stored
+        test.update(intervals=len(t['points']), skip=skip, points=pos)
+
+        if 'high' in t:
+            bounds = test['bounds']
+            test['low'] = []
+            for i, first, last in t['low']:
+                window = range(*bounds[i])[first:last] # first/last count from the interval start (or end if negative)
+                test['low'].append((window[0], window[-1] + 1))
+            test['high'] = [bounds[i] for i in t['high']]
+            test['end'] = [bounds[i+1][1] for i in t['high']]
+            test['start'] = [bounds[i][1] - 1 for i in t['high']]
+
+    for k, t in enumerate(definition['tests']):
+        if 'view' in t:
+            base, interval, before, after = t['view']
+            s, e = tests[base]['bounds'][interval]
+            tests[k].update(view=(base, s - before, e + after), points=e + after - s + before)
+
+    # what the segments are cut by: kinds, modes, intervals, skipped points, bounds and views
+    layout = [[k, t['kind'], t['mode'], t['intervals'], t['skip'], t['points'], t['bounds'], t['view']]
+              for k, t in tests.items()]
+    digest = hashlib.sha1(json.dumps(layout).encode()).hexdigest()[:12]
+
+    return {'name': definition['name'], 'version': definition['version'],
+            'key': '%s-%s-%s' % (definition['name'], definition['version'], digest),
+            'kinds': kinds, 'tests': tests}
+
+
+PROTOCOL = compile_protocol(OVERALL_TEST_JENNY) # the default protocol, compiled at import
+
+
+def protocol_test(kind, protocol=PROTOCOL):
+    '''
+    Returns the number of the first test of a kind in a compiled protocol,
+    ex. rheology.protocol_test('strain sweep') is 3.
+    '''
+    try:
+        return protocol['kinds'][kind][0]
+    except KeyError:
+        raise ValueError('protocol %s has no %s' % (protocol['key'], kind)) from None
@@ -0,0 +1,251 @@
+import base64
+import html
+import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib.image
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+from .analysis import METRIC_COLUMNS, all_tests_avg, batch_analyze
+from .io import _is_path, all_tests_n
+from .plotting import GRAPH_STYLES, graph_recovery_series, graph_series
+from .profiling import stage
+from .protocols import PROTOCOL
+
+
+# standard figures of a study report for each kind of test: x, y, graph
+# style, y label, x label, x scale, marker size and line width
+REPORT_FIGURES = {'time sweep': ('Time', ['Storage Modulus', 'Loss Modulus'], 'modulus',
+                                 'Modulus [Pa]', 'Time [s]', 'linear', 50, 1),
+                  'frequency sweep': ('Angular Frequency', ['Storage Modulus', 'Loss Modulus'], 'modulus',
+                                      'Modulus [Pa]', 'Angular Frequency [rad/s]', 'log', 50, 2),
+                  'strain sweep': ('Strain', ['Storage Modulus', 'Loss Modulus'], 'strain sweep',
+                                   'Modulus [Pa]', 'Strain [%]', 'log', 50, 2),
+                  'cyclic strain sweep': ('Time', ['Storage Modulus', 'Loss Modulus'], 'recovery',
+                                          'Modulus [Pa]', 'Time [min]', 'linear', 10, None),
+                  'zoom': ('Time', ['Storage Modulus', 'Loss Modulus'], 'recovery zoom',
+                           'Modulus [Pa]', 'Time [min]', 'linear', 20, None),
+                  'shear thinning': ('Shear Rate', ['Viscosity'], 'viscosity',
+                                     'Viscosity [Pa*s]', 'Shear Rate [1/s]', 'linear', 50, None)}
+
+
+def _report_average(paths, cache_dir, protocol):
+    '''
+    Returns the average of every test (rheology.all_tests_avg) of one
+    formulation, read through the segment cache.
+    '''
+    group = [all_tests_n(path, cache_dir, protocol=protocol) for path in paths]
+    return all_tests_avg(group, protocol=protocol)
+
+
+def _render_page(page, cache_dir, protocol, image, dpi, decimate=None):
+    '''
+    Renders one figure of a study report and returns it as svg text or png
+    bytes. page is (test, title, frames, legends), where frames is a list of
+    dataframes, or of paths whose test is read through the segment cache.
+    The figure is made without pyplot, so it is never registered with a
+    backend and is freed as soon as it is saved.
+    '''
+    k, title, frames, legends = page
+    kind = protocol['tests'][k]['kind']
+    x, y, style, ylabel, xlabel, xscale, size, l = REPORT_FIGURES[kind]
+    frames = [all_tests_n(f, cache_dir, protocol=protocol)[k] if _is_path(f) else f for f in frames]
+    if len(y) == 2:
+        legends = [["G' " + n, 'G" ' + n] for n in legends]
+    else:
+        legends = ['\u03B7 ' + n for n in legends]
+
+    fig = Figure(figsize=GRAPH_STYLES[style]['figsize'])
+    ax = fig.subplots()
+    if kind in ('cyclic strain sweep', 'zoom'):
+        graph_recovery_series(frames, x, y, legends, ylabel, xlabel, xscale, title, size,
+                              zoom=(kind == 'zoom'), protocol=protocol, ax=ax, decimate=decimate)
+    else:
+        graph_series(frames, x, y, legends, ylabel, xlabel, xscale, title, style, size, l, ax=ax,
+                     decimate=decimate)
+
+    out = io.BytesIO()
+    with stage('savefig'):
+        fig.savefig(out, format=image, dpi=dpi, bbox_inches='tight')
+    fig.clear()
+    return out.getvalue()
+
+
+def _table_pages(pdf, title, df, rows=45, columns=10):
+    '''
+    Writes a table to a PdfPages file as text pages of at most rows rows and
+    columns columns.
+    '''
+    for first in range(0, max(len(df.columns), 1), columns):
+        part = df.iloc[:, first:first+columns]
+        lines = part.to_string(float_format=lambda v: '%.4g' % v).splitlines()
+        header, body = lines[:part.columns.nlevels + 1], lines[part.columns.nlevels + 1:]
+        for start in range(0, max(len(body), 1), rows):
+            fig = Figure(figsize=(11, 8.5))
+            fig.text(0.04, 0.95, title, fontsize=14, va='top')
+            fig.text(0.04, 0.9, '\n'.join(header + body[start:start+rows]), family='monospace',
+                     fontsize=7, va='top')
+            pdf.savefig(fig)
+            fig.clear()
+
+
+def study_report(study, path, workers=None, cache_dir=None, replicates=True, image='svg', dpi=150, decimate=None, protocol=PROTOCOL):
+    '''
+    This function writes a report for a whole study of formulations: the
+    metric tables from rheology.storage_modulus, rheology.crossover,
+    rheology.recovery and rheology.flow_metrics (one row per export and the
+    mean and standard deviation per formulation), the standard figures
+    comparing the average of every formulation (time sweeps, frequency
+    sweep, strain sweep, cyclic strain sweep full and zoomed, shear
+    thinning) and, with replicates=True, the same figures for the
+    replicates of each formulation.
+
+    Exports are parsed once into a segment cache and analyzed with
+    rheology.batch_analyze. Averages and figures are made on a pool of worker
+    processes without pyplot (so no interactive backend is needed) and every
+    figure is freed once it is saved, so memory stays flat however many
+    pages are written. The workers are spawned, so call it from under
+    if __name__ == '__main__': in a script.
+
+    Parameters
+    ----------
+    study : dictionary
+        {formulation: [paths to csv exports]}
+
+    path : str
+        report to write, a .pdf (multi-page) or .html (static, self-contained) file
+
+    workers : int (optional)
+        number of worker processes, defaults to the number of CPUs; 1 runs
+        everything in the calling process
+
+    cache_dir : str (optional)
+        segment cache directory (see rheology.cached_tests), a temporary one
+        is used by default
+
+    replicates : True/False
+        add the figures of each formulation's replicates
+
+    image : 'svg' or 'png'
+        figure format in html reports; pdf pages are png images at dpi
+
+    dpi : int
+        resolution of png figures
+
+    decimate : int (optional)
+        largest number of points drawn per series (see rheology.lttb), keeps
+        svg figures of dense tests small; by default every point is drawn
+
+    protocol : dictionary
+        compiled protocol (rheology.compile_protocol) the exports follow
+
+    Returns
+    -------
+    metrics : dataframe
+        one row per export, as returned by rheology.batch_analyze
+
+    Example
+    -------
+    study = {'PXP': ['exampledata/PXP_N1.csv', 'exampledata/PXP_N2.csv'],
+             'T40A': ['exampledata/TXT_N1.csv', 'exampledata/TXT_N2.csv']}
+
+    rheology.study_report(study, 'report.pdf', workers=4)
+    '''
+    pdf = os.path.splitext(str(path))[1].lower() == '.pdf'
+    if pdf:
+        image = 'png'
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    tmp = None
+    if cache_dir is None:
+        cache_dir = tmp = tempfile.mkdtemp(prefix='rheology_report_')
+    try:
+        # metric tables, parsing every export into the cache on the way
+        metrics = batch_analyze(study, workers, cache_dir=cache_dir, protocol=protocol)
+        summary = metrics.groupby('Formulation', sort=False)[METRIC_COLUMNS].agg(['mean', 'std'])
+        ok = metrics[metrics['Error'] == '']
+        groups = {f: list(ok.loc[ok['Formulation'] == f, 'File']) for f in study}
+        groups = {f: files for f, files in groups.items() if files}
+        names = list(groups)
+
+        # spawned workers start with fresh font state, forked ones would share
+        # the font files matplotlib has open in this process
+        pool = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        try:
+            run = pool.map if pool else map
+            averages = list(run(_report_average, groups.values(), [cache_dir]*len(groups),
+                                [protocol]*len(groups)))
+
+            # one page per test comparing the formulations, then per formulation
+            pages = []
+            for k, t in protocol['tests'].items():
+                title = '%s %d' % (t['kind'].title(), k)
+                pages.append((k, title, [a[k] for a in averages], names))
+            if replicates:
+                for f, files in groups.items():
+                    for k, t in protocol['tests'].items():
+                        title = '%s %d, %s' % (t['kind'].title(), k, f)
+                        pages.append((k, title, files, ['n%d' % (n+1) for n in range(len(files))]))
+
+            rendered = run(_render_page, pages, [cache_dir]*len(pages), [protocol]*len(pages),
+                           [image]*len(pages), [dpi]*len(pages), [decimate]*len(pages))
+            if pdf:
+                _write_pdf_report(path, metrics, summary, pages, rendered, dpi)
+            else:
+                _write_html_report(path, metrics, summary, pages, rendered, image)
+        finally:
+            if pool:
+                pool.shutdown()
+    finally:
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    return metrics
+
+
+def _write_pdf_report(path, metrics, summary, pages, rendered, dpi):
+    '''
+    Writes the tables and the rendered png figures of a study report as a
+    multi-page pdf, one figure per page, as the figures arrive.
+    '''
+    with PdfPages(path) as pdf:
+        _table_pages(pdf, 'Summary (mean, std per formulation)', summary)
+        _table_pages(pdf, 'Metrics per export', metrics.set_index(['Formulation', 'Replicate']))
+        for page, png in zip(pages, rendered):
+            img = matplotlib.image.imread(io.BytesIO(png), format='png')
+            fig = Figure(figsize=(img.shape[1] / dpi, img.shape[0] / dpi))
+            fig.figimage(img, resize=False)
+            pdf.savefig(fig, dpi=dpi)
+            fig.clear()
+
+
+def _write_html_report(path, metrics, summary, pages, rendered, image):
+    '''
+    Writes the tables and the rendered figures of a study report as one
+    static html file, figures inline, as the figures arrive.
+    '''
+    fmt = lambda v: '%.4g' % v
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Rheology report</title>'
+                '<style>body{font-family:sans-serif} table{border-collapse:collapse;font-size:12px}'
+                'td,th{border:1px solid #ccc;padding:2px 6px} figure{display:inline-block;margin:4px}'
+                '</style></head><body>\n<h1>Rheology report</h1>\n')
+        f.write('<h2>Summary (mean, std per formulation)</h2>\n%s\n' % summary.to_html(float_format=fmt))
+        f.write('<h2>Metrics per export</h2>\n%s\n' % metrics.to_html(index=False, float_format=fmt))
+        f.write('<h2>Figures</h2>\n')
+        for (k, title, frames, legends), data in zip(pages, rendered):
+            if image == 'svg':
+                body = data.decode('utf-8')
+                body = body[body.index('<svg'):] # drop the xml prolog and doctype
+            else:
+                body = '<img src="data:image/png;base64,%s" alt="%s"/>' % (
+                    base64.b64encode(data).decode('ascii'), html.escape(title))
+            f.write('<figure>%s</figure>\n' % body)
+        f.write('</body></html>\n')
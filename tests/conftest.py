@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the package is used from the repository, as the benchmarks do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
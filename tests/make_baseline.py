@@ -0,0 +1,83 @@
+'''
+Writes tests/data/baseline.json, the outputs of the single module rheology.py
+the package was split from, on exampledata/. The tests compare the package
+against it.
+
+Usage
+-----
+git show <baseline commit>:rheology.py > /tmp/rheology_legacy.py
+python tests/make_baseline.py /tmp/rheology_legacy.py
+'''
+import glob
+import importlib.util
+import json
+import os
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+ENCODING = 'ISO-8859-1'
+
+# positions recovery time is measured from in the legacy rheology.recovery
+START = [1081, 1727, 2373, 3019]
+
+
+def summarize(test):
+    '''
+    Returns the length, ends and sum of the index and the count, sum, min
+    and max of every column of a test.
+    '''
+    columns = {}
+    for c in test.columns:
+        values = pd.to_numeric(test[c], errors='coerce').to_numpy(dtype=np.float64)
+        finite = values[np.isfinite(values)]
+        columns[c] = {'count': int(len(finite)), 'sum': float(finite.sum()),
+                      'min': float(finite.min()) if len(finite) else None,
+                      'max': float(finite.max()) if len(finite) else None}
+    index = [int(i) for i in test.index]
+    return {'index': {'length': len(index), 'first': index[0], 'last': index[-1], 'sum': sum(index)},
+            'columns': columns}
+
+
+def frame(df):
+    '''
+    Returns a dataframe as index, columns and values (NaN as None).
+    '''
+    values = [[None if pd.isna(v) else float(v) for v in row] for row in df.to_numpy()]
+    return {'index': [str(i) for i in df.index], 'columns': [str(c) for c in df.columns], 'values': values}
+
+
+def main(legacy):
+    spec = importlib.util.spec_from_file_location('rheology_legacy', legacy)
+    rh = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(rh)
+
+    baseline = {'start': START, 'samples': {}, 'groups': {}}
+    for group in ('PXP', 'TXT'):
+        paths = sorted(glob.glob(os.path.join(ROOT, 'exampledata', group + '_N*.csv')))
+        samples = [rh.all_tests_n(pd.read_csv(p, encoding=ENCODING)) for p in paths]
+        for p, s in zip(paths, samples):
+            baseline['samples'][os.path.basename(p)] = {str(k): summarize(t) for k, t in s.items()}
+
+        name = ['n%d' % (n+1) for n in range(len(samples))]
+        baseline['groups'][group] = {
+            'files': [os.path.basename(p) for p in paths],
+            'name': name,
+            'storage_modulus': [float(v) for v in rh.storage_modulus(samples)],
+            'crossover_1': frame(rh.crossover(samples, name, 1)),
+            'crossover_2': frame(rh.crossover(samples, name, 2)),
+            'recovery_1': frame(rh.recovery(START, samples, name, 1)),
+            'recovery_2': frame(rh.recovery(START, samples, name, 2))}
+
+    with open(os.path.join(HERE, 'data', 'baseline.json'), 'w') as f:
+        json.dump(baseline, f, indent=1)
+
+
+if __name__ == '__main__':
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        main(sys.argv[1])
@@ -0,0 +1,77 @@
+'''
+The package against the outputs of the single module rheology.py it was
+split from (tests/data/baseline.json, written by tests/make_baseline.py),
+on exampledata/.
+'''
+import json
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import rheology as rh
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EXAMPLES = os.path.join(os.path.dirname(HERE), 'exampledata')
+
+with open(os.path.join(HERE, 'data', 'baseline.json')) as f:
+    BASELINE = json.load(f)
+
+
+def read_group(group):
+    '''
+    Returns the parsed exports of a group and their names.
+    '''
+    files = BASELINE['groups'][group]['files']
+    return [rh.all_tests_n(os.path.join(EXAMPLES, f)) for f in files], BASELINE['groups'][group]['name']
+
+
+def check_frame(df, expected, rtol=1e-7):
+    # the legacy crossover and recovery times came from scipy's fsolve (xtol 1.5e-8)
+    assert [str(i) for i in df.index] == expected['index']
+    assert [str(c) for c in df.columns] == expected['columns']
+    values = np.array(expected['values'], dtype=np.float64) # None as NaN
+    np.testing.assert_allclose(df.to_numpy(dtype=np.float64), values, rtol=rtol, equal_nan=True)
+
+
+@pytest.mark.parametrize('file', sorted(BASELINE['samples']))
+def test_all_tests_n(file):
+    sample = rh.all_tests_n(os.path.join(EXAMPLES, file))
+    for k, expected in BASELINE['samples'][file].items():
+        test = sample[int(k)]
+        index = [int(i) for i in test.index]
+        assert [len(index), index[0], index[-1], sum(index)] == [expected['index'][c] for c in
+                                                                 ('length', 'first', 'last', 'sum')]
+        assert sorted(test.columns) == sorted(expected['columns'])
+        for c, summary in expected['columns'].items():
+            values = pd.to_numeric(test[c], errors='coerce').to_numpy(dtype=np.float64)
+            finite = values[np.isfinite(values)]
+            assert len(finite) == summary['count'], (k, c)
+            if summary['count']:
+                np.testing.assert_allclose([finite.sum(), finite.min(), finite.max()],
+                                           [summary['sum'], summary['min'], summary['max']], rtol=1e-9)
+
+
+@pytest.mark.parametrize('group', sorted(BASELINE['groups']))
+def test_storage_modulus(group):
+    samples, name = read_group(group)
+    np.testing.assert_allclose(rh.storage_modulus(samples), BASELINE['groups'][group]['storage_modulus'], rtol=1e-9)
+
+
+@pytest.mark.parametrize('cotype', [1, 2])
+@pytest.mark.parametrize('group', sorted(BASELINE['groups']))
+def test_crossover(group, cotype):
+    samples, name = read_group(group)
+    check_frame(rh.crossover(samples, name, cotype), BASELINE['groups'][group]['crossover_%d' % cotype])
+
+
+@pytest.mark.parametrize('rtype', [1, 2])
+@pytest.mark.parametrize('group', sorted(BASELINE['groups']))
+def test_recovery(group, rtype):
+    samples, name = read_group(group)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        df = rh.recovery(BASELINE['start'], samples, name, rtype)
+    check_frame(df, BASELINE['groups'][group]['recovery_%d' % rtype])
@@ -0,0 +1,34 @@
+'''
+rheology.batch_analyze with exports that fail to parse or to analyze.
+'''
+import os
+
+import numpy as np
+
+import rheology as rh
+import rheology.analysis
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'exampledata')
+PATHS = [os.path.join(EXAMPLES, f) for f in sorted(os.listdir(EXAMPLES))]
+
+
+def test_analysis_failure_marks_only_its_export(monkeypatch):
+    expected = rh.batch_analyze(PATHS, workers=1)
+    bad = rh.all_tests_n(PATHS[5]).array(5)
+    group_metrics = rheology.analysis.group_metrics
+
+    def failing(group, **kwargs):
+        if any(np.array_equal(g.array(5), bad, equal_nan=True) for g in group):
+            raise FloatingPointError('analysis failed')
+        return group_metrics(group, **kwargs)
+
+    monkeypatch.setattr(rheology.analysis, 'group_metrics', failing)
+    results = rh.batch_analyze(PATHS + [os.path.join(EXAMPLES, 'missing.csv')], workers=1)
+
+    assert results['Error'][5] == 'FloatingPointError: analysis failed'
+    assert results['Error'][8].startswith('FileNotFoundError')
+    assert results.loc[[5, 8], rh.METRIC_COLUMNS].isna().all().all()
+    ok = [n for n in range(8) if n != 5]
+    assert (results['Error'][ok] == '').all()
+    np.testing.assert_allclose(results.loc[ok, rh.METRIC_COLUMNS].to_numpy(dtype=np.float64),
+                               expected.loc[ok, rh.METRIC_COLUMNS].to_numpy(dtype=np.float64), equal_nan=True)
@@ -0,0 +1,67 @@
+'''
+The analytic Jacobians of the fitting models against central finite
+differences, and the viscosity fits of the example exports.
+'''
+import os
+
+import numpy as np
+import pytest
+
+import rheology as rh
+from rheology.fitting import _carreau_yasuda_model, _cross_model, _maxwell_model
+
+
+def finite_difference(model, p, rows, h=1e-6):
+    '''
+    Returns the Jacobian (fits x points x parameters) of model at p by
+    central differences.
+    '''
+    J = []
+    for i in range(p.shape[1]):
+        step = np.zeros_like(p)
+        step[:, i] = h
+        J.append((model(p + step, rows)[0] - model(p - step, rows)[0]) / (2 * h))
+    return np.stack(J, axis=2)
+
+
+def check(model, p, rows):
+    f, J = model(p, rows)
+    assert J.shape == f.shape + (p.shape[1],)
+    np.testing.assert_allclose(J, finite_difference(model, p, rows), rtol=1e-5, atol=1e-7)
+
+
+@pytest.mark.parametrize('modes', [1, 3])
+def test_maxwell_jacobian(modes):
+    rng = np.random.default_rng(0)
+    omega = np.tile(np.logspace(-1, 2, 31), (4, 1))
+    p = np.concatenate((rng.uniform(2, 8, (3, modes)), rng.uniform(-4, 2, (3, modes))), axis=1)
+    check(_maxwell_model(omega), p, np.array([0, 2, 3]))
+
+
+def test_cross_jacobian():
+    rng = np.random.default_rng(1)
+    ln_rate = np.tile(np.log(np.logspace(-1, np.log10(50), 28)), (4, 1))
+    p = np.column_stack((rng.uniform(4, 9, 3), rng.uniform(-3, 1, 3), rng.uniform(0.3, 2, 3)))
+    check(_cross_model(ln_rate), p, np.array([0, 1, 3]))
+
+
+def test_carreau_yasuda_jacobian():
+    rng = np.random.default_rng(2)
+    ln_rate = np.tile(np.log(np.logspace(-1, np.log10(50), 28)), (4, 1))
+    p = np.column_stack((rng.uniform(4, 9, 3), rng.uniform(-3, 1, 3), rng.uniform(0.1, 0.9, 3),
+                         np.log(rng.uniform(0.5, 3, 3))))
+    check(_carreau_yasuda_model(ln_rate), p, np.array([1, 2, 3]))
+
+
+def test_flow_fits_the_thinning_region():
+    examples = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'exampledata')
+    group = [rh.all_tests_n(os.path.join(examples, f)) for f in sorted(os.listdir(examples))]
+    flow = rh.flow_n(group)
+    law = flow['power law']
+    # the viscosity collapse is left out, so the flow index is shear thinning
+    assert law['Valid'].all()
+    assert ((law['n'] > 0) & (law['n'] <= 1)).all()
+    n = flow['carreau-yasuda']['n']
+    assert ((n >= 0) & (n <= 1)).all()
+    # carreau-yasuda held at its n bound is not reported as a good fit
+    assert not flow['carreau-yasuda']['Valid'][n == 0].any()
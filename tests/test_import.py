@@ -0,0 +1,44 @@
+'''
+Cold import of the package, as a worker process pays it at start up:
+matplotlib's pyplot, scipy and asyncio must not load, and the package's
+own import must stay quick.
+'''
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# seconds the package may take to import once numpy and pandas are loaded
+IMPORT_SECONDS = 0.5
+
+CODE = '''
+import json, sys, time
+import numpy, pandas
+t = time.perf_counter()
+import rheology
+seconds = time.perf_counter() - t
+print(json.dumps({'seconds': seconds, 'modules': sorted(sys.modules)}))
+'''
+
+
+def cold_import():
+    '''
+    Imports rheology in a new python process started in the repository and
+    returns the time it took and the modules loaded.
+    '''
+    out = subprocess.run([sys.executable, '-c', CODE], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.splitlines()[-1])
+
+
+def test_cold_import_skips_heavy_modules():
+    modules = set(cold_import()['modules'])
+    for name in ('matplotlib.pyplot', 'scipy', 'asyncio'):
+        assert name not in modules, '%s imported with rheology' % name
+
+
+def test_cold_import_time():
+    # best of three, the first run also warms the file system cache
+    seconds = min(cold_import()['seconds'] for i in range(3))
+    assert seconds < IMPORT_SECONDS, 'import rheology took %.3f s' % seconds
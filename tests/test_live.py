@@ -0,0 +1,40 @@
+'''
+rheology.ExportTail following an export written in chunks against the
+analysis of the finished file.
+'''
+import os
+
+import numpy as np
+import pytest
+
+import rheology as rh
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'exampledata')
+
+
+@pytest.mark.parametrize('file', ['PXP_N1.csv', 'TXT_N3.csv'])
+def test_tail_matches_group_metrics(tmp_path, file):
+    with open(os.path.join(EXAMPLES, file), 'rb') as f:
+        data = f.read()
+    path = tmp_path / 'run.csv'
+    path.write_bytes(b'')
+    tail = rh.ExportTail(str(path))
+
+    rng = np.random.default_rng(1)
+    written = 0
+    while written < len(data):
+        step = int(rng.integers(50, 4000)) # cuts rows anywhere
+        with open(path, 'ab') as f:
+            f.write(data[written:written + step])
+        written = written + step
+        tail.poll()
+    assert tail.done
+
+    full = rh.all_tests_n(os.path.join(EXAMPLES, file))
+    expected = rh.group_metrics([full]).iloc[0]
+    for column in rh.METRIC_COLUMNS:
+        np.testing.assert_allclose(tail.metrics[column], expected[column], rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(tail.cycles['t1/2 [s]'], rh.recovery_n([full], 1)[0], rtol=1e-9)
+    sample = tail.sample()
+    for k in full:
+        np.testing.assert_array_equal(sample.array(k), full.array(k))
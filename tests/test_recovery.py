@@ -0,0 +1,54 @@
+'''
+Recovery times of the cyclic strain sweep on exampledata/: start labels,
+cycles that do not recover and the per cycle tables.
+'''
+import os
+
+import numpy as np
+import pytest
+
+import rheology as rh
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'exampledata')
+
+
+@pytest.fixture(scope='module')
+def group():
+    return [rh.all_tests_n(os.path.join(EXAMPLES, 'PXP_N%d.csv' % n)) for n in range(1, 5)]
+
+
+def test_recovery_skips_cycles_that_do_not_recover(group):
+    cycles = rh.recovery_n(group, 1)
+    assert not np.isnan(cycles).any()
+    # a flat G' after the second high strain period never crosses G' 1/2
+    sample = rh.all_tests_n(os.path.join(EXAMPLES, 'PXP_N1.csv'))
+    css = sample[5]
+    first, last = rh.PROTOCOL['tests'][5]['high'][1][1], rh.PROTOCOL['tests'][5]['end'][1]
+    css.iloc[first:last, css.columns.get_loc('Storage Modulus')] = 1.0
+    broken = rh.recovery_n([sample], 1)[0]
+    assert np.isnan(broken[1]) and not np.isnan(np.delete(broken, 1)).any()
+
+    df = rh.recovery(None, [sample] + group[1:], ['n1', 'n2', 'n3', 'n4'])
+    np.testing.assert_allclose(df['n1'].iloc[0], np.mean(np.delete(broken, 1)))
+    np.testing.assert_allclose(rh.group_metrics([sample])['t1/2 [s]'][0], np.mean(np.delete(broken, 1)))
+
+
+def test_missing_start_labels_raise(group):
+    for run in (lambda: rh.recovery_n(group, 1, start=[10**6] * 4),
+                lambda: rh.recovery_kinetics_n(group, start=[10**6] * 4),
+                lambda: rh.recovery_fractions_n(group, start=[10**6] * 4)):
+        with pytest.raises(ValueError, match='1000000'):
+            run()
+
+
+def test_kinetics_needs_one_name_per_n(group):
+    assert len(rh.recovery_kinetics(group, ['n1', 'n2', 'n3', 'n4'])) == 16
+    with pytest.raises(ValueError, match='3 names for 4 samples'):
+        rh.recovery_kinetics(group, ['n1', 'n2', 'n3'])
+
+
+def test_profile_needs_one_name_per_n(group):
+    profile = rh.recovery_profile(group, ['n1', 'n2', 'n3', 'n4'], [0.5])
+    np.testing.assert_array_equal(profile['t50 [s]'].to_numpy(), rh.recovery_n(group, 1).ravel())
+    with pytest.raises(ValueError, match='2 names for 4 samples'):
+        rh.recovery_profile(group, ['n1', 'n2'])